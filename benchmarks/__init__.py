@@ -0,0 +1 @@
+"""Performance benchmarks for VocalPoint. Run with `python -m benchmarks.run`."""
@@ -0,0 +1,63 @@
+"""
+Synthetic energy history for benchmarks.
+
+Entries look like real ones: text logs with pace/tone metrics and audio
+analyses with an energy_score. Timestamps increase at irregular intervals,
+several per day, so range queries and hourly aggregates see realistic data.
+The same seed always produces the same data.
+"""
+
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+from src.lexicon import DEFAULT_TERMS
+
+START = datetime(2024, 1, 1, 7, 0)
+
+_FILLER = ("today", "meeting", "after", "lunch", "the", "morning", "run", "feeling", "pretty", "bit",
+           "coffee", "project", "deadline", "walk", "call", "quite", "really", "so")
+_TERMS = tuple(DEFAULT_TERMS)
+_LEVELS = ("high", "medium", "low")
+
+
+def synthetic_text(rng: random.Random, words: int = 12) -> str:
+    """A short log with one or two lexicon terms among filler words."""
+    tokens = [rng.choice(_FILLER) for _ in range(words)]
+    for _ in range(rng.randint(0, 2)):
+        tokens[rng.randrange(words)] = rng.choice(_TERMS)
+    return " ".join(tokens)
+
+
+def synthetic_texts(n: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    return [synthetic_text(rng) for _ in range(n)]
+
+
+def iter_entries(n: int, seed: int = 0, start: Optional[datetime] = None) -> Iterator[Dict]:
+    """`n` entries, oldest first: about a quarter audio analyses, the rest text logs."""
+    rng = random.Random(seed)
+    timestamp = start or START
+    for _ in range(n):
+        timestamp += timedelta(minutes=rng.randint(20, 240))
+        level = rng.choice(_LEVELS)
+        if rng.random() < 0.25:
+            yield {
+                "timestamp": timestamp.isoformat(),
+                "source": "audio",
+                "energy_level": level,
+                "energy_score": rng.randint(0, 100),
+                "confidence": round(rng.uniform(0.5, 1.0), 2),
+                "indicators": {"tone": "neutral", "pace": "normal", "emotion": "calm", "non_speech_cues": []},
+            }
+        else:
+            yield {
+                "timestamp": timestamp.isoformat(),
+                "text": synthetic_text(rng),
+                "metrics": {"pace": rng.randint(90, 190), "tone_valence": round(rng.uniform(-1, 1), 2)},
+                "energy_level": level,
+            }
+
+
+def synthetic_entries(n: int, seed: int = 0, start: Optional[datetime] = None) -> List[Dict]:
+    return list(iter_entries(n, seed, start))
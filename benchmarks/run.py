@@ -0,0 +1,334 @@
+"""
+Benchmark runner.
+
+    python -m benchmarks.run                      # default profile, compared with benchmarks/baseline.json
+    python -m benchmarks.run --profile quick      # 1k and 10k entries only
+    python -m benchmarks.run --profile full       # adds the 1M-entry storage cases
+    python -m benchmarks.run --only storage --output results.json
+    python -m benchmarks.run --save-baseline      # record this run as the new baseline
+
+Each case reports the best wall time of a few repeats, with setup kept out of
+the timing. Results are written as JSON. A case that is slower than the
+baseline by more than `--tolerance` (default 25%) is a regression, and the
+exit status is then 1. Timings only compare on the same machine, so record
+the baseline on the machine that runs the comparison.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+from benchmarks.data import synthetic_entries, synthetic_texts
+
+PROFILES = {
+    "quick": (1_000, 10_000),
+    "default": (1_000, 10_000, 100_000),
+    "full": (1_000, 10_000, 100_000, 1_000_000),
+}
+SUITES = ("storage", "analyzer", "feedback", "api")
+BACKENDS = ("json", "log", "sqlite")
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_TOLERANCE = 0.25
+
+ANALYZER_TEXTS = 10_000
+API_REQUESTS = 200
+API_UPLOAD_BYTES = 64 * 1024
+
+
+@dataclass
+class Result:
+    name: str
+    seconds: float  # Best wall time of one repeat
+    ops: int  # Operations per repeat
+    repeats: int
+    extra: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def ops_per_second(self) -> float:
+        return self.ops / self.seconds if self.seconds else float("inf")
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data["ops_per_second"] = round(self.ops_per_second, 1)
+        return data
+
+
+def measure(fn: Callable[[], None], repeats: int = 3, setup: Optional[Callable[[], None]] = None) -> float:
+    """Best wall time of `fn` over `repeats` runs; `setup` runs untimed before each one."""
+    best = float("inf")
+    for _ in range(repeats):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+# -- Storage -----------------------------------------------------------------
+
+def open_storage(backend: str, directory: str):
+    from src.storage import Storage
+    from src.log_storage import SegmentedLogStorage
+    from src.sqlite_storage import SQLiteStorage
+
+    if backend == "json":
+        return Storage(os.path.join(directory, "energy_log.json"))
+    if backend == "log":
+        return SegmentedLogStorage(os.path.join(directory, "energy_log"))
+    if backend == "sqlite":
+        return SQLiteStorage(os.path.join(directory, "energy.db"))
+    raise ValueError(f"Unknown backend: {backend}")
+
+
+def close_storage(storage):
+    if hasattr(storage, "close"):
+        storage.close()
+
+
+def storage_cases(sizes: Sequence[int], workdir: str) -> Iterator[Result]:
+    for n in sizes:
+        entries = synthetic_entries(n)
+        extra = synthetic_entries(10, seed=1, start=datetime.fromisoformat(entries[-1]["timestamp"]))
+        page_start = datetime.fromisoformat(entries[n // 2]["timestamp"])
+        seed_repeats = 3 if n <= 10_000 else 1
+        appends = 10 if n < 1_000_000 else 2
+
+        for backend in BACKENDS:
+            directory = os.path.join(workdir, f"{backend}-{n}")
+            state = {}
+
+            def fresh():
+                close_storage(state.get("storage"))
+                shutil.rmtree(directory, ignore_errors=True)
+                os.makedirs(directory)
+                state["storage"] = open_storage(backend, directory)
+
+            seconds = measure(lambda: state["storage"].save_entries(entries), seed_repeats, setup=fresh)
+            yield Result(f"storage.{backend}.save_entries[{n}]", seconds, n, seed_repeats)
+
+            def append():
+                for entry in extra[:appends]:
+                    state["storage"].save_entry(entry)
+
+            def reopen():
+                # Each repeat appends to a history of n entries (plus earlier repeats' few)
+                close_storage(state["storage"])
+                state["storage"] = open_storage(backend, directory)
+                state["storage"].load_entries()
+
+            seconds = measure(append, 3, setup=reopen)
+            yield Result(f"storage.{backend}.save_entry[{n}]", seconds, appends, 3)
+
+            def cold_open():
+                close_storage(state["storage"])
+                state["storage"] = open_storage(backend, directory)
+
+            seconds = measure(lambda: state["storage"].load_entries(), 3, setup=cold_open)
+            yield Result(f"storage.{backend}.load_entries[{n}]", seconds, 1, 3)
+
+            page = lambda: state["storage"].load_page(page_start, page_start + timedelta(days=30), 100)
+            page()  # Warm, as in a long-running API worker
+            seconds = measure(page, 5)
+            yield Result(f"storage.{backend}.load_page[{n}]", seconds, 1, 5)
+
+            close_storage(state["storage"])
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+# -- Analyzer and feedback ---------------------------------------------------
+
+def analyzer_cases(sizes: Sequence[int], workdir: str) -> Iterator[Result]:
+    from src.analyzer import EnergyAnalyzer
+
+    analyzer = EnergyAnalyzer()
+    texts = synthetic_texts(ANALYZER_TEXTS)
+    metrics = [entry.get("metrics") for entry in synthetic_entries(ANALYZER_TEXTS)]
+
+    def one_by_one():
+        for text, m in zip(texts, metrics):
+            analyzer.analyze(text, m)
+
+    yield Result(f"analyzer.analyze[{ANALYZER_TEXTS}]", measure(one_by_one), ANALYZER_TEXTS, 3)
+    yield Result(f"analyzer.analyze_many[{ANALYZER_TEXTS}]",
+                 measure(lambda: analyzer.analyze_many(texts, metrics)), ANALYZER_TEXTS, 3)
+
+
+def feedback_cases(sizes: Sequence[int], workdir: str) -> Iterator[Result]:
+    from src.domain import EntryTable
+    from src.feedback import FeedbackGenerator
+
+    generator = FeedbackGenerator()
+    for n in sizes:
+        entries = synthetic_entries(n)
+        repeats = 3 if n <= 100_000 else 1
+        seconds = measure(lambda: generator.generate_feedback(entries), repeats)
+        yield Result(f"feedback.generate_feedback[{n}]", seconds, n, repeats)
+
+        table = EntryTable.from_dicts(entries)
+        seconds = measure(lambda: generator.generate_feedback(table), repeats)
+        yield Result(f"feedback.generate_feedback_compact[{n}]", seconds, n, repeats,
+                     extra={"table_bytes": table.nbytes()})
+
+
+# -- API ---------------------------------------------------------------------
+
+class StubAudioClient:
+    """Answers instantly, so the benchmark measures the API's own overhead."""
+
+    def __init__(self):
+        from src.gemini_client import EnergyIndicators, EnergyResponse
+
+        self.response = EnergyResponse(
+            energy_level="high", confidence=0.9, energy_score=80,
+            indicators=EnergyIndicators(tone="positive", pace="fast", emotion="excited", non_speech_cues=[]),
+        )
+
+    async def analyze_audio_async(self, audio, mime_type="audio/webm"):
+        return self.response
+
+
+def api_cases(sizes: Sequence[int], workdir: str) -> Iterator[Result]:
+    import httpx
+    from src import api
+
+    async def run() -> List[float]:
+        latencies = []
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+            for i in range(API_REQUESTS):
+                # Distinct uploads, so no request is coalesced with another
+                audio = i.to_bytes(4, "big") + bytes(API_UPLOAD_BYTES - 4)
+                start = time.perf_counter()
+                response = await http.post("/analyze", files={"file": ("clip.webm", audio, "audio/webm")})
+                latencies.append(time.perf_counter() - start)
+                response.raise_for_status()
+        return latencies
+
+    original = api.gemini_client
+    api.gemini_client = StubAudioClient()
+    try:
+        latencies = sorted(asyncio.run(run()))
+    finally:
+        api.gemini_client = original
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    yield Result(f"api.analyze[{API_REQUESTS}]", statistics.median(latencies), 1, API_REQUESTS,
+                 extra={"mean": statistics.fmean(latencies), "p95": p95})
+
+
+CASES = {
+    "storage": storage_cases,
+    "analyzer": analyzer_cases,
+    "feedback": feedback_cases,
+    "api": api_cases,
+}
+
+
+# -- Reporting ---------------------------------------------------------------
+
+def run(profile: str = "default", suites: Sequence[str] = SUITES, workdir: Optional[str] = None,
+        progress: Callable[[Result], None] = lambda result: None) -> Dict:
+    sizes = PROFILES[profile]
+    own_workdir = workdir is None
+    workdir = workdir or tempfile.mkdtemp(prefix="vocalpoint-bench-")
+    results = []
+    try:
+        for suite in suites:
+            for result in CASES[suite](sizes, workdir):
+                progress(result)
+                results.append(result.to_dict())
+    finally:
+        if own_workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "profile": profile,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float = DEFAULT_TOLERANCE) -> List[Dict]:
+    """Cases present in both runs, with their change against the baseline; `regression` marks slowdowns."""
+    previous = {result["name"]: result for result in baseline.get("results", [])}
+    changes = []
+    for result in report["results"]:
+        before = previous.get(result["name"])
+        if before is None or not before["seconds"]:
+            continue
+        ratio = result["seconds"] / before["seconds"]
+        changes.append({
+            "name": result["name"],
+            "baseline": before["seconds"],
+            "current": result["seconds"],
+            "ratio": round(ratio, 3),
+            "regression": ratio > 1.0 + tolerance,
+        })
+    return changes
+
+
+def _format_seconds(seconds: float) -> str:
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:8.1f} µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:8.2f} ms"
+    return f"{seconds:8.2f} s "
+
+
+def _print_result(result: Result):
+    print(f"{result.name:<44} {_format_seconds(result.seconds)}  {result.ops_per_second:>14,.0f} ops/s", flush=True)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="VocalPoint benchmarks")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="default",
+                        help="History sizes to benchmark (full adds 1M entries)")
+    parser.add_argument("--only", nargs="+", choices=SUITES, default=list(SUITES), metavar="SUITE",
+                        help=f"Suites to run: {', '.join(SUITES)}")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="Baseline results to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed slowdown against the baseline before failing (0.25 = 25%%)")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline")
+    args = parser.parse_args(argv)
+
+    report = run(args.profile, args.only, progress=_print_result)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one.")
+        return 0
+    with open(args.baseline) as f:
+        changes = compare(report, json.load(f), args.tolerance)
+    regressions = [change for change in changes if change["regression"]]
+    print(f"\nCompared {len(changes)} cases with {args.baseline}: {len(regressions)} regression(s)")
+    for change in regressions:
+        print(f"  {change['name']}: {_format_seconds(change['baseline']).strip()} -> "
+              f"{_format_seconds(change['current']).strip()} ({change['ratio']:.2f}x)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Union
+from src.domain import EnergyLevel, EntryTable, NO_TIMESTAMP, UNKNOWN_LEVEL, US_PER_DAY, US_PER_HOUR
+from src.index_file import PersistedIndex
+
+AGGREGATES_FILE = "energy_aggregates.json"
+
+# Numeric score used when averaging energy levels
+LEVEL_SCORES = {
+    EnergyLevel.HIGH.value: 2,
+    EnergyLevel.MEDIUM.value: 0,
+    EnergyLevel.LOW.value: -2
+}
+# The same scores by EntryTable level code (low, medium, high)
+CODE_SCORES = (-2, 0, 2)
+
+
+class HourlyAggregates(PersistedIndex):
+    """Running per-hour and per-weekday-hour score sums and counts.
+
+    Updated one entry at a time so feedback never has to rescan the history.
+    `total` counts every entry seen, including ones whose timestamp or energy
+    level could not be read, matching what feedback reports as the number of logs.
+    """
+
+    def __init__(self, filepath: Optional[str] = AGGREGATES_FILE):
+        super().__init__(filepath)
+
+    def reset(self):
+        self.total = 0
+        self.hour_sums = [0] * 24
+        self.hour_counts = [0] * 24
+        self.weekday_hour_sums = [[0] * 24 for _ in range(7)]
+        self.weekday_hour_counts = [[0] * 24 for _ in range(7)]
+
+    def add(self, entry: Dict):
+        self.total += 1
+        try:
+            dt = datetime.fromisoformat(entry['timestamp'])
+            score = LEVEL_SCORES[entry['energy_level']]
+        except (ValueError, KeyError, TypeError):
+            return
+
+        self.hour_sums[dt.hour] += score
+        self.hour_counts[dt.hour] += 1
+        self.weekday_hour_sums[dt.weekday()][dt.hour] += score
+        self.weekday_hour_counts[dt.weekday()][dt.hour] += 1
+
+    def add_table(self, table: EntryTable):
+        """Adds every row of a columnar table, with integer arithmetic instead of timestamp parsing."""
+        self.total += len(table)
+        hour_sums, hour_counts = self.hour_sums, self.hour_counts
+        for timestamp, code in zip(table.timestamps, table.levels):
+            if timestamp == NO_TIMESTAMP or code == UNKNOWN_LEVEL:
+                continue
+            hour = timestamp // US_PER_HOUR % 24
+            weekday = (timestamp // US_PER_DAY + 3) % 7  # 1970-01-01 was a Thursday
+            score = CODE_SCORES[code]
+            hour_sums[hour] += score
+            hour_counts[hour] += 1
+            self.weekday_hour_sums[weekday][hour] += score
+            self.weekday_hour_counts[weekday][hour] += 1
+
+    def rebuild(self, entries: Union[Iterable[Dict], EntryTable]):
+        self.reset()
+        if isinstance(entries, EntryTable):
+            self.add_table(entries)
+            return
+        for entry in entries:
+            self.add(entry)
+
+    def hourly_averages(self) -> Dict[int, float]:
+        """Average score for each hour of day that has at least one entry."""
+        return {
+            hour: self.hour_sums[hour] / self.hour_counts[hour]
+            for hour in range(24)
+            if self.hour_counts[hour]
+        }
+
+    def weekday_hourly_averages(self, weekday: int) -> Dict[int, float]:
+        """Average score per hour for a weekday (Monday=0)."""
+        sums = self.weekday_hour_sums[weekday]
+        counts = self.weekday_hour_counts[weekday]
+        return {hour: sums[hour] / counts[hour] for hour in range(24) if counts[hour]}
+
+    # -- Persistence ---------------------------------------------------------
+
+    def to_dict(self) -> Dict[str, List]:
+        return {
+            "total": self.total,
+            "hour_sums": self.hour_sums,
+            "hour_counts": self.hour_counts,
+            "weekday_hour_sums": self.weekday_hour_sums,
+            "weekday_hour_counts": self.weekday_hour_counts,
+        }
+
+    def from_dict(self, data: Dict):
+        self.total = data["total"]
+        self.hour_sums = data["hour_sums"]
+        self.hour_counts = data["hour_counts"]
+        self.weekday_hour_sums = data["weekday_hour_sums"]
+        self.weekday_hour_counts = data["weekday_hour_counts"]
@@ -1,11 +1,12 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Sequence
 from src.domain import EnergyLevel
 from src.interfaces import IEnergyAnalyzer
+from src.lexicon import Lexicon
 
 class EnergyAnalyzer(IEnergyAnalyzer):
-    def __init__(self):
-        # In a real app, this would load models
-        pass
+    def __init__(self, lexicon: Optional[Lexicon] = None):
+        # Keyword weights are compiled once here; file-backed lexicons hot-reload on change
+        self.lexicon = lexicon or Lexicon.default()
 
     def analyze(self, text: str, metrics: Dict[str, Any] = None) -> EnergyLevel:
         """
@@ -18,22 +19,13 @@ class EnergyAnalyzer(IEnergyAnalyzer):
                      tone_valence: -1.0 to 1.0 (negative to positive emotion)
         """
         metrics = metrics or {}
+        self.lexicon.maybe_reload()
 
         # Simple heuristic analysis
         score = 0
 
-        # Text based heuristics
-        text_lower = text.lower()
-        high_energy_keywords = ['excited', 'ready', 'focused', 'great', 'pumped', 'energetic']
-        low_energy_keywords = ['tired', 'exhausted', 'drained', 'sleepy', 'slow', 'sick']
-
-        for word in high_energy_keywords:
-            if word in text_lower:
-                score += 2
-
-        for word in low_energy_keywords:
-            if word in text_lower:
-                score -= 2
+        # Text based heuristics: weighted whole-word lexicon terms
+        score += self.lexicon.score(text)
 
         # Metric based heuristics
         pace = metrics.get('pace')
@@ -57,3 +49,38 @@ class EnergyAnalyzer(IEnergyAnalyzer):
             return EnergyLevel.LOW
         else:
             return EnergyLevel.MEDIUM
+
+    def analyze_many(self, texts: Sequence[str],
+                     metrics: Optional[Sequence[Optional[Dict[str, Any]]]] = None) -> List[EnergyLevel]:
+        """
+        Batch version of `analyze`, returning the same level for each (text, metrics) pair.
+
+        Texts are scored in one batch against the compiled lexicon (`Lexicon.score_many`);
+        the pace/tone contributions and the level thresholds are computed as NumPy arrays.
+
+        Args:
+            texts: Transcribed texts.
+            metrics: Optional per-text metrics dicts (same length as texts); None entries are allowed.
+        """
+        # Imported lazily so the CLI does not pay NumPy's import cost for single entries
+        import numpy as np
+
+        n = len(texts)
+        if metrics is None:
+            metrics = [None] * n
+        if len(metrics) != n:
+            raise ValueError(f"Expected {n} metrics entries, got {len(metrics)}")
+
+        self.lexicon.maybe_reload()
+        text_scores = self.lexicon.score_many(texts)
+
+        # Missing or zero metrics contribute nothing, as in `analyze`
+        pace = np.array([(m or {}).get('pace') or 0 for m in metrics], dtype=np.float64)
+        tone = np.array([(m or {}).get('tone_valence') or 0 for m in metrics], dtype=np.float64)
+        pace_scores = np.where(pace == 0, 0, np.where(pace > 160, 1, np.where(pace < 110, -1, 0)))
+        tone_scores = np.where(tone == 0, 0, np.where(tone > 0.5, 1, np.where(tone < -0.5, -1, 0)))
+
+        scores = text_scores + pace_scores + tone_scores
+        codes = np.where(scores >= 2, 0, np.where(scores <= -2, 2, 1))
+        levels = (EnergyLevel.HIGH, EnergyLevel.MEDIUM, EnergyLevel.LOW)
+        return [levels[code] for code in codes.tolist()]
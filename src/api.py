@@ -4,17 +4,46 @@ FastAPI server for VocalPoint audio analysis.
 Provides a REST API for uploading audio files and receiving energy analysis.
 """
 
+import asyncio
+import hashlib
+import json
 import os
-import tempfile
-from fastapi import FastAPI, UploadFile, HTTPException
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Annotated, Any, Awaitable, Callable, Dict, Iterable, List, Literal, Optional, TypeVar
+from fastapi import FastAPI, UploadFile, HTTPException, Form, Path, Query, Request, Response, WebSocket, \
+    WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
+
+from src.audio_features import LocalAudioAnalyzer, PcmFormat
+from src.batch import run_batch, DEFAULT_BATCH_WORKERS
+from src.cache import AnalysisCache
+from src.gemini_client import GeminiAudioClient, EnergyResponse, heuristic_analysis
+from src.metrics import REGISTRY, CONTENT_TYPE as METRICS_CONTENT_TYPE, Sample, timed
+from src.resilience import CircuitBreaker, CircuitOpenError
+from src.service import analysis_entry
+from src.streaming import AudioStream, StreamTooLarge, PCM_MIME_TYPE
+from src.scheduler import EnergyScheduler, Task, DEFAULT_DAY_START, DEFAULT_DAY_END
+from src.tenancy import UserServiceRegistry, USER_ID_PATTERN, DATA_DIR, DEFAULT_MAX_OPEN_USERS
+from src.writer import BufferedEntryWriter, DEFAULT_FLUSH_INTERVAL
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Write out analysis results still buffered before the process exits
+    if entry_writer is not None:
+        await asyncio.to_thread(entry_writer.close)
 
-from src.gemini_client import GeminiAudioClient, EnergyResponse
 
 app = FastAPI(
     title="VocalPoint API",
     description="AI-powered energy analysis from voice recordings",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 # Enable CORS for PWA frontend
@@ -24,61 +53,692 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],  # Lets the PWA revalidate /trend and /history
 )
 
+HTTP_SECONDS = REGISTRY.histogram(
+    "vocalpoint_http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status")
+)
+HTTP_IN_FLIGHT = REGISTRY.gauge("vocalpoint_http_requests_in_flight", "HTTP requests being handled")
+ANALYSES_IN_FLIGHT = REGISTRY.gauge("vocalpoint_analyses_in_flight", "Analyses holding a concurrency slot")
+ANALYSES_WAITING = REGISTRY.gauge("vocalpoint_analyses_waiting", "Analyses waiting for a concurrency slot")
+STARTED_AT = time.monotonic()
+
+
+class RequestMetricsMiddleware:
+    """Times every HTTP request by route template and counts requests in flight.
+
+    Covers the whole request, including multipart parsing before the endpoint runs.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            with HTTP_IN_FLIGHT.track():
+                await self.app(scope, receive, send_with_status)
+        finally:
+            # The template (e.g. /users/{user_id}/trend) keeps the label set small
+            route = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_SECONDS.observe(time.perf_counter() - start, method=scope["method"], route=route, status=status)
+
+
+app.add_middleware(RequestMetricsMiddleware)
+
 # Initialize Gemini client
 gemini_client = None
 
+# Per-user energy histories, one storage shard per user
+registry = None
+
+# Persists /analyze results off the request path
+entry_writer = None
+ENTRY_FLUSH_INTERVAL = float(os.environ.get("ENTRY_FLUSH_INTERVAL", str(DEFAULT_FLUSH_INTERVAL)))
+
+# Same limit as the CLI for logged text
+MAX_TEXT_LENGTH = 5000
+
+# Upper bound on model calls in flight per worker; extra uploads wait for a slot
+MAX_CONCURRENT_ANALYSES = int(os.environ.get("MAX_CONCURRENT_ANALYSES", "16"))
+analysis_slots = asyncio.Semaphore(MAX_CONCURRENT_ANALYSES)
+
+# Uploads are read in chunks and rejected as soon as they exceed the limit
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+UPLOAD_CHUNK_BYTES = 64 * 1024
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one in-flight call.
+
+    Every caller awaiting the same key receives the same result, or the same
+    exception. The shared call runs as its own task, so a caller that goes
+    away (e.g. a client disconnect) does not cancel it for the others.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every waiter went away.
+            task.exception()
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+
+# Identical uploads arriving together (e.g. a double-fired request) share one model call,
+# and are recorded once per user
+inflight_analyses = SingleFlight()
+inflight_recordings = SingleFlight()
+
+class TaskRequest(BaseModel):
+    """A task to place in the energy-aware schedule."""
+    name: str = Field(min_length=1, max_length=200)
+    duration_minutes: int = Field(gt=0, le=24 * 60)
+    focus: float = Field(ge=0.0, le=1.0)  # 0 = administrative, 1 = deep focus
+    deadline: Optional[datetime] = None
+
+
+class ScheduleRequest(BaseModel):
+    """Tasks and planning horizon for /schedule."""
+    tasks: List[TaskRequest] = Field(max_length=2000)
+    start: Optional[datetime] = None
+    days: int = Field(default=7, ge=1, le=56)
+    day_start: int = Field(default=DEFAULT_DAY_START, ge=0, le=23)
+    day_end: int = Field(default=DEFAULT_DAY_END, ge=1, le=24)
+
+
+class ScheduledTaskResponse(BaseModel):
+    """A task placed in a time slot."""
+    name: str
+    start: datetime
+    end: datetime
+    energy: float
+
+
+class ScheduleResponse(BaseModel):
+    """Result of /schedule."""
+    scheduled: List[ScheduledTaskResponse]
+    unscheduled: List[str]
+
+
+class EntryMetrics(BaseModel):
+    """Vocal metrics accompanying a text log."""
+    pace: Optional[float] = Field(default=None, gt=0)  # words per minute
+    tone_valence: Optional[float] = Field(default=None, ge=-1.0, le=1.0)
+
+
+class EntryRequest(BaseModel):
+    """A text energy log for /users/{user_id}/entries."""
+    text: str = Field(min_length=1, max_length=MAX_TEXT_LENGTH)
+    metrics: EntryMetrics = Field(default_factory=EntryMetrics)
+
+
+class EntryResponse(BaseModel):
+    """Energy level detected for a recorded entry."""
+    energy_level: str
+
+
+class FeedbackResponse(BaseModel):
+    """Insight text for /users/{user_id}/feedback."""
+    feedback: str
+
+
+class HistoryResponse(BaseModel):
+    """A page of entries for /history."""
+    entries: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None  # Pass back as ?cursor= for the next page; null on the last page
+
+
+class TrendBucket(BaseModel):
+    """energy_score statistics for one hour or day."""
+    start: str
+    count: int
+    min: float
+    mean: float
+    max: float
+
+
+class TrendResponse(BaseModel):
+    """Downsampled energy_score series for /trend."""
+    resolution: str
+    buckets: List[TrendBucket]
+
+
+class ForecastResponse(BaseModel):
+    """Predicted energy curve for /forecast."""
+    curve: List[float]  # 168 values, 0-100, one per hour of the week
+    slot_start: str = "Monday 00:00"
+
+
+ALLOWED_AUDIO_TYPES = ["audio/webm", "audio/mpeg", "audio/wav", "audio/mp3", "audio/ogg"]
+
+# Batch uploads: files per request and files analyzed concurrently per request
+MAX_BATCH_FILES = int(os.environ.get("MAX_BATCH_FILES", "50"))
+BATCH_WORKERS = int(os.environ.get("BATCH_WORKERS", str(DEFAULT_BATCH_WORKERS)))
+
 
 def get_client() -> GeminiAudioClient:
     """Lazy initialization of Gemini client."""
     global gemini_client
     if gemini_client is None:
-        gemini_client = GeminiAudioClient()
+        # Resubmitted recordings are answered from the cache; set ANALYSIS_CACHE_DIR for a disk tier
+        cache = AnalysisCache(cache_dir=os.environ.get("ANALYSIS_CACHE_DIR"))
+        # GEMINI_FALLBACK=heuristic answers with a local estimate instead of 503 while the model is down
+        fallback = heuristic_analysis if os.environ.get("GEMINI_FALLBACK") == "heuristic" else None
+        # LOCAL_FAST_PATH=1 answers clear-cut WAV clips locally and only sends the rest to the model
+        local_analyzer = LocalAudioAnalyzer() if os.environ.get("LOCAL_FAST_PATH") == "1" else None
+        gemini_client = GeminiAudioClient(cache=cache, fallback=fallback, local_analyzer=local_analyzer)
     return gemini_client
 
 
+def get_registry() -> UserServiceRegistry:
+    """Lazy initialization of the per-user service registry."""
+    global registry
+    if registry is None:
+        registry = UserServiceRegistry(
+            data_dir=os.environ.get("VOCALPOINT_DATA_DIR", DATA_DIR),
+            max_open=int(os.environ.get("MAX_OPEN_USERS", str(DEFAULT_MAX_OPEN_USERS))),
+            backend=os.environ.get("VOCALPOINT_STORAGE", "log"),
+            # Several uvicorn workers (--workers / $WEB_CONCURRENCY) write the same shards
+            shared=os.environ.get("VOCALPOINT_SHARED_STORAGE", "1") != "0",
+        )
+    return registry
+
+
+def get_writer() -> BufferedEntryWriter:
+    """Lazy initialization of the background entry writer."""
+    global entry_writer
+    if entry_writer is None:
+        entry_writer = BufferedEntryWriter(get_registry(), flush_interval=ENTRY_FLUSH_INTERVAL)
+    return entry_writer
+
+
+async def read_upload(file: UploadFile, limit: Optional[int] = None) -> bytes:
+    """Reads an upload into memory in chunks, enforcing a maximum size.
+
+    Raises:
+        HTTPException: 413 if the upload is larger than `limit` (default MAX_UPLOAD_BYTES).
+    """
+    limit = limit or MAX_UPLOAD_BYTES
+    too_large = HTTPException(
+        status_code=413,
+        detail=f"Audio file too large. Maximum size is {limit} bytes."
+    )
+    if file.size is not None and file.size > limit:
+        raise too_large
+
+    chunks = []
+    received = 0
+    with timed("upload_read"):
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            received += len(chunk)
+            if received > limit:
+                raise too_large
+            chunks.append(chunk)
+    return b"".join(chunks)
+
+
+@timed("validate")
+def validate_content_type(content_type: Optional[str]):
+    """Raises a 400 HTTPException for unsupported audio formats."""
+    if content_type not in ALLOWED_AUDIO_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported audio format: {content_type}. Supported: {ALLOWED_AUDIO_TYPES}"
+        )
+
+
+async def analyze_content(content: bytes, content_type: str, user_id: Optional[str] = None) -> EnergyResponse:
+    """Runs one analysis under the concurrency limit, sharing identical in-flight calls.
+
+    With a `user_id` the result is added to the user's history, once for all
+    of that user's coalesced calls.
+    """
+    client = get_client()
+
+    async def run_analysis():
+        with ANALYSES_WAITING.track():
+            await analysis_slots.acquire()
+        try:
+            # Analyze with Gemini without blocking the event loop
+            with ANALYSES_IN_FLIGHT.track(), timed("analysis"):
+                return await client.analyze_audio_async(content, content_type)
+        finally:
+            analysis_slots.release()
+
+    key = f"{content_type}:{hashlib.sha256(content).hexdigest()}"
+    if user_id is None:
+        return await inflight_analyses.do(key, run_analysis)
+
+    async def analyze_and_record():
+        result = await inflight_analyses.do(key, run_analysis)
+        record_result(user_id, result)
+        return result
+
+    return await inflight_recordings.do(f"{user_id}:{key}", analyze_and_record)
+
+
+@app.exception_handler(CircuitOpenError)
+async def circuit_open_handler(request: Request, exc: CircuitOpenError):
+    """The model has been failing; tell clients to back off instead of queueing more calls."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Analysis temporarily unavailable. Please retry later."},
+        headers={"Retry-After": str(max(1, round(exc.retry_after)))},
+    )
+
+
+def collect_runtime() -> Iterable[Sample]:
+    """Counts kept by the model client, its cache and the entry writer, read at scrape time."""
+    caller = getattr(gemini_client, "resilience", None)
+    if caller is not None:
+        yield "vocalpoint_model_attempts_total", "counter", "Model call attempts, including retries", caller.attempts
+        yield "vocalpoint_model_retries_total", "counter", "Model call retries after a transient failure", caller.retries
+        yield ("vocalpoint_model_failed_attempts_total", "counter",
+               "Model call attempts that failed with a retryable error", caller.failures)
+    circuit = circuit_state()
+    if circuit is not None:
+        yield ("vocalpoint_model_circuit_open", "gauge", "1 while the circuit breaker is not closed",
+               int(circuit != CircuitBreaker.CLOSED))
+    if hasattr(gemini_client, "upload_stats"):
+        uploads = gemini_client.upload_stats()
+        yield ("vocalpoint_upload_bytes_received_total", "counter", "Audio bytes received for model calls",
+               uploads["bytes_received"])
+        yield ("vocalpoint_upload_bytes_sent_total", "counter", "Audio bytes uploaded after preprocessing",
+               uploads["bytes_uploaded"])
+    cache = getattr(gemini_client, "cache", None)
+    if cache is not None:
+        stats = cache.stats()
+        yield "vocalpoint_cache_hits_total", "counter", "Analysis cache hits", stats["hits"]
+        yield "vocalpoint_cache_misses_total", "counter", "Analysis cache misses", stats["misses"]
+        yield "vocalpoint_cache_hit_ratio", "gauge", "Share of cache lookups answered from the cache", stats["hit_rate"]
+    writer = entry_writer
+    if writer is not None:
+        yield "vocalpoint_writer_pending_entries", "gauge", "Analysis results waiting to be written", writer.pending()
+        yield "vocalpoint_writer_written_total", "counter", "Analysis results written to history", writer.written
+        yield "vocalpoint_writer_failed_total", "counter", "Analysis results that could not be written", writer.failed
+
+
+def circuit_state() -> Optional[str]:
+    """The model circuit breaker's state, or None before the client exists."""
+    breaker = getattr(gemini_client, "breaker", None)
+    return breaker.state if breaker is not None else None
+
+
+REGISTRY.register_collector("api", collect_runtime)
+
+
 @app.get("/health")
 async def health_check():
-    """Health check endpoint."""
-    return {"status": "ok"}
+    """Liveness and a summary of this worker's state.
+
+    `status` is "degraded" while the circuit breaker keeps the model from being called.
+    """
+    circuit = circuit_state()
+    return {
+        "status": "ok" if circuit in (None, CircuitBreaker.CLOSED) else "degraded",
+        "version": app.version,
+        "uptime_seconds": round(time.monotonic() - STARTED_AT, 1),
+        "model_circuit": circuit,
+        "requests_in_flight": int(HTTP_IN_FLIGHT.value()),
+        "analyses_in_flight": int(ANALYSES_IN_FLIGHT.value()),
+        "analyses_waiting": int(ANALYSES_WAITING.value()),
+        "pending_writes": entry_writer.pending() if entry_writer is not None else 0,
+    }
+
+
+@app.get("/metrics")
+async def metrics():
+    """Counters, gauges and latency histograms in the Prometheus text format."""
+    return Response(REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Hit/miss counters for the analysis result cache."""
+    # Read without creating the client, so stats work before the first analysis (and without an API key)
+    cache = getattr(gemini_client, "cache", None)
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@app.get("/upload/stats")
+async def upload_stats():
+    """Audio bytes received vs. uploaded to the model after preprocessing."""
+    # Zero until the client exists; like /cache/stats, this never creates it
+    if gemini_client is None:
+        return {"uploads": 0, "bytes_received": 0, "bytes_uploaded": 0, "bytes_saved": 0}
+    return gemini_client.upload_stats()
+
+
+OptionalUserId = Annotated[Optional[str], Form(pattern=USER_ID_PATTERN)]
+
+
+def record_result(user_id: Optional[str], result: EnergyResponse):
+    """Queues an analysis result for the user's history; a no-op without a user id."""
+    if user_id is not None:
+        get_writer().submit(user_id, analysis_entry(result.model_dump()))
 
 
 @app.post("/analyze", response_model=EnergyResponse)
-async def analyze_audio(file: UploadFile):
+async def analyze_audio(file: UploadFile, user_id: OptionalUserId = None):
     """Analyze an audio file for energy level.
 
     Args:
         file: Audio file upload (WebM, MP3, WAV, etc.)
+        user_id: Optional user whose history the result is added to. The write
+            happens in the background after the response is sent.
 
     Returns:
         EnergyResponse with energy_level, confidence, and indicators.
     """
-    # Validate file type
-    allowed_types = ["audio/webm", "audio/mpeg", "audio/wav", "audio/mp3", "audio/ogg"]
-    if file.content_type not in allowed_types:
+    validate_content_type(file.content_type)
+    content = await read_upload(file)
+    return await analyze_content(content, file.content_type, user_id)
+
+
+@app.post("/analyze/batch")
+async def analyze_batch(files: List[UploadFile], user_id: OptionalUserId = None):
+    """Analyze many audio files, streaming one NDJSON line per file as it completes.
+
+    Args:
+        files: Audio file uploads (WebM, MP3, WAV, etc.)
+        user_id: Optional user whose history successful results are added to.
+
+    Returns:
+        application/x-ndjson stream of {"index", "filename", "result"} or
+        {"index", "filename", "error"} objects, in completion order.
+    """
+    if len(files) > MAX_BATCH_FILES:
         raise HTTPException(
             status_code=400,
-            detail=f"Unsupported audio format: {file.content_type}. Supported: {allowed_types}"
+            detail=f"Too many files in batch: {len(files)}. Maximum is {MAX_BATCH_FILES}."
         )
 
-    # Save uploaded file temporarily
-    suffix = os.path.splitext(file.filename)[1] or ".webm"
-    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-        content = await file.read()
-        tmp.write(content)
-        tmp_path = tmp.name
+    async def analyze_upload(file: UploadFile) -> EnergyResponse:
+        validate_content_type(file.content_type)
+        content = await read_upload(file)
+        return await analyze_content(content, file.content_type, user_id)
 
+    async def stream():
+        async for index, file, result, error in run_batch(files, analyze_upload, BATCH_WORKERS):
+            line = {"index": index, "filename": file.filename}
+            if error is None:
+                line["result"] = result.model_dump()
+            elif isinstance(error, HTTPException):
+                line["error"] = error.detail
+            else:
+                line["error"] = f"Analysis failed: {error}"
+            yield json.dumps(line) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+
+class StreamStart(BaseModel):
+    """First message of a /ws/analyze stream."""
+    content_type: str
+    user_id: Optional[str] = Field(default=None, pattern=USER_ID_PATTERN)
+    # Required for audio/pcm streams
+    sample_rate: Optional[int] = Field(default=None, ge=8000, le=192000)
+    sample_width: int = Field(default=2, ge=1, le=4)
+    channels: int = Field(default=1, ge=1, le=8)
+
+
+@app.websocket("/ws/analyze")
+async def analyze_stream(websocket: WebSocket):
+    """Analyze a recording streamed in chunks while it is being made.
+
+    Protocol (JSON text messages, audio as binary messages):
+        client -> {"type": "start", "content_type": "audio/webm", "user_id": "..."}
+                  (audio/pcm also needs "sample_rate", and optionally "sample_width" and "channels")
+        client -> binary audio chunks
+        server -> {"type": "features", "seconds", "energy_level", "energy_score", "confidence", "metrics"}
+                  running local features over the last few seconds (WAV and PCM streams only)
+        client -> {"type": "end"}
+        server -> {"type": "result", "result": EnergyResponse} and closes the socket
+
+    Problems are reported as {"type": "error", "detail": ...} before the socket closes.
+    """
+    await websocket.accept()
     try:
-        # Analyze with Gemini
-        client = get_client()
-        result = client.analyze_energy(tmp_path)
-        return result
-    finally:
-        # Clean up temp file
-        if os.path.exists(tmp_path):
-            os.remove(tmp_path)
+        try:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            start = StreamStart.model_validate(control_message(message))
+            if start.content_type != PCM_MIME_TYPE:
+                validate_content_type(start.content_type)
+            elif start.sample_rate is None:
+                raise ValueError("audio/pcm streams need a sample_rate")
+            pcm_format = PcmFormat(start.sample_rate, start.sample_width, start.channels) if start.sample_rate else None
+            stream = AudioStream(start.content_type, MAX_UPLOAD_BYTES, pcm_format)
+
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    return
+                if message.get("bytes") is not None:
+                    update = stream.append(message["bytes"])
+                    if update is not None:
+                        await websocket.send_json({"type": "features", **update})
+                elif control_message(message).get("type") == "end":
+                    break
+        except HTTPException as e:
+            await close_with_error(websocket, e.detail, 1003)
+            return
+        except (ValueError, StreamTooLarge) as e:
+            await close_with_error(websocket, str(e), 1009 if isinstance(e, StreamTooLarge) else 1003)
+            return
+
+        # The stream is complete: analyze right away, no upload step left
+        content, content_type = stream.payload()
+        try:
+            result = await analyze_content(content, content_type, start.user_id)
+        except CircuitOpenError:
+            await close_with_error(websocket, "Analysis temporarily unavailable. Please retry later.", 1013)
+            return
+        except Exception as e:
+            await close_with_error(websocket, f"Analysis failed: {e}", 1011)
+            return
+        await websocket.send_json({"type": "result", "result": result.model_dump()})
+        await websocket.close()
+    except WebSocketDisconnect:
+        return
+
+
+def control_message(message: dict) -> dict:
+    """The JSON object in a text WebSocket message. Raises ValueError for binary frames and other JSON."""
+    if message.get("text") is None:
+        raise ValueError("Expected a JSON text message")
+    control = json.loads(message["text"])
+    if not isinstance(control, dict):
+        raise ValueError("Control messages must be JSON objects")
+    return control
+
+
+async def close_with_error(websocket: WebSocket, detail: str, code: int):
+    await websocket.send_json({"type": "error", "detail": detail})
+    await websocket.close(code=code)
+
+
+UserId = Annotated[str, Path(pattern=USER_ID_PATTERN, description="Letters, digits, '-' and '_' (max 64)")]
+
+
+@app.post("/users/{user_id}/entries", response_model=EntryResponse)
+def record_entry(request: EntryRequest, user_id: UserId):
+    """Record a text energy log for a user.
+
+    Args:
+        request: Log text and optional vocal metrics.
+        user_id: User whose history the entry is added to.
 
+    Returns:
+        EntryResponse with the detected energy level.
+    """
+    if not request.text.strip():
+        raise HTTPException(status_code=400, detail="Text must not be blank")
+
+    metrics = request.metrics.model_dump(exclude_none=True)
+    with get_registry().session(user_id) as service:
+        energy_level = service.record_entry(request.text, metrics)
+    return EntryResponse(energy_level=energy_level.value)
+
+
+@app.get("/users/{user_id}/entries")
+def list_entries(user_id: UserId, limit: int = Query(default=50, ge=1, le=1000)):
+    """Most recent entries for a user, oldest first.
+
+    Args:
+        user_id: User whose history to read.
+        limit: Maximum number of entries to return.
+    """
+    with get_registry().session(user_id) as service:
+        return {"entries": service.storage.load_last(limit)}
+
+
+def etag_for(version: Optional[str], request: Request) -> Optional[str]:
+    """Strong ETag for a response derived from the user's data version and the query."""
+    if version is None:
+        return None
+    digest = hashlib.sha256(f"{version}?{request.url.query}".encode("utf-8")).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def cached_json(request: Request, etag: Optional[str], build: Callable[[], BaseModel]) -> Response:
+    """Returns 304 if the client already has this version, otherwise the JSON body with its ETag."""
+    headers = {"ETag": etag} if etag else {}
+    if etag and etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(build().model_dump(mode="json"), headers=headers)
+
+
+@app.get("/users/{user_id}/history", response_model=HistoryResponse)
+def user_history(request: Request, user_id: UserId,
+                 start: Optional[datetime] = None, end: Optional[datetime] = None,
+                 limit: int = Query(default=100, ge=1, le=1000), cursor: Optional[str] = None):
+    """A page of a user's entries in [start, end), oldest first.
+
+    Args:
+        user_id: User whose history to read.
+        start: Earliest timestamp to include.
+        end: Timestamp to stop before.
+        limit: Maximum number of entries per page.
+        cursor: `next_cursor` from the previous page.
+
+    Returns:
+        HistoryResponse with the page and the cursor for the next one. Supports
+        If-None-Match: unchanged data returns 304.
+    """
+    with get_registry().session(user_id) as service:
+        etag = etag_for(service.data_version(), request)
+
+        def build():
+            try:
+                entries, next_cursor = service.history(start, end, limit, cursor)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            return HistoryResponse(entries=entries, next_cursor=next_cursor)
+
+        return cached_json(request, etag, build)
+
+
+@app.get("/users/{user_id}/trend", response_model=TrendResponse)
+def user_trend(request: Request, user_id: UserId, resolution: Literal["hour", "day"] = "hour",
+               start: Optional[datetime] = None, end: Optional[datetime] = None):
+    """Hourly or daily min/mean/max of energy_score, from the user's precomputed rollups.
+
+    Args:
+        user_id: User whose trend to read.
+        resolution: Bucket size, "hour" or "day".
+        start: Earliest bucket to include.
+        end: Bucket start to stop before.
+
+    Returns:
+        TrendResponse with buckets oldest first. Supports If-None-Match:
+        unchanged data returns 304.
+    """
+    with get_registry().session(user_id) as service:
+        etag = etag_for(service.data_version(), request)
+        return cached_json(request, etag, lambda: TrendResponse(
+            resolution=resolution,
+            buckets=[TrendBucket(**bucket) for bucket in service.trend(resolution, start, end)],
+        ))
+
+
+@app.get("/users/{user_id}/feedback", response_model=FeedbackResponse)
+def user_feedback(user_id: UserId):
+    """Peak/dip insight for a user, computed from their aggregate index."""
+    with get_registry().session(user_id) as service:
+        return FeedbackResponse(feedback=service.get_feedback())
+
+
+@app.post("/users/{user_id}/schedule", response_model=ScheduleResponse)
+def schedule_tasks(request: ScheduleRequest, user_id: UserId):
+    """Arrange tasks into a user's peak and low energy windows.
+
+    Args:
+        request: Tasks (duration, focus demand, optional deadline) and planning horizon.
+        user_id: User whose energy forecast drives the schedule.
+
+    Returns:
+        ScheduleResponse with placed tasks and the names of tasks that did not fit.
+    """
+    if request.day_start >= request.day_end:
+        raise HTTPException(status_code=400, detail="day_start must be before day_end")
+
+    tasks = [Task(t.name, t.duration_minutes, t.focus, t.deadline) for t in request.tasks]
+    scheduler = EnergyScheduler(request.day_start, request.day_end)
+    with get_registry().session(user_id) as service:
+        plan = service.plan_schedule(tasks, request.start, request.days, scheduler)
+    return ScheduleResponse(
+        scheduled=[
+            ScheduledTaskResponse(name=item.task.name, start=item.start, end=item.end, energy=item.energy)
+            for item in plan.scheduled
+        ],
+        unscheduled=[task.name for task in plan.unscheduled],
+    )
+
+
+@app.get("/users/{user_id}/forecast", response_model=ForecastResponse)
+def forecast_energy(user_id: UserId):
+    """Predicted energy (0-100) for each hour of the week, served from the user's cached forecast.
+
+    Returns:
+        ForecastResponse with 168 values, Monday 00:00 first.
+    """
+    with get_registry().session(user_id) as service:
+        return ForecastResponse(curve=service.forecast())
 
 if __name__ == "__main__":
     import uvicorn
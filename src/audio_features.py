@@ -0,0 +1,324 @@
+"""
+Local vocal feature extraction for WAV / raw PCM audio.
+
+Computes, with NumPy only:
+- RMS loudness (dBFS)
+- pitch mean and variation, from per-frame autocorrelation
+- speaking rate, from syllable-like peaks in the loudness envelope
+- pause ratio, the share of frames below an adaptive silence threshold
+
+`to_metrics` turns these into the `pace` and `tone_valence` metrics that
+`EnergyAnalyzer.analyze` expects. `LocalAudioAnalyzer` combines the two and
+adds a confidence score, so callers can keep clear-cut clips local and send
+only ambiguous ones to the remote model.
+
+Audio is mixed down to mono and decimated to about 16 kHz before analysis.
+Pitch statistics use a sample of at most MAX_PITCH_FRAMES speech frames, so a
+30-second clip takes around ten milliseconds.
+"""
+
+import io
+import struct
+import wave
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from src.analyzer import EnergyAnalyzer
+from src.domain import EnergyLevel
+
+WAV_MIME_TYPES = ("audio/wav", "audio/x-wav", "audio/wave")
+
+ANALYSIS_RATE = 16000
+FRAME_SECONDS = 0.04  # Long enough for two periods of a 75 Hz voice
+HOP_SECONDS = 0.01
+MIN_PITCH_HZ = 75.0
+MAX_PITCH_HZ = 400.0
+VOICING_THRESHOLD = 0.3  # Normalized autocorrelation peak for a frame to count as voiced
+MAX_PITCH_FRAMES = 400  # Evenly spaced speech frames used for pitch statistics
+MIN_SYLLABLE_GAP_SECONDS = 0.1
+SYLLABLES_PER_WORD = 1.5
+
+# Cue ranges mapped linearly onto -1 (low energy) .. 1 (high energy)
+LOUDNESS_RANGE_DB = (-35.0, -15.0)
+PITCH_VARIATION_RANGE = (0.05, 0.25)  # Pitch standard deviation / mean
+PAUSE_RATIO_RANGE = (0.6, 0.15)  # More pauses = lower energy
+SYLLABLE_RATE_RANGE = (2.5, 5.5)  # Syllables per second of speech
+
+# Below this much speech a clip's confidence is scaled down
+MIN_SPEECH_SECONDS = 2.0
+DEFAULT_MIN_CONFIDENCE = 0.6
+
+
+@dataclass
+class AudioFeatures:
+    duration: float  # seconds
+    rms_db: float  # dBFS over non-silent frames
+    pitch_mean: float  # Hz, 0.0 if no voiced frames
+    pitch_std: float  # Hz
+    voiced_frames: int
+    syllable_rate: float  # syllable peaks per second of speech
+    pause_ratio: float  # 0..1
+
+
+@dataclass
+class LocalAnalysis:
+    energy_level: EnergyLevel
+    confidence: float
+    energy_score: int  # 0-100, same scale as the model's
+    metrics: Dict[str, Any]
+    features: AudioFeatures
+
+
+@dataclass
+class PcmFormat:
+    sample_rate: int
+    sample_width: int = 2  # bytes per sample
+    channels: int = 1
+
+
+def parse_wav_header(data: bytes) -> Optional[Tuple[PcmFormat, int]]:
+    """(format, offset of the sample data) from the start of a WAV stream, or None until enough has arrived.
+
+    Chunk sizes of the data chunk are ignored, so streams written before
+    their length was known (size 0 or 0xFFFFFFFF) are accepted.
+
+    Raises:
+        ValueError: If the data is not integer PCM WAV.
+    """
+    if len(data) < 12:
+        return None
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise ValueError("Not a WAV stream")
+    offset, fmt = 12, None
+    while len(data) >= offset + 8:
+        chunk_id, size = data[offset:offset + 4], struct.unpack_from("<I", data, offset + 4)[0]
+        body = offset + 8
+        if chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("WAV data chunk before its format chunk")
+            return fmt, body
+        if len(data) < body + size:
+            return None
+        if chunk_id == b"fmt ":
+            if size < 16:
+                raise ValueError("Truncated WAV format chunk")
+            tag, channels, rate, _, _, bits = struct.unpack_from("<HHIIHH", data, body)
+            if tag not in (1, 0xFFFE):  # PCM, or extensible (assumed PCM)
+                raise ValueError(f"Unsupported WAV encoding: {tag}")
+            # The same limits as a PCM stream's start message, so frame sizes are never zero
+            if not 1 <= channels <= 8 or rate <= 0 or bits not in (8, 16, 24, 32):
+                raise ValueError(f"Unsupported WAV format: {channels} channels, {rate} Hz, {bits}-bit")
+            fmt = PcmFormat(rate, bits // 8, channels)
+        offset = body + size + (size & 1)  # Chunks are word aligned
+    return None
+
+
+def pcm_to_wav(pcm: bytes, fmt: PcmFormat) -> bytes:
+    """Wraps raw PCM in a WAV container."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(fmt.channels)
+        wav.setsampwidth(fmt.sample_width)
+        wav.setframerate(fmt.sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+def decode_wav(data: bytes) -> Tuple[np.ndarray, int]:
+    """Decodes integer PCM WAV bytes to mono float samples in -1..1. Raises ValueError otherwise."""
+    try:
+        with wave.open(io.BytesIO(data), 'rb') as wav:
+            channels = wav.getnchannels()
+            width = wav.getsampwidth()
+            rate = wav.getframerate()
+            frames = wav.readframes(wav.getnframes())
+    except (wave.Error, EOFError) as e:
+        raise ValueError(f"Unsupported WAV data: {e}") from e
+    return decode_pcm(frames, rate, width, channels), rate
+
+
+def decode_pcm(data: bytes, sample_rate: int, sample_width: int = 2, channels: int = 1) -> np.ndarray:
+    """Decodes little-endian integer PCM (8-bit unsigned, 16/24/32-bit signed) to mono float samples."""
+    if sample_rate <= 0 or channels <= 0:
+        raise ValueError("Sample rate and channel count must be positive")
+    usable = len(data) - len(data) % (sample_width * channels)
+    raw = np.frombuffer(data, dtype=np.uint8, count=usable)
+
+    if sample_width == 1:
+        samples = (raw.astype(np.float32) - 128.0) / 128.0
+    elif sample_width == 2:
+        samples = raw.view("<i2").astype(np.float32) / 32768.0
+    elif sample_width == 3:
+        # Sign-extend 24-bit samples into int32
+        triples = raw.reshape(-1, 3).astype(np.int32)
+        values = triples[:, 0] | (triples[:, 1] << 8) | (triples[:, 2] << 16)
+        values = np.where(values >= 1 << 23, values - (1 << 24), values)
+        samples = values.astype(np.float32) / float(1 << 23)
+    elif sample_width == 4:
+        samples = raw.view("<i4").astype(np.float32) / float(1 << 31)
+    else:
+        raise ValueError(f"Unsupported sample width: {sample_width} bytes")
+
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return samples
+
+
+def _decimate(samples: np.ndarray, sample_rate: int) -> Tuple[np.ndarray, int]:
+    # Block averaging is a crude low-pass, good enough for envelope and pitch estimates
+    factor = round(sample_rate / ANALYSIS_RATE)
+    if factor < 2:
+        return samples, sample_rate
+    usable = len(samples) - len(samples) % factor
+    decimated = samples[0:usable:factor].copy()
+    for offset in range(1, factor):
+        decimated += samples[offset:usable:factor]
+    return decimated / factor, sample_rate // factor
+
+
+def _fft_length(n: int) -> int:
+    """Smallest 2^a * 3^b * 5^c >= n; FFTs of such sizes are much faster than prime ones."""
+    best = 1 << max(n - 1, 1).bit_length()
+    power5 = 1
+    while power5 < best:
+        power35 = power5
+        while power35 < best:
+            length = power35
+            while length < n:
+                length *= 2
+            best = min(best, length)
+            power35 *= 3
+        power5 *= 5
+    return best
+
+
+def _scale(value: float, bounds: Tuple[float, float]) -> float:
+    low, high = bounds
+    return float(np.clip(2.0 * (value - low) / (high - low) - 1.0, -1.0, 1.0))
+
+
+def extract_features(samples: np.ndarray, sample_rate: int) -> AudioFeatures:
+    """Vocal features of a mono clip. Raises ValueError if it is shorter than one frame."""
+    samples, rate = _decimate(np.asarray(samples, dtype=np.float32), sample_rate)
+    frame = int(FRAME_SECONDS * rate)
+    hop = int(HOP_SECONDS * rate)
+    if len(samples) < frame:
+        raise ValueError("Audio is too short to analyze")
+
+    frames = np.lib.stride_tricks.sliding_window_view(samples, frame)[::hop]
+    frames = frames - frames.mean(axis=1, keepdims=True)
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+
+    # Adaptive silence threshold: above the noise floor and a fraction of the loudest frame
+    threshold = max(np.percentile(rms, 10) * 2.0, rms.max() * 0.1, 1e-4)
+    speech = rms > threshold
+    pause_ratio = 1.0 - float(speech.mean())
+    rms_db = float(20.0 * np.log10(np.mean(rms[speech]) + 1e-12)) if speech.any() else -120.0
+
+    # Pitch: autocorrelation of a sample of speech frames at once via the FFT.
+    # Padding to frame + max_lag is enough to avoid wrap-around at the lags searched.
+    pitch_mean = pitch_std = 0.0
+    voiced_frames = 0
+    if speech.any():
+        candidates = np.flatnonzero(speech)
+        if len(candidates) > MAX_PITCH_FRAMES:
+            candidates = candidates[np.linspace(0, len(candidates) - 1, MAX_PITCH_FRAMES).astype(np.int64)]
+        min_lag = int(rate / MAX_PITCH_HZ)
+        max_lag = min(int(rate / MIN_PITCH_HZ), frame - 1)
+        n_fft = _fft_length(frame + max_lag + 1)
+        spectrum = np.fft.rfft(frames[candidates], n=n_fft, axis=1)
+        autocorr = np.fft.irfft(spectrum * np.conj(spectrum), n=n_fft, axis=1)
+        window = autocorr[:, min_lag:max_lag + 1]
+        lags = np.argmax(window, axis=1) + min_lag
+        strength = window.max(axis=1) / (autocorr[:, 0] + 1e-12)
+        pitches = rate / lags[strength > VOICING_THRESHOLD]
+        voiced_frames = len(pitches)
+        if voiced_frames:
+            pitch_mean = float(pitches.mean())
+            pitch_std = float(pitches.std())
+
+    # Speaking rate: peaks of the smoothed envelope, at least MIN_SYLLABLE_GAP_SECONDS apart
+    envelope = np.convolve(rms, np.ones(5) / 5, mode="same")
+    peaks = np.flatnonzero(
+        (envelope[1:-1] > envelope[:-2]) & (envelope[1:-1] >= envelope[2:]) & (envelope[1:-1] > threshold)
+    ) + 1
+    min_gap = int(MIN_SYLLABLE_GAP_SECONDS / HOP_SECONDS)
+    syllables, last = 0, -min_gap
+    for peak in peaks.tolist():
+        if peak - last >= min_gap:
+            syllables += 1
+            last = peak
+    speech_seconds = float(speech.sum()) * HOP_SECONDS
+
+    return AudioFeatures(
+        duration=len(samples) / rate,
+        rms_db=rms_db,
+        pitch_mean=pitch_mean,
+        pitch_std=pitch_std,
+        voiced_frames=voiced_frames,
+        syllable_rate=syllables / speech_seconds if speech_seconds else 0.0,
+        pause_ratio=pause_ratio,
+    )
+
+
+def _cues(features: AudioFeatures) -> np.ndarray:
+    """Loudness, pitch variation, pausing and speaking rate, each scaled to -1..1."""
+    pitch_variation = features.pitch_std / features.pitch_mean if features.pitch_mean else 0.0
+    return np.array([
+        _scale(features.rms_db, LOUDNESS_RANGE_DB),
+        _scale(pitch_variation, PITCH_VARIATION_RANGE),
+        _scale(features.pause_ratio, PAUSE_RATIO_RANGE),
+        _scale(features.syllable_rate, SYLLABLE_RATE_RANGE),
+    ])
+
+
+def to_metrics(features: AudioFeatures) -> Dict[str, Any]:
+    """Metrics for `EnergyAnalyzer.analyze`, plus the raw features.
+
+    `pace` is the speaking rate in words per minute. `tone_valence` is a
+    prosodic proxy, from -1 (quiet, flat, hesitant) to 1 (loud, animated,
+    fluent).
+    """
+    loudness, pitch, pauses, _ = _cues(features)
+    return {
+        "pace": round(features.syllable_rate * 60.0 / SYLLABLES_PER_WORD, 1),
+        "tone_valence": round(float(np.mean([loudness, pitch, pauses])), 3),
+        **{key: round(value, 3) if isinstance(value, float) else value for key, value in asdict(features).items()},
+    }
+
+
+class LocalAudioAnalyzer:
+    """Energy analysis of WAV/PCM clips without a network call."""
+
+    def __init__(self, analyzer: Optional[EnergyAnalyzer] = None, min_confidence: float = DEFAULT_MIN_CONFIDENCE):
+        self.analyzer = analyzer or EnergyAnalyzer()
+        self.min_confidence = min_confidence
+
+    def analyze_wav(self, data: bytes) -> LocalAnalysis:
+        samples, rate = decode_wav(data)
+        return self.analyze_samples(samples, rate)
+
+    def analyze_samples(self, samples: np.ndarray, sample_rate: int) -> LocalAnalysis:
+        features = extract_features(samples, sample_rate)
+        metrics = to_metrics(features)
+        cues = _cues(features)
+
+        # Confident when there is enough speech and the cues agree with each other
+        speech_seconds = features.duration * (1.0 - features.pause_ratio)
+        quality = min(1.0, speech_seconds / MIN_SPEECH_SECONDS)
+        if features.voiced_frames < 10:
+            quality *= 0.5
+        agreement = 1.0 - float(np.std(cues))
+
+        return LocalAnalysis(
+            energy_level=self.analyzer.analyze("", metrics),
+            confidence=round(max(0.0, quality * agreement), 3),
+            energy_score=int(round(50 + 50 * float(np.mean(cues)))),
+            metrics=metrics,
+            features=features,
+        )
+
+    def is_confident(self, analysis: LocalAnalysis) -> bool:
+        return analysis.confidence >= self.min_confidence
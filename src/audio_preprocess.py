@@ -0,0 +1,110 @@
+"""
+Audio preparation before upload to the model.
+
+- The container is detected from the data's magic bytes, so the model gets
+  the right MIME type whatever the upload was labelled.
+- Uncompressed WAV is reduced to what speech analysis needs: leading and
+  trailing silence is trimmed, channels are mixed down to mono, the audio is
+  resampled to 16 kHz and re-encoded as 16-bit PCM.
+- Compressed formats (WebM, Ogg, MP3, ...) are passed through unchanged.
+  Re-encoding them would need a codec library, and they are already small.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from src.audio_features import PcmFormat, decode_wav, pcm_to_wav
+
+TARGET_RATE = 16000
+SILENCE_FRAME_SECONDS = 0.02
+SILENCE_MARGIN_SECONDS = 0.2  # Kept around speech so onsets and decays are not clipped
+SILENCE_RELATIVE_THRESHOLD = 0.05  # Frame RMS below this share of the loudest frame is silence
+SILENCE_FLOOR = 1e-3
+
+# (offset, magic bytes, MIME type)
+_SIGNATURES = (
+    (0, b"\x1a\x45\xdf\xa3", "audio/webm"),  # EBML (WebM/Matroska)
+    (0, b"OggS", "audio/ogg"),
+    (0, b"fLaC", "audio/flac"),
+    (0, b"ID3", "audio/mpeg"),
+    (4, b"ftyp", "audio/mp4"),
+)
+
+
+@dataclass
+class PreparedAudio:
+    data: bytes
+    mime_type: str
+    original_bytes: int
+    trimmed_seconds: float = 0.0
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.original_bytes - len(self.data)
+
+
+def detect_mime_type(data: bytes) -> Optional[str]:
+    """The audio container's MIME type from its magic bytes, or None if unrecognized."""
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        return "audio/wav"
+    for offset, magic, mime_type in _SIGNATURES:
+        if data[offset:offset + len(magic)] == magic:
+            return mime_type
+    if len(data) >= 2 and data[0] == 0xFF and data[1] & 0xE0 == 0xE0:
+        return "audio/mpeg"  # MPEG audio frame sync without an ID3 tag
+    return None
+
+
+def resample(samples: np.ndarray, rate: int, target: int = TARGET_RATE) -> np.ndarray:
+    """Downsamples to `target` Hz (never upsamples): moving-average low-pass, then linear interpolation."""
+    if rate <= target or not len(samples):
+        return samples
+    ratio = rate / target
+    width = int(np.ceil(ratio))
+    smoothed = np.convolve(samples, np.ones(width, dtype=np.float32) / width, mode="same")
+    positions = np.arange(int(len(samples) / ratio)) * ratio
+    return np.interp(positions, np.arange(len(samples)), smoothed).astype(np.float32)
+
+
+def trim_silence(samples: np.ndarray, rate: int) -> np.ndarray:
+    """Drops leading and trailing silence, keeping a short margin. All-silent clips are returned as is."""
+    frame = max(1, int(SILENCE_FRAME_SECONDS * rate))
+    n_frames = len(samples) // frame
+    if n_frames == 0:
+        return samples
+    rms = np.sqrt(np.mean(samples[:n_frames * frame].reshape(n_frames, frame) ** 2, axis=1))
+    loud = np.flatnonzero(rms > max(rms.max() * SILENCE_RELATIVE_THRESHOLD, SILENCE_FLOOR))
+    if not len(loud):
+        return samples
+    margin = int(SILENCE_MARGIN_SECONDS * rate)
+    start = max(0, loud[0] * frame - margin)
+    end = min(len(samples), (loud[-1] + 1) * frame + margin)
+    return samples[start:end]
+
+
+def prepare_audio(data: bytes, declared_mime_type: Optional[str] = None,
+                  target_rate: int = TARGET_RATE) -> PreparedAudio:
+    """Audio ready for upload, with its real MIME type.
+
+    WAV that cannot be decoded (e.g. float samples) is sent unchanged.
+    """
+    mime_type = detect_mime_type(data) or declared_mime_type or "audio/webm"
+    if mime_type != "audio/wav":
+        return PreparedAudio(data, mime_type, len(data))
+
+    try:
+        samples, rate = decode_wav(data)
+    except ValueError:
+        return PreparedAudio(data, mime_type, len(data))
+
+    trimmed = trim_silence(samples, rate)
+    resampled = resample(trimmed, rate, target_rate)
+    out_rate = min(rate, target_rate)
+    pcm = (np.clip(resampled, -1.0, 1.0) * 32767.0).astype("<i2").tobytes()
+    prepared = pcm_to_wav(pcm, PcmFormat(out_rate, 2, 1))
+    if len(prepared) >= len(data):
+        # Already compact (e.g. 8 kHz 8-bit mono): nothing to gain
+        return PreparedAudio(data, mime_type, len(data))
+    return PreparedAudio(prepared, mime_type, len(data), (len(samples) - len(trimmed)) / rate)
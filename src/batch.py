@@ -0,0 +1,58 @@
+"""
+Bounded worker pool for analyzing many recordings at once.
+
+Used by the `/analyze/batch` endpoint and the CLI batch mode. Results are
+yielded as each item completes (not in input order), so callers can stream
+them back immediately instead of waiting for the whole batch.
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Optional, Tuple, TypeVar
+
+from src.defaults import DEFAULT_BATCH_WORKERS
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_DONE = object()
+
+
+async def run_batch(items: Iterable[T], worker: Callable[[T], Awaitable[R]],
+                    max_workers: int = DEFAULT_BATCH_WORKERS
+                    ) -> AsyncIterator[Tuple[int, T, Optional[R], Optional[Exception]]]:
+    """Runs `worker` over `items` with at most `max_workers` in flight.
+
+    Yields:
+        (index, item, result, error) per item in completion order; exactly one
+        of result/error is set. A failing item never stops the rest of the batch.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    pending = enumerate(items)
+
+    async def drain():
+        # Workers share one iterator; next() never awaits, so no item is taken twice.
+        try:
+            for index, item in pending:
+                try:
+                    result = await worker(item)
+                except Exception as e:
+                    queue.put_nowait((index, item, None, e))
+                else:
+                    queue.put_nowait((index, item, result, None))
+        finally:
+            queue.put_nowait(_DONE)
+
+    workers = [asyncio.ensure_future(drain()) for _ in range(max(1, max_workers))]
+    try:
+        running = len(workers)
+        while running:
+            outcome: Any = await queue.get()
+            if outcome is _DONE:
+                running -= 1
+                continue
+            yield outcome
+    finally:
+        # The consumer may stop early (e.g. client disconnected): stop the pool.
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
@@ -0,0 +1,296 @@
+"""
+Bulk import and export of energy histories.
+
+Imports stream JSONL or CSV one row at a time. Each row is validated and
+normalized, then checked against a set of 16-byte digests of the entries
+already stored or imported, so duplicates are dropped. New entries are
+written through `EnergyService.record_entries` in large batches (one
+storage write each), and the derived indexes stay current. Memory use is
+bounded by the batch size plus the digest set.
+
+Exports stream `IStorage.iter_entries` to JSONL (entries as stored) or CSV
+(flat columns). There is also a columnar NumPy `.npz` export, for fast
+offline analysis, built from `IStorage.load_compact`, with typed arrays:
+
+    timestamp      int64    seconds since the epoch of the wall-clock time as written
+                            (read as UTC, so hours of day are preserved)
+    level          int8     0 = low, 1 = medium, 2 = high, -1 = unknown
+    score          float32  energy_score (NaN when missing)
+    pace           float32  words per minute (NaN when missing)
+    tone_valence   float32  -1..1 (NaN when missing)
+    confidence     float32  0..1 (NaN when missing)
+
+CSV columns: timestamp, energy_level, energy_score, confidence, source,
+text, pace, tone_valence. Empty cells count as missing. A row needs a
+timestamp, plus either an energy_level or a text to analyze.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional, Tuple, Union
+
+from src.domain import LEVEL_CODES, NO_TIMESTAMP, EntryTable
+from src.interfaces import IEnergyAnalyzer, IStorage
+
+FORMATS = ("jsonl", "csv", "npz")
+CSV_FIELDS = ("timestamp", "energy_level", "energy_score", "confidence", "source", "text", "pace", "tone_valence")
+
+DEFAULT_BATCH_SIZE = 5000
+MAX_TEXT_LENGTH = 5000
+MAX_REPORTED_ERRORS = 20
+
+
+@dataclass
+class ImportStats:
+    read: int = 0
+    imported: int = 0
+    duplicates: int = 0
+    rejected: int = 0
+    errors: List[str] = field(default_factory=list)  # The first MAX_REPORTED_ERRORS rejections
+
+    def reject(self, line: int, reason: str):
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"line {line}: {reason}")
+
+
+def format_for(path: str, fmt: Optional[str] = None) -> str:
+    """The explicit format, or the one implied by the file extension (default jsonl)."""
+    if fmt:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format: {fmt}. Supported: {FORMATS}")
+        return fmt
+    ext = os.path.splitext(path)[1].lower().lstrip(".")
+    return {"csv": "csv", "npz": "npz"}.get(ext, "jsonl")
+
+
+# -- Parsing and validation ----------------------------------------------------
+
+Row = Tuple[int, Union[Dict[str, Any], ValueError]]
+
+
+def read_jsonl(stream: IO[str]) -> Iterator[Row]:
+    """(line number, object or ValueError) per non-blank line."""
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield number, ValueError(f"invalid JSON ({e.msg})")
+            continue
+        yield number, record if isinstance(record, dict) else ValueError("not a JSON object")
+
+
+def read_csv(stream: IO[str]) -> Iterator[Row]:
+    """(line number, row dict without empty cells) per data row."""
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield reader.line_num, {key: value for key, value in row.items() if key and value not in (None, "")}
+
+
+def _number(value: Any, name: str, low: float, high: float) -> float:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a number") from None
+    if not low <= number <= high:
+        raise ValueError(f"{name} must be between {low:g} and {high:g}")
+    return number
+
+
+def _timestamp(value: Any) -> str:
+    """Naive local ISO timestamp, as stored by the app, from ISO text or epoch seconds."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        try:
+            dt = datetime.fromtimestamp(value)
+        except (OverflowError, OSError, ValueError):  # Out of range or NaN
+            raise ValueError(f"invalid timestamp: {value!r}") from None
+    elif isinstance(value, str):
+        try:
+            dt = datetime.fromisoformat(value)
+        except ValueError:
+            raise ValueError(f"invalid timestamp: {value[:40]!r}") from None
+    else:
+        raise ValueError("timestamp is required")
+    if dt.tzinfo is not None:
+        dt = dt.astimezone().replace(tzinfo=None)  # e.g. the PWA's UTC "...Z" timestamps
+    return dt.isoformat()
+
+
+def normalize_entry(raw: Dict[str, Any], analyzer: Optional[IEnergyAnalyzer] = None) -> Dict[str, Any]:
+    """A validated entry in the stored shape. Raises ValueError describing the first problem."""
+    entry: Dict[str, Any] = {"timestamp": _timestamp(raw.get("timestamp"))}
+
+    text = raw.get("text")
+    if text is not None:
+        if not isinstance(text, str):
+            raise ValueError("text must be a string")
+        if len(text) > MAX_TEXT_LENGTH:
+            raise ValueError(f"text too long (limit {MAX_TEXT_LENGTH} chars)")
+        entry["text"] = text
+
+    raw_metrics = raw.get("metrics")
+    if raw_metrics is not None and not isinstance(raw_metrics, dict):
+        raise ValueError("metrics must be an object")
+    raw_metrics = dict(raw_metrics or {})
+    for name in ("pace", "tone_valence"):
+        if name in raw:  # Flat CSV columns
+            raw_metrics[name] = raw[name]
+    metrics = dict(raw_metrics)
+    if raw_metrics.get("pace") is not None:
+        metrics["pace"] = _number(raw_metrics["pace"], "pace", 1e-9, 1000)
+    if raw_metrics.get("tone_valence") is not None:
+        metrics["tone_valence"] = _number(raw_metrics["tone_valence"], "tone_valence", -1.0, 1.0)
+    if metrics or "text" in entry:
+        entry["metrics"] = metrics
+
+    if raw.get("source") is not None:
+        entry["source"] = str(raw["source"])
+
+    level = raw.get("energy_level")
+    if level is not None:
+        level = str(level).lower()
+        if level not in LEVEL_CODES:
+            raise ValueError(f"unknown energy_level: {level[:20]!r}")
+    elif text and analyzer is not None:
+        level = analyzer.analyze(text, metrics).value
+    else:
+        raise ValueError("energy_level or text is required")
+    entry["energy_level"] = level
+
+    if raw.get("energy_score") is not None:
+        entry["energy_score"] = int(round(_number(raw["energy_score"], "energy_score", 0, 100)))
+    if raw.get("confidence") is not None:
+        entry["confidence"] = _number(raw["confidence"], "confidence", 0.0, 1.0)
+    if isinstance(raw.get("indicators"), dict):
+        entry["indicators"] = raw["indicators"]
+    return entry
+
+
+def _canonical(value: Any) -> Any:
+    # 130 and 130.0 are the same pace, whichever way the row spelled it
+    if isinstance(value, dict):
+        return {key: _canonical(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_canonical(item) for item in value]
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return value
+
+
+def entry_digest(entry: Dict[str, Any]) -> bytes:
+    """Content digest of an entry, independent of key order and int/float spelling."""
+    canonical = json.dumps(_canonical(entry), sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).digest()
+
+
+# -- Import --------------------------------------------------------------------
+
+def import_rows(service, rows: Iterable[Row], batch_size: int = DEFAULT_BATCH_SIZE) -> ImportStats:
+    """Validates, deduplicates and stores rows through `service`, `batch_size` entries per write."""
+    stats = ImportStats()
+    seen = {entry_digest(entry) for entry in service.storage.iter_entries()}
+    batch: List[Dict] = []
+    for number, raw in rows:
+        stats.read += 1
+        if isinstance(raw, ValueError):
+            stats.reject(number, str(raw))
+            continue
+        try:
+            entry = normalize_entry(raw, service.analyzer)
+        except ValueError as e:
+            stats.reject(number, str(e))
+            continue
+        digest = entry_digest(entry)
+        if digest in seen:
+            stats.duplicates += 1
+            continue
+        seen.add(digest)
+        batch.append(entry)
+        if len(batch) >= batch_size:
+            service.record_entries(batch)
+            stats.imported += len(batch)
+            batch = []
+    if batch:
+        service.record_entries(batch)
+        stats.imported += len(batch)
+    return stats
+
+
+def import_file(service, path: str, fmt: Optional[str] = None, batch_size: int = DEFAULT_BATCH_SIZE) -> ImportStats:
+    """Imports a JSONL or CSV file ("-" for stdin)."""
+    fmt = format_for(path, fmt)
+    if fmt == "npz":
+        raise ValueError("npz is an export-only format")
+    reader = read_csv if fmt == "csv" else read_jsonl
+    if path == "-":
+        return import_rows(service, reader(sys.stdin), batch_size)
+    with open(path, "r", encoding="utf-8", newline="" if fmt == "csv" else None) as f:
+        return import_rows(service, reader(f), batch_size)
+
+
+# -- Export --------------------------------------------------------------------
+
+def write_jsonl(entries: Iterable[Dict], stream: IO[str]) -> int:
+    count = 0
+    for entry in entries:
+        stream.write(json.dumps(entry, separators=(',', ':')) + "\n")
+        count += 1
+    return count
+
+
+def write_csv(entries: Iterable[Dict], stream: IO[str]) -> int:
+    """Flat CSV; indicators are not exported."""
+    writer = csv.DictWriter(stream, CSV_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    count = 0
+    for entry in entries:
+        metrics = entry.get("metrics") or {}
+        writer.writerow({**entry, "pace": metrics.get("pace"), "tone_valence": metrics.get("tone_valence")})
+        count += 1
+    return count
+
+
+def to_columns(table: EntryTable) -> Dict[str, Any]:
+    """Typed NumPy arrays (see module docstring); entries without a readable timestamp are skipped."""
+    import numpy as np
+
+    timestamps = np.frombuffer(table.timestamps, dtype=np.int64)
+    keep = timestamps != NO_TIMESTAMP
+    columns = {"timestamp": timestamps[keep] // 1_000_000, "level": np.frombuffer(table.levels, dtype=np.int8)[keep]}
+    for name, column in (("score", table.scores), ("pace", table.paces),
+                         ("tone_valence", table.tone_valences), ("confidence", table.confidences)):
+        columns[name] = np.frombuffer(column, dtype=np.float32)[keep]
+    return columns
+
+
+def export_file(storage: IStorage, path: str, fmt: Optional[str] = None) -> int:
+    """Exports every entry to a file ("-" for stdout, except npz). Returns the number of entries written."""
+    fmt = format_for(path, fmt)
+    if fmt == "npz":
+        import numpy as np
+
+        if path == "-":
+            raise ValueError("npz export needs a file path")
+        columns = to_columns(storage.load_compact())
+        # Written under a temporary name (np.savez adds .npz), so a reader never sees a partial file
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, **columns)
+        os.replace(tmp_path, path)
+        return len(columns["timestamp"])
+
+    writer = write_csv if fmt == "csv" else write_jsonl
+    entries = storage.iter_entries()
+    if path == "-":
+        return writer(entries, sys.stdout)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline="" if fmt == "csv" else None) as f:
+        count = writer(entries, f)
+    os.replace(tmp_path, path)
+    return count
@@ -0,0 +1,172 @@
+"""
+Content-addressed cache for audio analysis results.
+
+Keys are a SHA-256 of the audio bytes plus the model name and prompt version,
+so resubmitting the same recording is answered without another model call,
+while a model or prompt change naturally invalidates old results.
+
+Two tiers:
+- an in-process LRU of serialized results, and
+- an optional on-disk tier (one JSON file per key) with a TTL and a total
+  size budget; the least recently written files are evicted first.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_DISK_BYTES = 50 * 1024 * 1024
+
+
+class AnalysisCache:
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, cache_dir: Optional[str] = None,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS, max_disk_bytes: int = DEFAULT_MAX_DISK_BYTES):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._disk_bytes = 0
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._disk_bytes = sum(size for _, _, size in self._disk_files())
+
+    @staticmethod
+    def key_for(audio: bytes, model_name: str, prompt_version: str) -> str:
+        digest = hashlib.sha256()
+        digest.update(model_name.encode("utf-8") + b"\0" + prompt_version.encode("utf-8") + b"\0")
+        digest.update(audio)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            item = self._memory.get(key)
+            if item is not None:
+                stored_at, value = item
+                if now - stored_at <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._memory[key]
+
+        value = self._disk_get(key, now)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._remember(key, value, now)
+        return value
+
+    def put(self, key: str, value: str):
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+        self._disk_put(key, value)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_bytes": self._disk_bytes,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        for path, _, _ in self._disk_files():
+            self._remove(path)
+
+    # -- Memory tier ---------------------------------------------------------
+
+    def _remember(self, key: str, value: str, now: float):
+        self._memory[key] = (now, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    # -- Disk tier -----------------------------------------------------------
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _disk_files(self):
+        """Yields (path, mtime, size) for every cached file."""
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            yield path, st.st_mtime, st.st_size
+
+    def _remove(self, path: str):
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            return
+        with self._lock:
+            self._disk_bytes = max(0, self._disk_bytes - size)
+
+    def _disk_get(self, key: str, now: float) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        try:
+            if now - os.path.getmtime(path) > self.ttl_seconds:
+                self._remove(path)
+                return None
+            with open(path, 'r') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _disk_put(self, key: str, value: str):
+        if not self.cache_dir:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(value)
+        try:
+            replaced = os.path.getsize(path)  # Rewriting a key does not add its size twice
+        except FileNotFoundError:
+            replaced = 0
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._disk_bytes = max(0, self._disk_bytes + len(value.encode("utf-8")) - replaced)
+            over_budget = self._disk_bytes > self.max_disk_bytes
+        if over_budget:
+            self._evict_disk()
+
+    def _evict_disk(self):
+        files = sorted(self._disk_files(), key=lambda item: item[1])
+        total = sum(size for _, _, size in files)
+        now = time.time()
+        for path, mtime, size in files:
+            if total <= self.max_disk_bytes and now - mtime <= self.ttl_seconds:
+                break
+            self._remove(path)
+            total -= size
+        with self._lock:
+            self._disk_bytes = total
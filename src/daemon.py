@@ -0,0 +1,262 @@
+"""
+Long-lived local daemon for the VocalPoint CLI.
+
+Each `python -m src.main` run used to import everything, re-read the whole
+history and rebuild its indexes. The daemon keeps one `EnergyService` per
+(working directory, storage backend, user) open. Its storage cache,
+aggregates and forecast stay warm, and the CLI becomes a thin client that
+sends one request over a Unix socket.
+
+The protocol is JSON lines. A request is an object with an "op" plus
+parameters:
+
+    {"op": "record", "cwd": "/home/me", "storage": "json", "user": "default",
+     "text": "Feeling great", "metrics": {"pace": 130, "tone_valence": 0.0}, "days": 7}
+
+The reply is {"ok": true, ...} or {"ok": false, "error": "..."}. The ops are
+ping, record, record_many, feedback, clear, rebuild, import, export and
+shutdown. Import and export take an absolute "path" (see src/bulk.py).
+
+    python -m src.daemon            # run in the foreground
+    python -m src.daemon --status
+    python -m src.daemon --stop
+
+Requests are handled one at a time, because EnergyService is not
+thread-safe. While the daemon runs, all CLI writes should go through it.
+Writes made directly to the same files by other processes are not seen
+until the daemon restarts.
+"""
+
+import argparse
+import json
+import logging
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from src.defaults import DEFAULT_USER
+
+logger = logging.getLogger(__name__)
+
+SOCKET_ENV = "VOCALPOINT_SOCKET"
+DEFAULT_TIMEOUT = 30.0
+MAX_REQUEST_BYTES = 64 * 1024 * 1024  # A bulk record_many request
+
+
+def default_socket_path() -> str:
+    """$VOCALPOINT_SOCKET, or a per-user socket in the temp directory."""
+    return os.environ.get(SOCKET_ENV) or os.path.join(tempfile.gettempdir(), f"vocalpoint-{os.getuid()}.sock")
+
+
+class DaemonUnavailable(ConnectionError):
+    """No daemon is listening on the socket."""
+
+
+class DaemonError(RuntimeError):
+    """The daemon rejected or failed a request."""
+
+
+def handle(service, request: Dict[str, Any]) -> Dict[str, Any]:
+    """Runs one request against an EnergyService. Used by the daemon and by the CLI when no daemon runs.
+
+    Raises:
+        ValueError: For an unknown op.
+        KeyError: If a required parameter is missing.
+    """
+    op = request.get("op")
+    days = request.get("days")
+    since = datetime.now() - timedelta(days=days) if days else None
+
+    if op == "record":
+        level = service.record_entry(request["text"], request.get("metrics") or {})
+        response = {"energy_level": level.value}
+        if request.get("feedback", True):
+            response["feedback"] = service.get_feedback(since)
+        return response
+    if op == "record_many":
+        logs = [(log["text"], log.get("metrics") or {}) for log in request["logs"]]
+        return {"energy_levels": [level.value for level in service.record_logs(logs)]}
+    if op == "feedback":
+        return {"feedback": service.get_feedback(since)}
+    if op == "clear":
+        service.clear_history()
+        return {}
+    if op == "rebuild":
+        return {"count": service.rebuild_aggregates()}
+    if op == "import":
+        from src.bulk import import_file
+        stats = import_file(service, request["path"], request.get("format"))
+        return {"read": stats.read, "imported": stats.imported, "duplicates": stats.duplicates,
+                "rejected": stats.rejected, "errors": stats.errors}
+    if op == "export":
+        from src.bulk import export_file
+        return {"count": export_file(service.storage, request["path"], request.get("format"))}
+    raise ValueError(f"Unknown op: {op}")
+
+
+ServiceKey = Tuple[str, str, str]
+
+
+class EnergyDaemon:
+    def __init__(self, socket_path: Optional[str] = None, factory: Optional[Callable[..., Any]] = None):
+        if factory is None:
+            from src.main import build_service
+            factory = build_service
+        self.socket_path = socket_path or default_socket_path()
+        self.factory = factory
+        self.services: Dict[ServiceKey, Any] = {}
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server: Optional[socketserver.UnixStreamServer] = None
+
+    def service_for(self, request: Dict[str, Any]):
+        key = (request.get("cwd") or os.getcwd(), request.get("storage", "json"), request.get("user", DEFAULT_USER))
+        service = self.services.get(key)
+        if service is None:
+            service = self.services[key] = self.factory(key[1], key[2], root=key[0])
+        return service
+
+    def dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        op = request.get("op")
+        if op == "ping":
+            return {"ok": True, "pid": os.getpid(), "services": len(self.services), "requests": self.requests}
+        if op == "shutdown":
+            # shutdown() waits for serve_forever to return, so it cannot run on a handler thread's behalf inline
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return {"ok": True}
+        try:
+            with self._lock:
+                self.requests += 1
+                return {"ok": True, **handle(self.service_for(request), request)}
+        except (ValueError, KeyError, TypeError, OSError) as e:
+            return {"ok": False, "error": str(e) or type(e).__name__}
+        except Exception as e:
+            logger.exception("Request %s failed", op)
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+    def bind(self):
+        """Creates the socket, replacing a stale one. Raises DaemonError if a daemon is already running."""
+        if os.path.exists(self.socket_path):
+            try:
+                DaemonClient(self.socket_path, timeout=1.0).request("ping")
+            except DaemonUnavailable:
+                os.remove(self.socket_path)  # Left behind by a daemon that died
+            else:
+                raise DaemonError(f"A daemon is already running on {self.socket_path}")
+
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    try:
+                        request = json.loads(line)
+                        response = daemon.dispatch(request) if isinstance(request, dict) else \
+                            {"ok": False, "error": "Request must be a JSON object"}
+                    except json.JSONDecodeError as e:
+                        response = {"ok": False, "error": f"Invalid JSON: {e}"}
+                    self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+                    self.wfile.flush()
+
+        class Server(socketserver.ThreadingUnixStreamServer):
+            daemon_threads = True
+
+        old_umask = os.umask(0o177)  # The socket is only for this user
+        try:
+            self._server = Server(self.socket_path, Handler)
+        finally:
+            os.umask(old_umask)
+
+    def serve_forever(self):
+        if self._server is None:
+            self.bind()
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+            for service in self.services.values():
+                close = getattr(service.storage, "close", None)
+                if close is not None:
+                    close()
+
+    def shutdown(self):
+        if self._server is not None:
+            self._server.shutdown()
+
+
+class DaemonClient:
+    def __init__(self, socket_path: Optional[str] = None, timeout: Optional[float] = DEFAULT_TIMEOUT):
+        """`timeout` is in seconds per socket operation; None blocks until the daemon replies."""
+        self.socket_path = socket_path or default_socket_path()
+        self.timeout = timeout
+
+    def request(self, op: str, **params) -> Dict[str, Any]:
+        """Sends one request and returns the reply.
+
+        Raises:
+            DaemonUnavailable: If no daemon is listening.
+            DaemonError: If the daemon rejected or failed the request.
+        """
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            try:
+                sock.connect(self.socket_path)
+            except (FileNotFoundError, ConnectionRefusedError) as e:
+                raise DaemonUnavailable(f"No daemon on {self.socket_path}") from e
+            with sock.makefile("rwb") as stream:
+                stream.write(json.dumps({"op": op, **params}).encode("utf-8") + b"\n")
+                stream.flush()
+                line = stream.readline(MAX_REQUEST_BYTES)
+        finally:
+            sock.close()
+        if not line:
+            raise DaemonUnavailable("The daemon closed the connection")
+        response = json.loads(line)
+        if not response.pop("ok", False):
+            raise DaemonError(response.get("error", "Request failed"))
+        return response
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="VocalPoint daemon: keeps the energy history warm for the CLI")
+    parser.add_argument("--socket", default=None, help=f"Unix socket path (default ${SOCKET_ENV} or a temp file)")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--status", action="store_true", help="Report whether a daemon is running and exit")
+    group.add_argument("--stop", action="store_true", help="Stop the running daemon and exit")
+    args = parser.parse_args(argv)
+
+    client = DaemonClient(args.socket, timeout=5.0)
+    if args.status or args.stop:
+        try:
+            info = client.request("shutdown" if args.stop else "ping")
+        except DaemonUnavailable:
+            print("💤 No VocalPoint daemon is running.")
+            sys.exit(1)
+        print("🛑 Daemon stopped." if args.stop else
+              f"✅ Daemon running (pid {info['pid']}, {info['requests']} requests served) on {client.socket_path}")
+        return
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    daemon = EnergyDaemon(args.socket)
+    try:
+        daemon.bind()
+    except (DaemonError, OSError) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+    print(f"🚀 VocalPoint daemon listening on {daemon.socket_path}", flush=True)
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+"""
+Default file names and settings shared by the storage backends, the CLI and the API.
+
+Kept free of imports so the thin CLI client (src/main.py) can use them
+without loading any storage or analysis code.
+"""
+
+LOG_FILE = "energy_log.json"
+DEFAULT_USER = "default"
+DEFAULT_BATCH_WORKERS = 4  # Recordings analyzed concurrently in a batch
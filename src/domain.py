@@ -1,15 +1,165 @@
+import array
+import math
 from enum import Enum
-from dataclasses import dataclass
-from typing import Dict, Optional
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, Optional
 
 class EnergyLevel(Enum):
     HIGH = "high"
     MEDIUM = "medium"
     LOW = "low"
 
-@dataclass
+# Compact level codes, ordered low to high; -1 is an unknown level
+LEVEL_CODES = {EnergyLevel.LOW.value: 0, EnergyLevel.MEDIUM.value: 1, EnergyLevel.HIGH.value: 2}
+LEVELS = (EnergyLevel.LOW, EnergyLevel.MEDIUM, EnergyLevel.HIGH)
+UNKNOWN_LEVEL = -1
+
+# Timestamps are integer microseconds since the epoch of the entry's wall-clock
+# time (as written, ignoring any UTC offset), so hour and weekday are plain
+# integer arithmetic. NO_TIMESTAMP marks an entry whose timestamp could not be
+# read: it counts towards totals but not towards any hour.
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+US_PER_HOUR = 3_600_000_000
+US_PER_DAY = 24 * US_PER_HOUR
+NO_TIMESTAMP = -2 ** 63
+NAN = float("nan")
+
+
+def to_epoch_us(timestamp: str) -> int:
+    """Wall-clock microseconds since the epoch of an ISO timestamp. Raises ValueError or TypeError."""
+    dt = datetime.fromisoformat(timestamp).replace(tzinfo=None)
+    return (dt - EPOCH) // MICROSECOND
+
+
+def from_epoch_us(value: int) -> str:
+    return (EPOCH + value * MICROSECOND).isoformat()
+
+
+def _float(value: Any) -> float:
+    try:
+        return NAN if value is None else float(value)
+    except (TypeError, ValueError):
+        return NAN
+
+
 class EnergyEntry:
-    timestamp: str
-    text: str
-    metrics: Dict
-    energy_level: str
+    """One history entry with typed fields, less than half the size of the equivalent dict.
+
+    Missing numbers are NaN. Keys other than the fixed fields (e.g. extra
+    metrics) are dropped, and `to_dict` gives the timestamp in normalized ISO form.
+    """
+
+    __slots__ = ("timestamp", "level", "score", "confidence", "pace", "tone_valence", "text", "source", "indicators")
+
+    def __init__(self, timestamp: int, level: Optional[EnergyLevel], score: float = NAN, confidence: float = NAN,
+                 pace: float = NAN, tone_valence: float = NAN, text: Optional[str] = None,
+                 source: Optional[str] = None, indicators: Optional[Dict] = None):
+        self.timestamp = timestamp
+        self.level = level
+        self.score = score
+        self.confidence = confidence
+        self.pace = pace
+        self.tone_valence = tone_valence
+        self.text = text
+        self.source = source
+        self.indicators = indicators
+
+    @classmethod
+    def from_dict(cls, entry: Dict) -> "EnergyEntry":
+        try:
+            timestamp = to_epoch_us(entry['timestamp'])
+        except (KeyError, TypeError, ValueError):
+            timestamp = NO_TIMESTAMP
+        code = LEVEL_CODES.get(entry.get('energy_level'), UNKNOWN_LEVEL)
+        metrics = entry.get('metrics') or {}
+        return cls(
+            timestamp, LEVELS[code] if code >= 0 else None,
+            _float(entry.get('energy_score')), _float(entry.get('confidence')),
+            _float(metrics.get('pace')), _float(metrics.get('tone_valence')),
+            entry.get('text'), entry.get('source'), entry.get('indicators'),
+        )
+
+    @property
+    def level_code(self) -> int:
+        return LEVEL_CODES[self.level.value] if self.level is not None else UNKNOWN_LEVEL
+
+    def to_dict(self) -> Dict[str, Any]:
+        entry: Dict[str, Any] = {}
+        if self.timestamp != NO_TIMESTAMP:
+            entry["timestamp"] = from_epoch_us(self.timestamp)
+        if self.text is not None:
+            entry["text"] = self.text
+        metrics = {name: value for name, value in (("pace", self.pace), ("tone_valence", self.tone_valence))
+                   if not math.isnan(value)}
+        if metrics or self.text is not None:
+            entry["metrics"] = metrics
+        if self.source is not None:
+            entry["source"] = self.source
+        if self.level is not None:
+            entry["energy_level"] = self.level.value
+        for name, value in (("energy_score", self.score), ("confidence", self.confidence)):
+            if not math.isnan(value):
+                entry[name] = value
+        if self.indicators is not None:
+            entry["indicators"] = self.indicators
+        return entry
+
+    def __eq__(self, other):
+        if not isinstance(other, EnergyEntry):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"EnergyEntry({self.to_dict()!r})"
+
+
+class EntryTable:
+    """Columnar history for aggregation: one typed array per fixed field, about 25 bytes per entry.
+
+    Text, source and indicators are not kept; use EnergyEntry or the stored
+    dicts when those are needed.
+    """
+
+    __slots__ = ("timestamps", "levels", "scores", "confidences", "paces", "tone_valences")
+
+    def __init__(self):
+        self.timestamps = array.array("q")
+        self.levels = array.array("b")
+        self.scores = array.array("f")
+        self.confidences = array.array("f")
+        self.paces = array.array("f")
+        self.tone_valences = array.array("f")
+
+    @classmethod
+    def from_dicts(cls, entries: Iterable[Dict]) -> "EntryTable":
+        table = cls()
+        table.extend(entries)
+        return table
+
+    def append(self, entry: EnergyEntry):
+        self.timestamps.append(entry.timestamp)
+        self.levels.append(entry.level_code)
+        self.scores.append(entry.score)
+        self.confidences.append(entry.confidence)
+        self.paces.append(entry.pace)
+        self.tone_valences.append(entry.tone_valence)
+
+    def extend(self, entries: Iterable[Dict]):
+        for entry in entries:
+            self.append(EnergyEntry.from_dict(entry))
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __getitem__(self, i: int) -> EnergyEntry:
+        code = self.levels[i]
+        return EnergyEntry(self.timestamps[i], LEVELS[code] if code >= 0 else None, self.scores[i],
+                           self.confidences[i], self.paces[i], self.tone_valences[i])
+
+    def __iter__(self) -> Iterator[EnergyEntry]:
+        return (self[i] for i in range(len(self)))
+
+    def nbytes(self) -> int:
+        return sum(column.itemsize * len(column) for column in (
+            self.timestamps, self.levels, self.scores, self.confidences, self.paces, self.tone_valences))
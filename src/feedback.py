@@ -1,20 +1,22 @@
-from typing import List, Dict
+from typing import List, Dict, Union
 from datetime import datetime
-from collections import defaultdict
-from src.domain import EnergyLevel
+from src.aggregates import HourlyAggregates, LEVEL_SCORES
+from src.domain import EntryTable
 from src.interfaces import IFeedbackGenerator
 
 class FeedbackGenerator(IFeedbackGenerator):
     def __init__(self):
         # Map EnergyLevel to numeric score
-        self.score_map = {
-            EnergyLevel.HIGH.value: 2,
-            EnergyLevel.MEDIUM.value: 0,
-            EnergyLevel.LOW.value: -2
-        }
+        self.score_map = LEVEL_SCORES
 
-    def generate_feedback(self, entries: List[Dict]) -> str:
-        count = len(entries)
+    def generate_feedback(self, entries: Union[List[Dict], EntryTable]) -> str:
+        # A columnar EntryTable (see IStorage.load_compact) skips per-entry timestamp parsing
+        aggregates = HourlyAggregates(filepath=None)
+        aggregates.rebuild(entries)
+        return self.generate_feedback_from_aggregates(aggregates)
+
+    def generate_feedback_from_aggregates(self, aggregates: HourlyAggregates) -> str:
+        count = aggregates.total
 
         if count == 0:
             return "No energy logs found. Start logging to get insights!"
@@ -22,35 +24,15 @@ class FeedbackGenerator(IFeedbackGenerator):
         if count < 3:
             return f"You have logged {count} entries. Keep going! specific trends will appear after 3 entries."
 
-        # Analyze trends
-        hourly_scores = defaultdict(list)
-
-        for entry in entries:
-            # entry timestamp expected in ISO format
-            try:
-                dt = datetime.fromisoformat(entry['timestamp'])
-                hour = dt.hour
-                level = entry['energy_level'] # "high", "medium", "low"
-
-                # Check if level is enum value or string
-                score = self.score_map.get(level, 0)
-                hourly_scores[hour].append(score)
-            except (ValueError, KeyError):
-                continue
-
-        if not hourly_scores:
-            return "Could not parse entry timestamps."
+        # Averages per hour of day, O(24) regardless of history size
+        avg_scores = aggregates.hourly_averages()
 
-        # Calculate averages
-        avg_scores = {}
-        for hour, scores in hourly_scores.items():
-            avg_scores[hour] = sum(scores) / len(scores)
+        if not avg_scores:
+            # Entries count only with a readable timestamp and a known energy level
+            return "Could not read a timestamp and energy level from any entry."
 
         # Identify peak and dip
         # We define peak as highest avg score, dip as lowest avg score
-        if not avg_scores:
-             return "Not enough data to determine trends."
-
         best_hour = max(avg_scores, key=avg_scores.get)
         worst_hour = min(avg_scores, key=avg_scores.get)
 
@@ -0,0 +1,131 @@
+"""
+Per-user energy forecasting.
+
+Fits an exponentially-weighted hour-of-week profile (168 slots, Monday 00:00
+first) on the 0-100 energy scale. Each observation is the entry's
+`energy_score` when present, otherwise a score derived from its level.
+Older observations decay with a configurable half-life, so the forecast
+follows recent habits.
+
+Sparse slots are shrunk toward the hour-of-day average, which is itself
+shrunk toward the overall average. So a slot with one observation does not
+swing the curve, and a new user still gets a sensible shape.
+
+The model updates in O(1) per entry. The predicted 168-slot curve is cached
+until the next update, and the model is persisted next to the storage.
+"""
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from src.domain import EnergyLevel
+from src.index_file import PersistedIndex
+
+FORECAST_FILE = "energy_forecast.json"
+DEFAULT_HALF_LIFE_DAYS = 14.0
+NEUTRAL_SCORE = 50.0
+
+# Observation used for entries without an energy_score
+LEVEL_TO_SCORE = {
+    EnergyLevel.HIGH.value: 80.0,
+    EnergyLevel.MEDIUM.value: 50.0,
+    EnergyLevel.LOW.value: 20.0
+}
+
+# Pseudo-observations given to the broader average when blending sparse slots
+PRIOR_WEIGHT = 1.0
+
+
+class _DecayingMean:
+    """Exponentially time-weighted mean of observations."""
+    __slots__ = ("total", "weight", "last")
+
+    def __init__(self, total: float = 0.0, weight: float = 0.0, last: Optional[float] = None):
+        self.total = total
+        self.weight = weight
+        self.last = last
+
+    def add(self, value: float, at: float, half_life: float):
+        if self.last is None or at >= self.last:
+            decay = 0.5 ** ((at - self.last) / half_life) if self.last is not None else 1.0
+            self.total = self.total * decay + value
+            self.weight = self.weight * decay + 1.0
+            self.last = at
+        else:
+            # Out-of-order observation: weight it by how old it is relative to the latest one
+            decay = 0.5 ** ((self.last - at) / half_life)
+            self.total += value * decay
+            self.weight += decay
+
+    def blend(self, prior: float) -> float:
+        return (self.total + PRIOR_WEIGHT * prior) / (self.weight + PRIOR_WEIGHT)
+
+
+class EnergyForecaster(PersistedIndex):
+    def __init__(self, filepath: Optional[str] = FORECAST_FILE, half_life_days: float = DEFAULT_HALF_LIFE_DAYS):
+        self.half_life = half_life_days * 86400.0
+        super().__init__(filepath)
+
+    def reset(self):
+        self.slots = [_DecayingMean() for _ in range(168)]
+        self.hours = [_DecayingMean() for _ in range(24)]
+        self.overall = _DecayingMean()
+        self._curve: Optional[List[float]] = None
+
+    def update(self, entry: Dict):
+        """Adds one entry to the model. Entries without a parseable timestamp are ignored."""
+        try:
+            dt = datetime.fromisoformat(entry['timestamp'])
+        except (ValueError, KeyError, TypeError):
+            return
+        value = entry.get('energy_score')
+        if value is None:
+            value = LEVEL_TO_SCORE.get(entry.get('energy_level'))
+            if value is None:
+                return
+
+        at = dt.timestamp()
+        hour_of_week = dt.weekday() * 24 + dt.hour
+        self.slots[hour_of_week].add(float(value), at, self.half_life)
+        self.hours[dt.hour].add(float(value), at, self.half_life)
+        self.overall.add(float(value), at, self.half_life)
+        self._curve = None
+
+    def rebuild(self, entries: Iterable[Dict]):
+        self.reset()
+        for entry in entries:
+            self.update(entry)
+
+    def forecast(self) -> List[float]:
+        """Predicted energy (0-100) for each hour of the week, Monday 00:00 first. Cached."""
+        if self._curve is None:
+            overall = self.overall.blend(NEUTRAL_SCORE)
+            hourly = [hour.blend(overall) for hour in self.hours]
+            self._curve = [self.slots[i].blend(hourly[i % 24]) for i in range(168)]
+        return self._curve
+
+    def predict(self, at: datetime) -> float:
+        """Predicted energy (0-100) at a point in time."""
+        return self.forecast()[at.weekday() * 24 + at.hour]
+
+    # -- Persistence ---------------------------------------------------------
+
+    def to_dict(self) -> Dict:
+        def dump(means):
+            return [[m.total, m.weight, m.last] for m in means]
+        return {
+            "half_life": self.half_life,
+            "slots": dump(self.slots),
+            "hours": dump(self.hours),
+            "overall": [self.overall.total, self.overall.weight, self.overall.last],
+        }
+
+    def from_dict(self, data: Dict):
+        if data["half_life"] != self.half_life:
+            raise ValueError("half-life changed")
+        slots = [_DecayingMean(*values) for values in data["slots"]]
+        hours = [_DecayingMean(*values) for values in data["hours"]]
+        if len(slots) != 168 or len(hours) != 24:
+            raise ValueError("unexpected shape")
+        self.slots, self.hours = slots, hours
+        self.overall = _DecayingMean(*data["overall"])
+        self._curve = None
@@ -8,11 +8,72 @@ Uses Gemini 3 to analyze raw audio for vocal biomarkers:
 - Non-speech cues (laughter, sighs, hesitation)
 """
 
+import asyncio
+import logging
 import os
+import httpx
 from google import genai
-from google.genai import types
+from google.genai import errors, types
 from pydantic import BaseModel
-from typing import List
+from typing import TYPE_CHECKING, BinaryIO, Callable, List, Optional, Union
+from src.cache import AnalysisCache
+from src.domain import EnergyLevel
+from src.forecast import LEVEL_TO_SCORE
+from src.metrics import REGISTRY, timed
+from src.resilience import CircuitBreaker, CircuitOpenError, ResilientCaller, RetryPolicy, DEFAULT_MAX_ATTEMPTS
+
+# The audio modules need NumPy; they are imported where used, so importing the client stays light
+if TYPE_CHECKING:
+    from src.audio_features import LocalAnalysis, LocalAudioAnalyzer
+    from src.audio_preprocess import PreparedAudio
+
+logger = logging.getLogger(__name__)
+
+
+# Bump whenever ENERGY_PROMPT changes so cached results from the old prompt are not reused
+PROMPT_VERSION = "1"
+
+ENERGY_PROMPT = """Analyze this audio recording for the speaker's energy level.
+
+Evaluate the following vocal biomarkers:
+- Tone: Is it positive, neutral, or negative?
+- Pace: Is the speaker talking fast, normal, or slow?
+- Emotion: What emotion is present? (excited, calm, tired, stressed, anxious, happy, sad)
+- Non-speech cues: Are there any sighs, laughter, hesitation, yawning, or other non-verbal sounds?
+
+Based on your analysis, determine the overall energy level:
+- "high": Speaker sounds energetic, excited, or highly engaged
+- "medium": Speaker sounds neutral, calm, or moderately engaged
+- "low": Speaker sounds tired, drained, stressed, or disengaged
+
+Return your analysis as JSON with this exact structure:
+{
+  "energy_level": "high" or "medium" or "low",
+  "confidence": 0.0 to 1.0,
+  "energy_score": 0 to 100 (numeric energy level for trend charts, where 0=exhausted, 50=neutral, 100=peak energy),
+  "indicators": {
+    "tone": "description",
+    "pace": "description",
+    "emotion": "description",
+    "non_speech_cues": ["list", "of", "cues"]
+  }
+}"""
+
+# Per-attempt timeout and overall deadline (including retries) for model calls, in seconds
+DEFAULT_TIMEOUT = float(os.environ.get("GEMINI_TIMEOUT", "30"))
+DEFAULT_DEADLINE = float(os.environ.get("GEMINI_DEADLINE", "60"))
+MAX_ATTEMPTS = int(os.environ.get("GEMINI_MAX_ATTEMPTS", str(DEFAULT_MAX_ATTEMPTS)))
+
+# Rate limiting, request timeouts and server-side failures are worth retrying; other errors are not
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+# MIME types for audio files analyzed from disk, by extension
+AUDIO_MIME_TYPES = {
+    ".webm": "audio/webm",
+    ".mp3": "audio/mpeg",
+    ".wav": "audio/wav",
+    ".ogg": "audio/ogg",
+}
 
 
 class EnergyIndicators(BaseModel):
@@ -30,69 +91,302 @@ class EnergyResponse(BaseModel):
     energy_score: int  # 0-100 scale for trend visualization
     indicators: EnergyIndicators
 
+MODEL_ERRORS = REGISTRY.counter(
+    "vocalpoint_model_errors_total", "Model calls that failed after retries, by reason", ("reason",)
+)
+MODEL_FALLBACKS = REGISTRY.counter(
+    "vocalpoint_model_fallbacks_total", "Analyses answered by the fallback while the model was unavailable"
+)
+
+
+Fallback = Callable[[bytes, str], EnergyResponse]
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether a failed model call may succeed if repeated."""
+    if isinstance(error, errors.APIError):
+        return error.code in RETRYABLE_STATUS_CODES
+    return isinstance(error, (TimeoutError, httpx.TimeoutException, httpx.TransportError))
+
+
+def error_reason(error: BaseException) -> str:
+    """Short label for a failed model call: the HTTP status, "circuit_open" or the exception type."""
+    if isinstance(error, CircuitOpenError):
+        return "circuit_open"
+    if isinstance(error, errors.APIError):
+        return str(error.code)
+    return type(error).__name__
+
+
+def local_response(analysis: "LocalAnalysis") -> EnergyResponse:
+    """Presents a local feature analysis in the model's response format."""
+    pace = analysis.metrics["pace"]
+    tone = analysis.metrics["tone_valence"]
+    return EnergyResponse(
+        energy_level=analysis.energy_level.value,
+        confidence=analysis.confidence,
+        energy_score=analysis.energy_score,
+        indicators=EnergyIndicators(
+            tone="positive" if tone > 0.5 else "negative" if tone < -0.5 else "neutral",
+            pace="fast" if pace > 160 else "slow" if pace < 110 else "normal",
+            emotion="unknown",  # Not estimated locally
+            non_speech_cues=[],
+        ),
+    )
+
+
+def heuristic_analysis(audio_bytes: bytes, mime_type: str) -> EnergyResponse:
+    """Local, low-confidence analysis used when the model is unavailable.
+
+    WAV clips are analyzed from their vocal features; other formats get a neutral estimate.
+    """
+    from src.audio_features import LocalAudioAnalyzer, WAV_MIME_TYPES
+
+    if mime_type in WAV_MIME_TYPES:
+        try:
+            return local_response(LocalAudioAnalyzer().analyze_wav(audio_bytes))
+        except ValueError:
+            pass
+    level = EnergyLevel.MEDIUM
+    return EnergyResponse(
+        energy_level=level.value,
+        confidence=0.1,
+        energy_score=int(LEVEL_TO_SCORE[level.value]),
+        indicators=EnergyIndicators(tone="unknown", pace="unknown", emotion="unknown", non_speech_cues=[]),
+    )
+
 
 class GeminiAudioClient:
-    """Client for analyzing audio files with Gemini."""
+    """Client for analyzing audio files with Gemini.
+
+    Model calls have a per-attempt timeout and an overall deadline, retry
+    transient failures with jittered backoff, and stop for a while once the
+    model keeps failing (circuit breaker). When a `fallback` is given, it
+    answers instead of raising when the model is unavailable; its results
+    are not cached.
 
-    def __init__(self, api_key: str = None):
+    With a `local_analyzer`, WAV clips are first analyzed on this machine and
+    only sent to the model when the local result is not confident enough.
+
+    Audio is labelled with the MIME type of its actual container, and WAV is
+    trimmed, downmixed and resampled before upload (see `audio_preprocess`).
+    Cache keys use the original bytes, so a cache hit skips that work.
+    """
+
+    def __init__(self, api_key: str = None, base_url: str = None, cache: Optional[AnalysisCache] = None,
+                 timeout: Optional[float] = DEFAULT_TIMEOUT, deadline: Optional[float] = DEFAULT_DEADLINE,
+                 retry: Optional[RetryPolicy] = None, breaker: Optional[CircuitBreaker] = None,
+                 fallback: Optional[Fallback] = None, local_analyzer: Optional["LocalAudioAnalyzer"] = None,
+                 preprocess: bool = True):
         self.api_key = api_key or os.environ.get("GEMINI_API_KEY")
         if not self.api_key:
             raise ValueError("GEMINI_API_KEY environment variable is not set")
 
-        self.client = genai.Client(api_key=self.api_key)
+        # base_url points the SDK at a different endpoint (e.g. a local fake server in tests)
+        base_url = base_url or os.environ.get("GEMINI_BASE_URL")
+        http_options = types.HttpOptions(base_url=base_url) if base_url else None
+        self.client = genai.Client(api_key=self.api_key, http_options=http_options)
         self.model_name = "gemini-2.5-flash"
+        self.cache = cache
+        self.breaker = breaker or CircuitBreaker()
+        self.resilience = ResilientCaller(
+            is_retryable,
+            retry=retry or RetryPolicy(max_attempts=MAX_ATTEMPTS),
+            breaker=self.breaker,
+            timeout=timeout,
+            deadline=deadline,
+        )
+        self.fallback = fallback
+        self.local_analyzer = local_analyzer
+        self.preprocess = preprocess
+        # Audio received for model calls vs. what was actually uploaded
+        self.uploads = 0
+        self.bytes_received = 0
+        self.bytes_uploaded = 0
 
-    def analyze_energy(self, audio_path: str) -> EnergyResponse:
-        """Analyzes audio for energy level using Gemini.
+    def analyze_energy(self, audio_path: str, mime_type: str = None) -> EnergyResponse:
+        """Analyzes an audio file for energy level using Gemini.
+
+        Thin wrapper over `analyze_audio` for callers that have a file on disk (e.g. the CLI).
 
         Args:
             audio_path: Path to audio file (WebM, MP3, WAV, etc.)
+            mime_type: MIME type of the audio; guessed from the extension if omitted.
 
         Returns:
             EnergyResponse with energy_level, confidence, and indicators.
         """
-        # Read audio file
-        with open(audio_path, 'rb') as f:
-            audio_bytes = f.read()
+        return self.analyze_audio(_read_file(audio_path), mime_type or mime_type_for(audio_path))
 
-        prompt = """Analyze this audio recording for the speaker's energy level.
+    async def analyze_energy_async(self, audio_path: str, mime_type: str = None) -> EnergyResponse:
+        """Non-blocking variant of `analyze_energy`."""
+        audio_bytes = await asyncio.to_thread(_read_file, audio_path)
+        return await self.analyze_audio_async(audio_bytes, mime_type or mime_type_for(audio_path))
 
-Evaluate the following vocal biomarkers:
-- Tone: Is it positive, neutral, or negative?
-- Pace: Is the speaker talking fast, normal, or slow?
-- Emotion: What emotion is present? (excited, calm, tired, stressed, anxious, happy, sad)
-- Non-speech cues: Are there any sighs, laughter, hesitation, yawning, or other non-verbal sounds?
+    def analyze_audio(self, audio: Union[bytes, BinaryIO], mime_type: str = "audio/webm") -> EnergyResponse:
+        """Analyzes in-memory audio for energy level using Gemini.
 
-Based on your analysis, determine the overall energy level:
-- "high": Speaker sounds energetic, excited, or highly engaged
-- "medium": Speaker sounds neutral, calm, or moderately engaged
-- "low": Speaker sounds tired, drained, stressed, or disengaged
+        Args:
+            audio: Raw audio bytes, or a binary buffer to read them from.
+            mime_type: MIME type of the audio.
 
-Return your analysis as JSON with this exact structure:
-{
-  "energy_level": "high" or "medium" or "low",
-  "confidence": 0.0 to 1.0,
-  "energy_score": 0 to 100 (numeric energy level for trend charts, where 0=exhausted, 50=neutral, 100=peak energy),
-  "indicators": {
-    "tone": "description",
-    "pace": "description",
-    "emotion": "description",
-    "non_speech_cues": ["list", "of", "cues"]
-  }
-}"""
+        Returns:
+            EnergyResponse with energy_level, confidence, and indicators.
+        """
+        from src.audio_preprocess import detect_mime_type
+
+        audio_bytes = _as_bytes(audio)
+        key, cached = self._cache_lookup(audio_bytes)
+        if cached is not None:
+            return cached
+        mime_type = detect_mime_type(audio_bytes) or mime_type
+        local = self._local_result(audio_bytes, mime_type)
+        if local is not None:
+            return local
+
+        upload = self._prepare(audio_bytes, mime_type)
+        try:
+            with timed("model_call"):
+                response = self.resilience.call(
+                    lambda timeout: self.client.models.generate_content(
+                        **self._request(upload.data, upload.mime_type, timeout))
+                )
+        except Exception as e:
+            return self._fall_back(e, audio_bytes, mime_type)
+        return self._cache_store(key, EnergyResponse.model_validate_json(response.text))
+
+    async def analyze_audio_async(self, audio: Union[bytes, BinaryIO],
+                                  mime_type: str = "audio/webm") -> EnergyResponse:
+        """Non-blocking variant of `analyze_audio` for use inside an event loop.
+
+        Uses the SDK's native async client, so many analyses can be in flight
+        on a single worker while waiting on the model.
+        """
+        from src.audio_preprocess import detect_mime_type
+
+        audio_bytes = _as_bytes(audio)
+        key, cached = self._cache_lookup(audio_bytes)
+        if cached is not None:
+            return cached
+        mime_type = detect_mime_type(audio_bytes) or mime_type
+        if self.local_analyzer is not None:
+            # Decoding and the FFT are CPU work too
+            local = await asyncio.to_thread(self._local_result, audio_bytes, mime_type)
+            if local is not None:
+                return local
+
+        # Resampling is CPU work; keep it off the event loop
+        upload = await asyncio.to_thread(self._prepare, audio_bytes, mime_type)
+        try:
+            with timed("model_call"):
+                response = await self.resilience.call_async(
+                    lambda timeout: self.client.aio.models.generate_content(
+                        **self._request(upload.data, upload.mime_type, timeout))
+                )
+        except Exception as e:
+            return self._fall_back(e, audio_bytes, mime_type)
+        return self._cache_store(key, EnergyResponse.model_validate_json(response.text))
+
+    @timed("preprocess")
+    def _prepare(self, audio_bytes: bytes, mime_type: str) -> "PreparedAudio":
+        """The audio to upload, counted in the upload stats."""
+        from src.audio_preprocess import PreparedAudio, prepare_audio
 
-        response = self.client.models.generate_content(
+        if self.preprocess:
+            upload = prepare_audio(audio_bytes, mime_type)
+        else:
+            upload = PreparedAudio(audio_bytes, mime_type, len(audio_bytes))
+        self.uploads += 1
+        self.bytes_received += upload.original_bytes
+        self.bytes_uploaded += len(upload.data)
+        if upload.bytes_saved:
+            logger.debug("Uploading %s: %d bytes (%d saved, %.1fs silence trimmed)",
+                         upload.mime_type, len(upload.data), upload.bytes_saved, upload.trimmed_seconds)
+        return upload
+
+    def upload_stats(self) -> dict:
+        """Bytes received for model calls, bytes uploaded after preprocessing, and the difference."""
+        return {
+            "uploads": self.uploads,
+            "bytes_received": self.bytes_received,
+            "bytes_uploaded": self.bytes_uploaded,
+            "bytes_saved": self.bytes_received - self.bytes_uploaded,
+        }
+
+    @timed("local_analysis")
+    def _local_result(self, audio_bytes: bytes, mime_type: str) -> Optional[EnergyResponse]:
+        """The local analysis of a WAV clip if it is confident; None escalates to the model."""
+        from src.audio_features import WAV_MIME_TYPES
+
+        if self.local_analyzer is None or mime_type not in WAV_MIME_TYPES:
+            return None
+        try:
+            analysis = self.local_analyzer.analyze_wav(audio_bytes)
+        except ValueError:
+            return None
+        if not self.local_analyzer.is_confident(analysis):
+            return None
+        return local_response(analysis)
+
+    def _fall_back(self, error: Exception, audio_bytes: bytes, mime_type: str) -> EnergyResponse:
+        """Answers from the fallback when the model is unavailable; re-raises anything else."""
+        MODEL_ERRORS.inc(reason=error_reason(error))
+        unavailable = isinstance(error, CircuitOpenError) or is_retryable(error)
+        if self.fallback is None or not unavailable:
+            raise error
+        MODEL_FALLBACKS.inc()
+        logger.warning("Model unavailable (%s); using fallback analysis", error)
+        return self.fallback(audio_bytes, mime_type)
+
+    @timed("cache_lookup")
+    def _cache_lookup(self, audio_bytes: bytes):
+        """Returns (cache key, cached EnergyResponse or None)."""
+        if self.cache is None:
+            return None, None
+        key = AnalysisCache.key_for(audio_bytes, self.model_name, PROMPT_VERSION)
+        cached = self.cache.get(key)
+        if cached is None:
+            return key, None
+        return key, EnergyResponse.model_validate_json(cached)
+
+    def _cache_store(self, key: Optional[str], result: EnergyResponse) -> EnergyResponse:
+        if key is not None:
+            self.cache.put(key, result.model_dump_json())
+        return result
+
+    def _request(self, audio_bytes: bytes, mime_type: str, timeout: Optional[float] = None) -> dict:
+        """Builds the generate_content arguments for an audio clip; `timeout` is in seconds."""
+        # The SDK takes the timeout in milliseconds
+        http_options = types.HttpOptions(timeout=max(1, int(timeout * 1000))) if timeout is not None else None
+        return dict(
             model=self.model_name,
             contents=[
-                prompt,
+                ENERGY_PROMPT,
                 types.Part.from_bytes(
                     data=audio_bytes,
-                    mime_type='audio/webm',
+                    mime_type=mime_type,
                 )
             ],
             config=types.GenerateContentConfig(
                 response_mime_type="application/json",
+                http_options=http_options,
             ),
         )
 
-        return EnergyResponse.model_validate_json(response.text)
+
+def mime_type_for(path: str) -> str:
+    """Audio MIME type for a file path, defaulting to WebM (the PWA's recording format)."""
+    return AUDIO_MIME_TYPES.get(os.path.splitext(path)[1].lower(), "audio/webm")
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _as_bytes(audio: Union[bytes, BinaryIO]) -> bytes:
+    if isinstance(audio, bytes):
+        return audio
+    if isinstance(audio, (bytearray, memoryview)):
+        return bytes(audio)
+    return audio.read()
@@ -0,0 +1,67 @@
+"""
+Base class for derived indexes persisted as one JSON file next to the storage.
+
+HourlyAggregates, EnergyForecaster and TrendRollups keep their state in
+memory and save it whole. A subclass provides `reset`, `to_dict` and
+`from_dict`; this class handles loading, atomic saving and clearing.
+`persisted` tells the service whether the index is complete: loaded from
+its file or saved after a build. A missing or corrupt file is rebuilt from
+the entries, and an in-memory index (no filepath) is built once.
+"""
+
+import json
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+
+
+class PersistedIndex(ABC):
+    def __init__(self, filepath: Optional[str]):
+        self.filepath = filepath
+        self.reset()
+        self.persisted = False
+        if filepath and os.path.exists(filepath):
+            self.load()
+
+    @abstractmethod
+    def reset(self):
+        pass
+
+    @abstractmethod
+    def to_dict(self) -> Dict:
+        pass
+
+    @abstractmethod
+    def from_dict(self, data: Dict):
+        """Restores the state saved by `to_dict`. Raises KeyError, TypeError or ValueError if it does not fit."""
+        pass
+
+    def load(self):
+        try:
+            with open(self.filepath, 'r') as f:
+                self.from_dict(json.load(f))
+            self.persisted = True
+        except (KeyError, TypeError, ValueError, OSError):  # ValueError includes JSONDecodeError
+            # Corrupt or incompatible index: start empty and let the caller rebuild it.
+            self.reset()
+            self.persisted = False
+
+    def save(self):
+        if not self.filepath:
+            self.persisted = True  # In memory only: nothing to write, but the index is complete
+            return
+        directory = os.path.dirname(self.filepath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Written to a temporary file and renamed, so a crash never leaves a half-written index
+        tmp_path = self.filepath + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f, separators=(',', ':'))
+        os.replace(tmp_path, self.filepath)
+        self.persisted = True
+
+    def clear(self):
+        self.reset()
+        self.persisted = False
+        if self.filepath and os.path.exists(self.filepath):
+            os.remove(self.filepath)
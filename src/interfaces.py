@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
-from src.domain import EnergyLevel, EnergyEntry
+from contextlib import nullcontext
+from datetime import datetime
+from typing import List, Dict, Any, Iterator, Optional, Tuple, Union
+from src.domain import EnergyLevel, EntryTable
 
 class IEnergyAnalyzer(ABC):
     @abstractmethod
@@ -20,7 +22,59 @@ class IStorage(ABC):
     def clear_entries(self):
         pass
 
+    def save_entries(self, entries: List[Dict]):
+        """Saves several entries at once. Backends should override this with a single write."""
+        for entry in entries:
+            self.save_entry(entry)
+
+    def iter_entries(self) -> Iterator[Dict]:
+        """All entries in storage order. Backends that can read incrementally override this to stream."""
+        return iter(self.load_entries())
+
+    def load_compact(self) -> EntryTable:
+        """All entries as a columnar EntryTable, for aggregation over large histories."""
+        return EntryTable.from_dicts(self.iter_entries())
+
+    # Multi-process coordination (see src/locking.py). Backends opened in shared
+    # mode override these; the defaults suit a single process.
+    def lock(self, exclusive: bool = True):
+        """Context manager that holds the storage's cross-process lock."""
+        return nullcontext()
+
+    def generation(self) -> Any:
+        """Changes whenever any process changes the stored history; None if not tracked."""
+        return None
+
+    # Range queries. Backends with an index should override these; the defaults
+    # filter the full history. Timestamps are compared as ISO-8601 strings.
+    def load_range(self, start: datetime, end: datetime) -> List[Dict]:
+        """Entries with start <= timestamp < end, oldest first."""
+        lo, hi = start.isoformat(), end.isoformat()
+        return [e for e in self.load_entries() if lo <= e.get('timestamp', '') < hi]
+
+    def load_last(self, n: int) -> List[Dict]:
+        """The n most recent entries, oldest first."""
+        return self.load_entries()[-n:] if n > 0 else []
+
+    def load_page(self, start: datetime, end: datetime, limit: int,
+                  after: Optional[Tuple[str, int]] = None) -> List[Dict]:
+        """Up to `limit` entries with start <= timestamp < end, ordered by timestamp.
+
+        `after` is a (timestamp, skip) position from a previous page: entries
+        before that timestamp and the first `skip` entries at it are excluded.
+        """
+        lo, hi, skip = start.isoformat(), end.isoformat(), 0
+        if after is not None and after[0] >= lo:
+            lo, skip = after
+        entries = [e for e in self.load_entries() if lo <= e.get('timestamp', '') < hi]
+        entries.sort(key=lambda e: e.get('timestamp', ''))
+        return entries[skip:skip + limit]
+
 class IFeedbackGenerator(ABC):
     @abstractmethod
-    def generate_feedback(self, entries: List[Dict]) -> str:
+    def generate_feedback(self, entries: Union[List[Dict], EntryTable]) -> str:
+        pass
+
+    @abstractmethod
+    def generate_feedback_from_aggregates(self, aggregates) -> str:
         pass
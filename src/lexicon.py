@@ -0,0 +1,188 @@
+"""
+Weighted keyword lexicon for the text energy heuristics.
+
+A lexicon maps terms (single words or multi-word phrases) to a score
+contribution: positive for high-energy language, negative for low-energy.
+Matching is on whole words: text is tokenized once and each token run of up
+to the longest phrase length is looked up in a dict, so scoring cost depends
+on the text length, not on the number of terms. `score_many` scores a whole
+batch with one tokenizing pass and NumPy sums per text.
+
+Lexicon files are JSON:
+
+    {"terms": {"excited": 2, "ready to go": 2, "tired": -2, "worn out": -2}}
+
+A file-backed lexicon checks the file's mtime at most every
+`check_interval` seconds and reloads it when it changes, so the running API
+picks up edits without a restart.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from itertools import repeat
+from typing import Dict, Optional, Sequence, Set, Tuple
+
+LEXICON_ENV = "VOCALPOINT_LEXICON"
+RELOAD_CHECK_INTERVAL = 2.0
+
+DEFAULT_TERMS = {
+    'excited': 2, 'ready': 2, 'focused': 2, 'great': 2, 'pumped': 2, 'energetic': 2,
+    'tired': -2, 'exhausted': -2, 'drained': -2, 'sleepy': -2, 'slow': -2, 'sick': -2,
+}
+
+_TOKEN_RE = re.compile(r"\w+(?:'\w+)*")
+
+# Batches are tokenized as one string, with a non-word separator token between texts
+_SEPARATOR = "\x00"
+_SEPARATOR_ID = -2
+_BATCH_TOKEN_RE = re.compile(r"\w+(?:'\w+)*|\x00")
+
+
+def _normalize(term: str) -> str:
+    return " ".join(_TOKEN_RE.findall(term.lower()))
+
+
+class Lexicon:
+    def __init__(self, terms: Optional[Dict[str, float]] = None, path: Optional[str] = None,
+                 check_interval: float = RELOAD_CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self._last_check = 0.0
+        # (terms, longest phrase in words), swapped as one reference on reload
+        self._compiled: Tuple[Dict[str, float], int] = self._compile(DEFAULT_TERMS if terms is None else terms)
+        self._batch_index = None  # (compiled, term -> position, weights array) for score_many
+        if path:
+            self.reload()
+
+    @classmethod
+    def default(cls) -> "Lexicon":
+        """The built-in lexicon, or the file named by $VOCALPOINT_LEXICON if set."""
+        path = os.environ.get(LEXICON_ENV)
+        return cls(path=path) if path else cls()
+
+    @staticmethod
+    def _compile(terms: Dict[str, float]) -> Tuple[Dict[str, float], int]:
+        compiled = {}
+        for term, weight in terms.items():
+            key = _normalize(term)
+            if not key:
+                raise ValueError(f"Lexicon term has no words: {term!r}")
+            compiled[key] = float(weight)
+        max_words = max((key.count(" ") + 1 for key in compiled), default=0)
+        return compiled, max_words
+
+    def __len__(self) -> int:
+        return len(self._compiled[0])
+
+    # -- Loading -------------------------------------------------------------
+
+    def reload(self):
+        """Loads the lexicon file now. Raises ValueError if it is malformed."""
+        mtime = os.path.getmtime(self.path)
+        with open(self.path, 'r') as f:
+            try:
+                data = json.load(f)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid lexicon file {self.path}: {e}") from e
+        if not isinstance(data, dict) or not isinstance(data.get("terms"), dict):
+            raise ValueError(f"Invalid lexicon file {self.path}: expected an object with a 'terms' mapping")
+
+        compiled = self._compile(data["terms"])
+        with self._lock:
+            self._compiled = compiled
+            self._mtime = mtime
+
+    def maybe_reload(self) -> bool:
+        """Reloads the file if it changed since the last load. Returns True if reloaded.
+
+        A file that fails to parse is ignored and the current terms stay active.
+        """
+        if not self.path:
+            return False
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return False
+        self._last_check = now
+        try:
+            if os.path.getmtime(self.path) == self._mtime:
+                return False
+            self.reload()
+        except (OSError, ValueError):
+            return False
+        return True
+
+    # -- Matching ------------------------------------------------------------
+
+    def matches(self, text: str) -> Set[str]:
+        """Distinct lexicon terms that occur in the text as whole words."""
+        return self._matches(self._compiled, text)
+
+    def score(self, text: str) -> float:
+        """Sum of weights of the distinct terms in the text."""
+        compiled = self._compiled  # One snapshot, in case a reload swaps it mid-call
+        terms = compiled[0]
+        return sum(terms[term] for term in self._matches(compiled, text))
+
+    def score_many(self, texts: Sequence[str]):
+        """`score` of each text, as a float64 NumPy array.
+
+        All texts are tokenized in one regex pass over the joined batch, every
+        token and phrase goes through one term-index lookup, and the weights
+        of the distinct (text, term) pairs are summed per text with `np.bincount`.
+        """
+        import numpy as np
+
+        compiled = self._compiled
+        positions, weights = self._index(compiled)
+        max_words = compiled[1]
+        n = len(texts)
+        if not len(weights):
+            return np.zeros(n)
+
+        joined = _SEPARATOR.join(texts)
+        if joined.count(_SEPARATOR) != n - 1:  # Some text contains the separator itself
+            joined = _SEPARATOR.join(text.replace(_SEPARATOR, " ") for text in texts)
+        tokens = _BATCH_TOKEN_RE.findall(joined.lower())
+        ids = np.fromiter(map(positions.get, tokens, repeat(-1)), dtype=np.int64, count=len(tokens))
+        owners = np.cumsum(ids == _SEPARATOR_ID)  # Text number of each token
+        for size in range(2, max_words + 1):
+            # Phrases across a separator contain it, so they never match a term
+            phrases = map(" ".join, zip(*(tokens[k:] for k in range(size))))
+            phrase_ids = np.fromiter(map(positions.get, phrases, repeat(-1)), dtype=np.int64,
+                                     count=max(len(tokens) - size + 1, 0))
+            ids = np.concatenate([ids, phrase_ids])
+            owners = np.concatenate([owners, owners[:len(phrase_ids)]])
+
+        found = ids >= 0
+        # A term counts once per text, however often it occurs
+        pairs = np.unique(owners[found] * len(weights) + ids[found])
+        return np.bincount(pairs // len(weights), weights=weights[pairs % len(weights)], minlength=n)
+
+    def _index(self, compiled: Tuple[Dict[str, float], int]):
+        import numpy as np
+
+        cached = self._batch_index
+        if cached is None or cached[0] is not compiled:
+            terms = compiled[0]
+            positions = {term: i for i, term in enumerate(terms)}
+            positions[_SEPARATOR] = _SEPARATOR_ID
+            cached = (compiled, positions, np.fromiter(terms.values(), dtype=np.float64, count=len(terms)))
+            self._batch_index = cached
+        return cached[1], cached[2]
+
+    @staticmethod
+    def _matches(compiled: Tuple[Dict[str, float], int], text: str) -> Set[str]:
+        terms, max_words = compiled
+        tokens = _TOKEN_RE.findall(text.lower())
+        found = {token for token in tokens if token in terms}
+        for size in range(2, max_words + 1):
+            for i in range(len(tokens) - size + 1):
+                phrase = " ".join(tokens[i:i + size])
+                if phrase in terms:
+                    found.add(phrase)
+        return found
@@ -0,0 +1,94 @@
+"""
+Cross-process coordination for file-backed storage.
+
+When several processes share one history (e.g. uvicorn workers), each
+storage in shared mode guards its files with an advisory `fcntl.flock` lock
+on a sidecar lock file. Readers take it shared and writers take it
+exclusive. The lock file itself is never replaced, unlike data files
+written by atomic rename, so every process locks the same inode.
+
+Caches are checked against `file_generation`, a (inode, size, mtime)
+snapshot, so a process notices another one's writes with one `stat`
+instead of re-reading the file.
+
+On platforms without fcntl (Windows), locking is a no-op and shared mode
+only protects threads within one process.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+Generation = Tuple[int, int, int]
+
+
+def file_generation(path: str) -> Optional[Generation]:
+    """(inode, size, mtime in ns) of a file, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+class FileLock:
+    """Shared/exclusive advisory lock on `path`, reentrant within a process.
+
+    A nested acquisition inside an exclusive hold is free. Upgrading a shared
+    hold to exclusive is refused, because flock converts locks non-atomically.
+    Threads of one process take turns, since flock locks belong to the open file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+        self._depth = 0
+        self._exclusive = False
+        self._thread_lock = threading.RLock()
+
+    @property
+    def held_exclusive(self) -> bool:
+        """Whether the calling code holds the lock exclusively (only meaningful from inside a hold)."""
+        return self._depth > 0 and self._exclusive
+
+    @contextmanager
+    def hold(self, exclusive: bool = True) -> Iterator[None]:
+        with self._thread_lock:
+            if self._depth == 0:
+                self._acquire(exclusive)
+            elif exclusive and not self._exclusive:
+                raise RuntimeError(f"Cannot upgrade a shared lock on {self.path} to exclusive")
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._release()
+
+    def _acquire(self, exclusive: bool):
+        if fcntl is not None:
+            if self._fd is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            fcntl.flock(self._fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        self._exclusive = exclusive
+
+    def _release(self):
+        if fcntl is not None and self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._exclusive = False
+
+    def close(self):
+        with self._thread_lock:
+            if self._fd is not None and self._depth == 0:
+                os.close(self._fd)
+                self._fd = None
@@ -0,0 +1,324 @@
+"""
+Append-only segmented log storage for VocalPoint energy entries.
+
+Entries are written as JSON Lines into rolling segment files, so recording an
+entry is a single append rather than a rewrite of the whole history:
+
+- Segments roll over once they reach ``max_segment_bytes``.
+- A torn tail (partial last line after a crash) is truncated before the next
+  append, and undecodable lines are skipped on load.
+- Closed segments are periodically compacted into one file. The compacted
+  segment carries a header naming the first segment it absorbed, so a crash
+  between writing it and deleting the originals never duplicates entries.
+- With ``shared=True`` several processes can use one log: appends and
+  compaction hold an exclusive lock on ``<dir>/.lock``, and reads hold it
+  shared. A cache that falls behind another process's appends is caught up by
+  reading only the new bytes.
+"""
+
+import json
+import os
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.interfaces import IStorage
+from src.locking import FileLock
+from src.metrics import timed
+
+LOG_DIR = "energy_log.d"
+MAX_SEGMENT_BYTES = 1024 * 1024
+COMPACT_THRESHOLD = 8
+
+_SEGMENT_RE = re.compile(r"^segment-(\d{8})\.jsonl$")
+_HEADER_KEY = "_compacted_from"
+LOCK_FILE = ".lock"
+
+
+def _segment_name(number: int) -> str:
+    return f"segment-{number:08d}.jsonl"
+
+
+class SegmentedLogStorage(IStorage):
+    def __init__(self, dirpath=LOG_DIR, max_segment_bytes=MAX_SEGMENT_BYTES,
+                 compact_threshold=COMPACT_THRESHOLD, durable=False, shared=False):
+        self.dirpath = dirpath
+        self.max_segment_bytes = max_segment_bytes
+        self.compact_threshold = compact_threshold
+        self.durable = durable
+        self.shared = shared
+        self._cache: Optional[List[Dict]] = None
+        self._active: Optional[Tuple[int, int]] = None  # (segment number, size in bytes)
+        self._file_lock = FileLock(os.path.join(dirpath, LOCK_FILE)) if shared else None
+        self._generation = None  # generation() the cache was read at (shared mode)
+
+    # -- Segment bookkeeping -------------------------------------------------
+
+    def _path(self, number: int) -> str:
+        return os.path.join(self.dirpath, _segment_name(number))
+
+    def _segment_numbers(self) -> List[int]:
+        if not os.path.isdir(self.dirpath):
+            return []
+        numbers = []
+        for name in os.listdir(self.dirpath):
+            match = _SEGMENT_RE.match(name)
+            if match:
+                numbers.append(int(match.group(1)))
+        return sorted(numbers)
+
+    def _read_segment(self, number: int, offset: int = 0) -> Tuple[Optional[int], List[Dict]]:
+        """Returns (compacted_from, entries) for a segment from `offset`, skipping torn or corrupt lines."""
+        with open(self._path(number), 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+
+        compacted_from = None
+        entries = []
+        lines = data.split(b"\n")
+        # Anything after the final newline is a torn write and is ignored.
+        for i, line in enumerate(lines[:-1]):
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+            if i == 0 and offset == 0 and isinstance(record, dict) and _HEADER_KEY in record:
+                compacted_from = record[_HEADER_KEY]
+                continue
+            entries.append(record)
+        return compacted_from, entries
+
+    def _read_header(self, number: int) -> Optional[int]:
+        """The segment's `compacted_from` marker, read from its first line only."""
+        with open(self._path(number), 'rb') as f:
+            line = f.readline()
+        if not line.endswith(b"\n"):
+            return None
+        try:
+            record = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return None
+        return record.get(_HEADER_KEY) if isinstance(record, dict) else None
+
+    def _live_segments(self) -> Iterator[Tuple[int, List[Dict]]]:
+        """Yields (number, entries) for segments not superseded by a compacted segment, reading one at a time."""
+        numbers = self._segment_numbers()
+
+        # A compacted segment N absorbed every segment from `compacted_from` up to N.
+        superseded = set()
+        for number in numbers:
+            compacted_from = self._read_header(number)
+            if compacted_from is not None:
+                superseded.update(n for n in numbers if compacted_from <= n < number)
+
+        for number in numbers:
+            if number in superseded:
+                # Leftover from an interrupted compaction. Another process may be reading it
+                # under a shared lock, so in shared mode only an exclusive holder removes it.
+                if not self.shared or self._file_lock.held_exclusive:
+                    os.remove(self._path(number))
+                continue
+            yield number, self._read_segment(number)[1]
+
+    def _open_active(self) -> Tuple[int, int]:
+        if self._active is not None:
+            return self._active
+
+        os.makedirs(self.dirpath, exist_ok=True)
+        numbers = self._segment_numbers()
+        if not numbers:
+            self._active = (1, 0)
+            return self._active
+
+        number = numbers[-1]
+        path = self._path(number)
+        size = os.path.getsize(path)
+        if size:
+            # Truncate a torn tail so the next append starts on a clean line.
+            with open(path, 'rb+') as f:
+                f.seek(size - 1)
+                if f.read(1) != b"\n":
+                    f.seek(0)
+                    end = f.read().rfind(b"\n") + 1
+                    f.truncate(end)
+                    size = end
+        self._active = (number, size)
+        return self._active
+
+    def _append(self, payload: bytes):
+        number, size = self._open_active()
+        if size and size + len(payload) > self.max_segment_bytes:
+            number, size = number + 1, 0
+
+        with open(self._path(number), 'ab') as f:
+            f.write(payload)
+            if self.durable:
+                f.flush()
+                os.fsync(f.fileno())
+        self._active = (number, size + len(payload))
+
+        if size == 0 and len(self._segment_numbers()) > self.compact_threshold:
+            self.compact()
+
+    @staticmethod
+    def _encode(entry: Dict) -> bytes:
+        return (json.dumps(entry, separators=(',', ':')) + "\n").encode("utf-8")
+
+    # -- Multi-process coordination ----------------------------------------
+
+    def lock(self, exclusive: bool = True):
+        return self._file_lock.hold(exclusive) if self.shared else super().lock(exclusive)
+
+    def generation(self) -> Optional[Tuple[Tuple[int, ...], int, int]]:
+        """(segment numbers, inode and size of the last segment) in shared mode, else None."""
+        if not self.shared:
+            return None
+        numbers = tuple(self._segment_numbers())
+        if not numbers:
+            return numbers, 0, 0
+        try:
+            st = os.stat(self._path(numbers[-1]))
+        except FileNotFoundError:  # Compacted away between listing and stat, outside the lock
+            return None
+        return numbers, st.st_ino, st.st_size
+
+    def _resumable_generation(self):
+        """generation(), or None if the last segment ends in a torn write.
+
+        The next append truncates a torn tail, so a cache cannot resume reading
+        from an offset inside one and is reloaded instead.
+        """
+        generation = self.generation()
+        if generation and generation[2]:
+            with open(self._path(generation[0][-1]), 'rb') as f:
+                f.seek(generation[2] - 1)
+                if f.read(1) != b"\n":
+                    return None
+        return generation
+
+    def _catch_up(self):
+        """Brings the cache up to date with other processes' writes (shared mode, lock held)."""
+        current = self.generation()
+        if self._cache is None or current == self._generation:
+            return
+        old = self._generation
+        if old and old[0] and current and current[0][:len(old[0])] == old[0]:
+            last = old[0][-1]
+            st = os.stat(self._path(last))
+            if st.st_ino == old[1] and st.st_size >= old[2]:
+                # Only appends (and roll-overs) since: read just the new bytes
+                self._cache.extend(self._read_segment(last, old[2])[1])
+                for number in current[0][len(old[0]):]:
+                    self._cache.extend(self._read_segment(number)[1])
+                self._generation = self._resumable_generation()
+                return
+        self._cache = None  # Compacted or cleared meanwhile: reload
+
+    # -- IStorage ------------------------------------------------------------
+
+    @timed("storage.load_entries")
+    def load_entries(self) -> List[Dict]:
+        with self.lock(exclusive=False):
+            if self.shared:
+                self._catch_up()
+            if self._cache is not None:
+                return self._cache
+
+            entries = []
+            for _, segment_entries in self._live_segments():
+                entries.extend(segment_entries)
+            self._cache = entries
+            self._generation = self._resumable_generation()
+            return self._cache
+
+    def iter_entries(self) -> Iterator[Dict]:
+        """Streams entries one segment at a time, without loading the whole log."""
+        with self.lock(exclusive=False):
+            if self.shared:
+                self._catch_up()
+            if self._cache is not None:
+                yield from self._cache
+                return
+            for _, segment_entries in self._live_segments():
+                yield from segment_entries
+
+    def save_entry(self, entry: Dict):
+        self.save_entries([entry])
+
+    @timed("storage.save_entries")
+    def save_entries(self, entries: List[Dict]):
+        if not entries:
+            return
+        with self.lock():
+            if self.shared:
+                self._active = None  # Another process may have appended or rolled over
+                self._catch_up()
+            self._append(b"".join(self._encode(entry) for entry in entries))
+            if self._cache is not None:
+                self._cache.extend(entries)
+            if self.shared:
+                self._generation = self._resumable_generation()
+
+    def clear_entries(self):
+        with self.lock():
+            self._cache = None
+            self._active = None
+            self._generation = None
+            for number in self._segment_numbers():
+                os.remove(self._path(number))
+
+    def close(self):
+        if self._file_lock is not None:
+            self._file_lock.close()
+
+    # -- Maintenance ---------------------------------------------------------
+
+    @timed("storage.compact")
+    def compact(self):
+        """Merges all closed segments into a single segment file."""
+        with self.lock():
+            self._compact()
+
+    def _compact(self):
+        active_number, _ = self._open_active()
+        closed = [n for n in self._segment_numbers() if n < active_number]
+        if len(closed) < 2:
+            return
+
+        entries = []
+        for number, segment_entries in self._live_segments():
+            if number < active_number:
+                entries.extend(segment_entries)
+
+        target = closed[-1]
+        tmp_path = self._path(target) + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(self._encode({_HEADER_KEY: closed[0]}))
+            for entry in entries:
+                f.write(self._encode(entry))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._path(target))
+
+        for number in closed[:-1]:
+            os.remove(self._path(number))
+
+    def migrate_from_json(self, json_path: str) -> int:
+        """Imports a legacy ``energy_log.json`` array. Returns the number of entries imported."""
+        with self.lock():
+            if self._segment_numbers():
+                raise ValueError(f"Refusing to migrate into non-empty log directory: {self.dirpath}")
+            if not os.path.exists(json_path):
+                return 0
+
+            with open(json_path, 'r') as f:
+                try:
+                    entries = json.load(f)
+                except json.JSONDecodeError:
+                    entries = []
+
+            for entry in entries:
+                self._append(self._encode(entry))
+            self._cache = None
+            return len(entries)
@@ -1,34 +1,246 @@
+import os
 import sys
+import json
 import argparse
-import time
-from src.analyzer import EnergyAnalyzer
-from src.storage import Storage
-from src.feedback import FeedbackGenerator
-from src.service import EnergyService
+import threading
+from src.daemon import DEFAULT_TIMEOUT, DaemonClient, DaemonError, DaemonUnavailable, handle
+from src.defaults import DEFAULT_BATCH_WORKERS, DEFAULT_USER, LOG_FILE
+
+# The thin-client path only needs the modules above. Everything that builds
+# an EnergyService (or talks to Gemini) is imported where it is used, so a
+# run against the daemon starts in milliseconds.
+
+MAX_TEXT_LENGTH = 5000
+BULK_CHUNK_LINES = 1000  # Logs per record_many request in quiet bulk mode
+
+def run_batch_cli(paths, workers):
+    """Analyzes audio files with Gemini, printing one JSON line per file as it completes."""
+    # Imported lazily: the Gemini SDK is only needed for audio analysis
+    import asyncio
+    from src.batch import run_batch
+    from src.gemini_client import GeminiAudioClient
+
+    try:
+        client = GeminiAudioClient()
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+    async def run():
+        failures = 0
+        async for index, path, result, error in run_batch(paths, client.analyze_energy_async, workers):
+            line = {"index": index, "path": path}
+            if error is None:
+                line["result"] = result.model_dump()
+            else:
+                failures += 1
+                line["error"] = str(error) or type(error).__name__
+            print(json.dumps(line), flush=True)
+        return failures
+
+    if asyncio.run(run()):
+        sys.exit(1)
+
+def index_path(storage, user, filename, root="."):
+    """Where a derived index (aggregates, forecast) lives for the selected storage backend."""
+    from src.log_storage import LOG_DIR
+
+    if storage == "log":
+        return os.path.join(root, LOG_DIR, filename)
+    if storage == "sqlite":
+        base, ext = os.path.splitext(filename)
+        return os.path.join(root, f"{base}.{user}{ext}")
+    return os.path.join(root, filename)
+
+def build_service(storage="json", user=DEFAULT_USER, root="."):
+    """Composition root: assembles the EnergyService for a storage backend, with files under `root`."""
+    from src.analyzer import EnergyAnalyzer
+    from src.log_storage import SegmentedLogStorage, LOG_DIR
+    from src.sqlite_storage import SQLiteStorage, DB_FILE
+    from src.storage import Storage
+    from src.feedback import FeedbackGenerator
+    from src.aggregates import HourlyAggregates, AGGREGATES_FILE
+    from src.forecast import EnergyForecaster, FORECAST_FILE
+    from src.service import EnergyService
+
+    if storage == "log":
+        backend = SegmentedLogStorage(os.path.join(root, LOG_DIR))
+    elif storage == "sqlite":
+        backend = SQLiteStorage(os.path.join(root, DB_FILE), user_id=user)
+    else:
+        backend = Storage(os.path.join(root, LOG_FILE))
+    aggregates = HourlyAggregates(index_path(storage, user, AGGREGATES_FILE, root))
+    forecaster = EnergyForecaster(index_path(storage, user, FORECAST_FILE, root))
+    return EnergyService(backend, EnergyAnalyzer(), FeedbackGenerator(), aggregates, forecaster)
+
+def call(args, op, *, timeout=DEFAULT_TIMEOUT, **params):
+    """Runs a request on the daemon when one is running, else in this process.
+
+    `timeout` bounds the wait for the daemon's reply; None waits as long as the
+    operation takes (bulk import/export and rebuilds run for minutes on large histories).
+    """
+    request = dict(storage=args.storage, user=args.user, cwd=os.getcwd(), **params)
+    if not args.no_daemon:
+        try:
+            return DaemonClient(timeout=timeout).request(op, **request)
+        except DaemonUnavailable:
+            pass
+    return handle(build_service(args.storage, args.user), {"op": op, **request})
+
+class ThinkingAnimation:
+    """Prints a dot every `interval` seconds on a background thread while the work runs."""
+
+    def __init__(self, interval=0.2, max_dots=3):
+        self.interval = interval
+        self.max_dots = max_dots
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        for _ in range(self.max_dots):
+            if self._done.wait(self.interval):
+                return
+            print(".", end="", flush=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._done.set()
+        self._thread.join()
+        print()
+        return False
+
+def read_bulk_logs(stream):
+    """Yields lists of up to BULK_CHUNK_LINES non-empty lines, exiting on a line that is too long."""
+    chunk = []
+    for number, line in enumerate(stream, 1):
+        text = line.strip()
+        if not text:
+            continue
+        if len(text) > MAX_TEXT_LENGTH:
+            print(f"❌ Error: Line {number} too long (limit {MAX_TEXT_LENGTH} chars).")
+            sys.exit(1)
+        chunk.append(text)
+        if len(chunk) >= BULK_CHUNK_LINES:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
 
 def main():
     parser = argparse.ArgumentParser(description="VocalPoint: AI Energy-Based Scheduler")
     parser.add_argument("--text", type=str, help="Simulated audio transcription log", required=False)
     parser.add_argument("--pace", type=int, help="Words per minute (default 130)", default=130)
     parser.add_argument("--tone", type=float, help="Tone valence -1.0 to 1.0 (default 0.0)", default=0.0)
+    parser.add_argument("--audio", type=str, metavar="WAV_FILE",
+                        help="Measure pace and tone from a WAV recording instead of --pace/--tone")
     parser.add_argument("--clear", action="store_true", help="Clear all stored logs")
+    parser.add_argument("--storage", choices=["json", "log", "sqlite"], default="json",
+                        help="Storage backend: single JSON file, append-only segmented log or SQLite (default json)")
+    parser.add_argument("--user", type=str, default=DEFAULT_USER,
+                        help="User whose entries to use with the SQLite backend")
+    parser.add_argument("--days", type=int, default=None,
+                        help="Only base feedback on entries from the last N days")
+    parser.add_argument("--rebuild-index", action="store_true",
+                        help="Recompute the hourly aggregate index and forecast from stored entries and exit")
+    parser.add_argument("--batch", nargs="+", metavar="AUDIO_FILE",
+                        help="Analyze recordings with Gemini, printing one JSON line per file as it completes")
+    parser.add_argument("--workers", type=int, default=DEFAULT_BATCH_WORKERS,
+                        help=f"Recordings analyzed concurrently in batch mode (default {DEFAULT_BATCH_WORKERS})")
+    parser.add_argument("--migrate", action="store_true",
+                        help=f"Import the legacy {LOG_FILE} into the append-only log and exit")
+    parser.add_argument("--import", dest="import_file", metavar="FILE",
+                        help="Import entries from a JSONL or CSV file (- for stdin), skipping duplicates, and exit")
+    parser.add_argument("--export", dest="export_file", metavar="FILE",
+                        help="Export all entries to a JSONL, CSV or NumPy .npz file (- for stdout) and exit")
+    parser.add_argument("--format", choices=["jsonl", "csv", "npz"], default=None,
+                        help="Format for --import/--export (default: from the file extension, else jsonl)")
+    parser.add_argument("-q", "--quiet", action="store_true",
+                        help="Print only the detected level; without --text, log each line of stdin")
+    parser.add_argument("--no-daemon", action="store_true",
+                        help="Run in this process even if the daemon (python -m src.daemon) is running")
 
     args = parser.parse_args()
 
-    # Composition Root: Assemble dependencies
-    storage = Storage()
-    analyzer = EnergyAnalyzer()
-    feedback_gen = FeedbackGenerator()
-    service = EnergyService(storage, analyzer, feedback_gen)
+    if args.batch:
+        if args.workers <= 0:
+            print("❌ Error: Workers must be positive.")
+            sys.exit(1)
+        run_batch_cli(args.batch, args.workers)
+        return
+
+    if args.migrate:
+        from src.log_storage import SegmentedLogStorage
+        try:
+            count = SegmentedLogStorage().migrate_from_json(LOG_FILE)
+        except ValueError as e:
+            print(f"❌ Error: {e}")
+            sys.exit(1)
+        print(f"📦 Migrated {count} entries from {LOG_FILE} to the append-only log.")
+        return
+
+    try:
+        run(args)
+    except DaemonError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+def import_entries(args):
+    path = args.import_file
+    try:
+        if path == "-":
+            # stdin cannot be handed to the daemon, so this import runs in-process
+            from src.bulk import import_file
+            stats = vars(import_file(build_service(args.storage, args.user), path, args.format))
+        else:
+            stats = call(args, "import", timeout=None, path=os.path.abspath(path), format=args.format)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: Could not import {path}: {e}")
+        sys.exit(1)
+    print(f"📥 Imported {stats['imported']} entries "
+          f"({stats['duplicates']} duplicates, {stats['rejected']} rejected).")
+    for error in stats["errors"]:
+        print(f"   ⚠️  {error}")
+
+def export_entries(args):
+    path = args.export_file
+    try:
+        if path == "-":
+            from src.bulk import export_file
+            export_file(build_service(args.storage, args.user).storage, path, args.format)
+            return
+        count = call(args, "export", timeout=None, path=os.path.abspath(path), format=args.format)["count"]
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: Could not export to {path}: {e}")
+        sys.exit(1)
+    print(f"📤 Exported {count} entries to {path}.")
+
+def run(args):
+    if args.rebuild_index:
+        count = call(args, "rebuild", timeout=None)["count"]
+        print(f"🔁 Rebuilt the energy index from {count} entries.")
+        return
 
     if args.clear:
-        service.clear_history()
+        call(args, "clear")
         print("✨ Energy logs cleared. Ready for a fresh start!")
         return
 
+    if args.import_file:
+        import_entries(args)
+        return
+
+    if args.export_file:
+        export_entries(args)
+        return
+
     # User Input Handling
     if args.text:
         text_input = args.text
+    elif args.quiet:
+        text_input = None  # Bulk logging from stdin
     else:
         print("\n👋 Hi there! Welcome to VocalPoint.")
         print("📝 How are you feeling right now? (Enter your log below)")
@@ -42,12 +254,11 @@ def main():
             return
 
     # Validation
-    if not text_input or not text_input.strip():
+    if text_input is not None and not text_input.strip():
         print("\n🤔 It looks like you didn't say anything. Please try again when you're ready!")
         return
 
-    MAX_TEXT_LENGTH = 5000
-    if len(text_input) > MAX_TEXT_LENGTH:
+    if text_input is not None and len(text_input) > MAX_TEXT_LENGTH:
         print(f"❌ Error: Input text too long (limit {MAX_TEXT_LENGTH} chars).")
         sys.exit(1)
 
@@ -59,20 +270,36 @@ def main():
         print("❌ Error: Tone must be between -1.0 and 1.0.")
         sys.exit(1)
 
-    metrics = {
-        'pace': args.pace,
-        'tone_valence': args.tone
-    }
+    if args.audio:
+        # Imported lazily: NumPy is only needed for audio
+        from src.audio_features import decode_wav, extract_features, to_metrics
+        try:
+            with open(args.audio, 'rb') as f:
+                samples, rate = decode_wav(f.read())
+            metrics = to_metrics(extract_features(samples, rate))
+        except (OSError, ValueError) as e:
+            print(f"❌ Error: Could not analyze {args.audio}: {e}")
+            sys.exit(1)
+    else:
+        metrics = {
+            'pace': args.pace,
+            'tone_valence': args.tone
+        }
 
-    print(f"\n🔍 Analyzing log: '{text_input}'", end="", flush=True)
-    # Micro-UX: Thinking animation
-    for _ in range(3):
-        time.sleep(0.2)
-        print(".", end="", flush=True)
-    print()
+    if text_input is None:
+        for chunk in read_bulk_logs(sys.stdin):
+            response = call(args, "record_many", logs=[{"text": text, "metrics": metrics} for text in chunk])
+            print("\n".join(response["energy_levels"]), flush=True)
+        return
 
-    # Delegate to Service
-    energy_level = service.record_entry(text_input, metrics)
+    if args.quiet:
+        print(call(args, "record", text=text_input, metrics=metrics, feedback=False)["energy_level"])
+        return
+
+    print(f"\n🔍 Analyzing log: '{text_input}'", end="", flush=True)
+    # Micro-UX: Thinking animation, drawn while the entry is recorded rather than before
+    with ThinkingAnimation():
+        response = call(args, "record", text=text_input, metrics=metrics, days=args.days)
 
     # Helper for display
     level_icons = {
@@ -80,12 +307,12 @@ def main():
         "medium": "🌊",
         "low": "☕"
     }
-    icon = level_icons.get(energy_level.value, "")
-    print(f"\n✨ Detected Energy Level: {icon} {energy_level.value.upper()}")
+    energy_level = response["energy_level"]
+    icon = level_icons.get(energy_level, "")
+    print(f"\n✨ Detected Energy Level: {icon} {energy_level.upper()}")
 
-    feedback = service.get_feedback()
     print("\n📊 --- Insight ---")
-    print(feedback)
+    print(response["feedback"])
     print("\n")
 
 if __name__ == "__main__":
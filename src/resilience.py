@@ -0,0 +1,205 @@
+"""
+Deadlines, retries and circuit breaking for calls to an unreliable upstream.
+
+`ResilientCaller` runs a call with a per-attempt timeout and an overall
+deadline, retrying retryable failures with full-jitter exponential backoff
+(a random delay between 0 and base * 2^attempt, capped). A `CircuitBreaker`
+counts consecutive retryable failures. Once they reach the threshold it
+opens and calls fail immediately with `CircuitOpenError` for
+`reset_timeout` seconds. After that a single probe call is let through, and
+its outcome closes or re-opens the circuit.
+
+What counts as retryable is decided by the caller, so this module knows
+nothing about a particular SDK.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 30.0
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without calling the upstream while the circuit is open."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Upstream unavailable; retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+@dataclass
+class RetryPolicy:
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    base_delay: float = 0.25
+    max_delay: float = 4.0
+
+    def backoff(self, retry: int, rand: Callable[[], float] = random.random) -> float:
+        """Full-jitter delay before retry number `retry` (1 for the first retry)."""
+        return rand() * min(self.max_delay, self.base_delay * 2 ** (retry - 1))
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout: float = DEFAULT_RESET_TIMEOUT, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if self.clock() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def before_call(self):
+        """Raises CircuitOpenError unless a call may go to the upstream now."""
+        with self._lock:
+            state = self._state()
+            if state == self.CLOSED:
+                return
+            if state == self.HALF_OPEN and not self._probing:
+                self._probing = True  # Let exactly one probe through
+                return
+            retry_after = max(0.0, self._opened_at + self.reset_timeout - self.clock())
+        raise CircuitOpenError(retry_after)
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = self.clock()
+            self._probing = False
+
+    def record_abandoned(self):
+        """A call ended without an outcome (cancelled or interrupted). A probe counts as failed,
+        so the slot is freed and the circuit re-opens instead of waiting forever for its result."""
+        with self._lock:
+            if self._probing:
+                self._opened_at = self.clock()
+                self._probing = False
+
+
+class ResilientCaller:
+    """Runs calls with a per-attempt timeout, an overall deadline, retries and a circuit breaker.
+
+    The wrapped function receives the timeout in seconds for that attempt, to
+    pass on to the client it calls.
+    """
+
+    def __init__(self, retryable: Callable[[BaseException], bool], retry: Optional[RetryPolicy] = None,
+                 breaker: Optional[CircuitBreaker] = None, timeout: Optional[float] = None,
+                 deadline: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.retryable = retryable
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker
+        self.timeout = timeout
+        self.deadline = deadline
+        self.clock = clock
+        self.attempts = 0
+        self.retries = 0
+        self.failures = 0
+
+    def call(self, fn: Callable[[Optional[float]], T], sleep: Callable[[float], None] = time.sleep) -> T:
+        give_up_at = self._give_up_at()
+        attempt = 0
+        while True:
+            attempt += 1
+            timeout = self._attempt_timeout(give_up_at)
+            self._before_attempt()
+            try:
+                result = fn(timeout)
+            except Exception as e:
+                delay = self._after_failure(e, attempt, give_up_at)
+                sleep(delay)
+                continue
+            except BaseException:
+                self._after_abandoned()
+                raise
+            self._after_success()
+            return result
+
+    async def call_async(self, fn: Callable[[Optional[float]], Awaitable[T]]) -> T:
+        give_up_at = self._give_up_at()
+        attempt = 0
+        while True:
+            attempt += 1
+            timeout = self._attempt_timeout(give_up_at)
+            self._before_attempt()
+            try:
+                # Client timeouts limit each network phase; wait_for bounds the whole attempt.
+                result = await asyncio.wait_for(fn(timeout), timeout)
+            except Exception as e:
+                delay = self._after_failure(e, attempt, give_up_at)
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:  # e.g. CancelledError on shutdown or a dropped WebSocket
+                self._after_abandoned()
+                raise
+            self._after_success()
+            return result
+
+    def _give_up_at(self) -> Optional[float]:
+        return self.clock() + self.deadline if self.deadline is not None else None
+
+    def _attempt_timeout(self, give_up_at: Optional[float]) -> Optional[float]:
+        if give_up_at is None:
+            return self.timeout
+        remaining = max(give_up_at - self.clock(), 0.0)
+        return min(self.timeout, remaining) if self.timeout is not None else remaining
+
+    def _before_attempt(self):
+        if self.breaker is not None:
+            self.breaker.before_call()
+        self.attempts += 1
+
+    def _after_success(self):
+        if self.breaker is not None:
+            self.breaker.record_success()
+
+    def _after_abandoned(self):
+        if self.breaker is not None:
+            self.breaker.record_abandoned()
+
+    def _after_failure(self, error: Exception, attempt: int, give_up_at: Optional[float]) -> float:
+        """Returns the backoff before the next attempt, or re-raises if there is none."""
+        if not self.retryable(error):
+            # The upstream answered (e.g. rejected the request), so it is healthy.
+            self._after_success()
+            raise error
+        self.failures += 1
+        if self.breaker is not None:
+            self.breaker.record_failure()
+
+        delay = self.retry.backoff(attempt)
+        if attempt >= self.retry.max_attempts or (give_up_at is not None and self.clock() + delay >= give_up_at):
+            raise error
+        self.retries += 1
+        return delay
@@ -0,0 +1,101 @@
+"""
+Downsampled energy trend.
+
+Keeps hourly and daily buckets of `energy_score` (count, sum, min, max),
+updated one entry at a time as entries arrive, so a trend chart over months
+of history reads a few hundred buckets instead of every entry. Entries
+without an `energy_score` use the score of their level, as in the forecast.
+
+Every change bumps `version`, which the API uses as an ETag so clients only
+re-download a trend or history page when the data changed.
+"""
+
+import uuid
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from src.forecast import LEVEL_TO_SCORE
+from src.index_file import PersistedIndex
+
+ROLLUPS_FILE = "energy_rollups.json"
+RESOLUTIONS = ("hour", "day")
+
+
+def bucket_start(dt: datetime, resolution: str) -> datetime:
+    if resolution == "hour":
+        return dt.replace(minute=0, second=0, microsecond=0)
+    if resolution == "day":
+        return dt.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown resolution: {resolution}. Supported: {RESOLUTIONS}")
+
+
+class TrendRollups(PersistedIndex):
+    def __init__(self, filepath: Optional[str] = ROLLUPS_FILE):
+        super().__init__(filepath)
+
+    def reset(self):
+        # Bucket start (ISO) -> [count, sum, min, max], per resolution
+        self.buckets: Dict[str, Dict[str, List[float]]] = {resolution: {} for resolution in RESOLUTIONS}
+        # A new generation on every reset, so versions are never reused after a clear or rebuild
+        self.generation = uuid.uuid4().hex[:12]
+        self.revision = 0
+
+    @property
+    def version(self) -> str:
+        return f"{self.generation}-{self.revision}"
+
+    def add(self, entry: Dict):
+        """Adds one entry's score to its buckets. Every entry bumps the version."""
+        self.revision += 1
+        try:
+            dt = datetime.fromisoformat(entry['timestamp'])
+        except (ValueError, KeyError, TypeError):
+            return
+        value = entry.get('energy_score')
+        if value is None:
+            value = LEVEL_TO_SCORE.get(entry.get('energy_level'))
+            if value is None:
+                return
+
+        value = float(value)
+        for resolution in RESOLUTIONS:
+            key = bucket_start(dt, resolution).isoformat()
+            bucket = self.buckets[resolution].get(key)
+            if bucket is None:
+                self.buckets[resolution][key] = [1, value, value, value]
+            else:
+                bucket[0] += 1
+                bucket[1] += value
+                bucket[2] = min(bucket[2], value)
+                bucket[3] = max(bucket[3], value)
+
+    def rebuild(self, entries: Iterable[Dict]):
+        self.reset()
+        for entry in entries:
+            self.add(entry)
+
+    def trend(self, resolution: str = "hour", start: Optional[datetime] = None,
+              end: Optional[datetime] = None) -> List[Dict]:
+        """Buckets whose start lies in [start, end), oldest first."""
+        buckets = self.buckets.get(resolution)
+        if buckets is None:
+            raise ValueError(f"Unknown resolution: {resolution}. Supported: {RESOLUTIONS}")
+        lo = bucket_start(start, resolution).isoformat() if start else ""
+        hi = end.isoformat() if end else None
+        return [
+            {"start": key, "count": count, "min": low, "mean": total / count, "max": high}
+            for key, (count, total, low, high) in sorted(buckets.items())
+            if lo <= key and (hi is None or key < hi)
+        ]
+
+    # -- Persistence ---------------------------------------------------------
+
+    def to_dict(self) -> Dict:
+        return {"generation": self.generation, "revision": self.revision, "buckets": self.buckets}
+
+    def from_dict(self, data: Dict):
+        buckets = data["buckets"]
+        if set(buckets) != set(RESOLUTIONS):
+            raise ValueError("unexpected resolutions")
+        self.buckets = buckets
+        self.generation = data["generation"]
+        self.revision = data["revision"]
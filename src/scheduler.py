@@ -0,0 +1,146 @@
+"""
+Energy-aware task scheduler.
+
+Places tasks into hourly slots over a multi-day horizon so that high-focus
+work lands in peak-energy windows and administrative work in low-energy ones.
+
+The energy profile is either 24 values (hour of day) or 168 values (hour of
+week, Monday 00:00 first), in the same units as the feedback scores
+(-2 = low, 0 = medium, 2 = high). Hours without data should be 0.
+
+Algorithm: tasks are taken from a priority queue, strongest focus preference
+first (very high or very low focus), then earliest deadline, then longest.
+Each task gets the free block of consecutive working-hour slots that best
+matches its preference and ends before its deadline. Block energies and slot
+occupancy are kept as prefix sums, so each placement is O(slots) in NumPy and
+hundreds of tasks over several weeks take milliseconds.
+"""
+
+import heapq
+import math
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List, Optional, Sequence
+
+DEFAULT_DAY_START = 9
+DEFAULT_DAY_END = 18
+
+
+@dataclass
+class Task:
+    name: str
+    duration_minutes: int
+    focus: float  # 0.0 = administrative, 1.0 = deep focus
+    deadline: Optional[datetime] = None
+
+
+@dataclass
+class ScheduledTask:
+    task: Task
+    start: datetime
+    end: datetime
+    energy: float  # Mean profile energy over the block
+
+
+@dataclass
+class Schedule:
+    scheduled: List[ScheduledTask] = field(default_factory=list)
+    unscheduled: List[Task] = field(default_factory=list)
+
+
+class EnergyScheduler:
+    def __init__(self, day_start: int = DEFAULT_DAY_START, day_end: int = DEFAULT_DAY_END):
+        if not 0 <= day_start < day_end <= 24:
+            raise ValueError(f"Invalid working hours: {day_start}-{day_end}")
+        self.day_start = day_start
+        self.day_end = day_end
+
+    def schedule(self, tasks: Sequence[Task], profile: Sequence[float],
+                 start: datetime, days: int = 7) -> Schedule:
+        """Assigns tasks to hourly slots between `start` and `start + days`.
+
+        Args:
+            tasks: Tasks to place.
+            profile: 24 (hour of day) or 168 (hour of week) energy values.
+            start: Start of the planning horizon; rounded up to the next full hour.
+            days: Length of the horizon in days.
+
+        Returns:
+            Schedule with placed tasks sorted by start time, and tasks that did not fit.
+        """
+        import numpy as np
+
+        if len(profile) not in (24, 168):
+            raise ValueError(f"Energy profile must have 24 or 168 values, got {len(profile)}")
+
+        slot_starts = self._slots(start, days)
+        n_slots = len(slot_starts)
+        profile = np.asarray(profile, dtype=np.float64)
+        if len(profile) == 24:
+            energy = np.array([profile[s.hour] for s in slot_starts], dtype=np.float64)
+        else:
+            energy = np.array([profile[s.weekday() * 24 + s.hour] for s in slot_starts], dtype=np.float64)
+
+        # Consecutive slots belong to the same run (working day); blocks may not span runs.
+        runs = np.zeros(n_slots, dtype=np.int64)
+        for i in range(1, n_slots):
+            contiguous = slot_starts[i] - slot_starts[i - 1] == timedelta(hours=1)
+            runs[i] = runs[i - 1] if contiguous else runs[i - 1] + 1
+        slot_ends = np.array([(s + timedelta(hours=1)).timestamp() for s in slot_starts], dtype=np.float64)
+
+        energy_sums = np.concatenate(([0.0], np.cumsum(energy)))
+        occupied = np.zeros(n_slots, dtype=np.int64)
+
+        queue = []
+        for index, task in enumerate(tasks):
+            preference = 2 * min(max(task.focus, 0.0), 1.0) - 1  # -1 wants low energy, +1 wants high
+            deadline = task.deadline.timestamp() if task.deadline else math.inf
+            heapq.heappush(queue, (-abs(preference), deadline, -task.duration_minutes, index, preference))
+
+        result = Schedule()
+        while queue:
+            _, deadline, _, index, preference = heapq.heappop(queue)
+            task = tasks[index]
+            length = max(1, math.ceil(task.duration_minutes / 60))
+            if length > n_slots:
+                result.unscheduled.append(task)
+                continue
+
+            occupied_sums = np.concatenate(([0], np.cumsum(occupied)))
+            free = occupied_sums[length:] - occupied_sums[:-length] == 0
+            same_run = runs[:n_slots - length + 1] == runs[length - 1:]
+            in_time = slot_ends[length - 1:] <= deadline
+            candidates = free & same_run & in_time
+            if not candidates.any():
+                result.unscheduled.append(task)
+                continue
+
+            block_energy = (energy_sums[length:] - energy_sums[:-length]) / length
+            scores = np.where(candidates, preference * block_energy, -np.inf)
+            best = int(np.argmax(scores))  # Ties go to the earliest block
+            occupied[best:best + length] = 1
+
+            block_start = slot_starts[best]
+            result.scheduled.append(ScheduledTask(
+                task=task,
+                start=block_start,
+                end=block_start + timedelta(minutes=task.duration_minutes),
+                energy=float(block_energy[best]),
+            ))
+
+        result.scheduled.sort(key=lambda item: item.start)
+        return result
+
+    def _slots(self, start: datetime, days: int) -> List[datetime]:
+        first = start.replace(minute=0, second=0, microsecond=0)
+        if first < start:
+            first += timedelta(hours=1)
+        horizon_end = start + timedelta(days=days)
+
+        slots = []
+        current = first
+        while current < horizon_end:
+            if self.day_start <= current.hour < self.day_end:
+                slots.append(current)
+            current += timedelta(hours=1)
+        return slots
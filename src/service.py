@@ -1,29 +1,226 @@
-from typing import Dict, Any
+import base64
+import json
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 from datetime import datetime
 from src.interfaces import IStorage, IEnergyAnalyzer, IFeedbackGenerator
+from src.metrics import timed
 from src.domain import EnergyLevel
+from src.aggregates import HourlyAggregates
+from src.forecast import EnergyForecaster, NEUTRAL_SCORE
+from src.rollups import TrendRollups
+from src.scheduler import EnergyScheduler, Schedule, Task
+
+def analysis_entry(result: Dict[str, Any], timestamp: Optional[datetime] = None) -> Dict[str, Any]:
+    """Builds a history entry from an audio analysis result (an EnergyResponse dict)."""
+    return {
+        "timestamp": (timestamp or datetime.now()).isoformat(),
+        "source": "audio",
+        "energy_level": result["energy_level"],
+        "energy_score": result.get("energy_score"),
+        "confidence": result.get("confidence"),
+        "indicators": result.get("indicators"),
+    }
+
+
+def encode_cursor(timestamp: str, skip: int) -> str:
+    """Opaque page cursor: resume after the first `skip` entries at `timestamp`."""
+    raw = json.dumps([timestamp, skip], separators=(',', ':')).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Reverses encode_cursor. Raises ValueError for a malformed cursor."""
+    try:
+        timestamp, skip = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    if not isinstance(timestamp, str) or not isinstance(skip, int) or skip < 0:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return timestamp, skip
+
 
 class EnergyService:
-    def __init__(self, storage: IStorage, analyzer: IEnergyAnalyzer, feedback_generator: IFeedbackGenerator):
+    def __init__(self, storage: IStorage, analyzer: IEnergyAnalyzer, feedback_generator: IFeedbackGenerator,
+                 aggregates: Optional[HourlyAggregates] = None, forecaster: Optional[EnergyForecaster] = None,
+                 rollups: Optional[TrendRollups] = None):
         self.storage = storage
         self.analyzer = analyzer
         self.feedback_generator = feedback_generator
+        self.aggregates = aggregates
+        self.forecaster = forecaster
+        self.rollups = rollups
+        self._generation = None  # storage.generation() the in-memory indexes reflect
 
     def record_entry(self, text: str, metrics: Dict[str, Any]) -> EnergyLevel:
-        energy_level = self.analyzer.analyze(text, metrics)
+        return self.record_logs([(text, metrics)])[0]
+
+    def record_logs(self, logs: Sequence[Tuple[str, Dict[str, Any]]]) -> List[EnergyLevel]:
+        """Analyzes and stores several text logs with one storage write. Returns their levels."""
+        timestamp = datetime.now().isoformat()
+        levels = [self.analyzer.analyze(text, metrics) for text, metrics in logs]
+        self.record_entries([
+            {
+                "timestamp": timestamp,
+                "text": text,
+                "metrics": metrics,
+                "energy_level": level.value
+            }
+            for (text, metrics), level in zip(logs, levels)
+        ])
+        return levels
+
+    def record_analysis(self, result: Dict[str, Any], timestamp: Optional[datetime] = None) -> Dict[str, Any]:
+        """Stores an audio analysis result. Returns the stored entry."""
+        entry = analysis_entry(result, timestamp)
+        self.record_entries([entry])
+        return entry
+
+    @timed("service.record_entries")
+    def record_entries(self, entries: Sequence[Dict]):
+        """Persists entries with one storage write and folds them into the derived indexes."""
+        if not entries:
+            return
+        # One exclusive section, so index files always match the history another process sees
+        with self.storage.lock():
+            self._ensure_indexes()
+            self.storage.save_entries(list(entries))
+            if self.aggregates is not None:
+                for entry in entries:
+                    self.aggregates.add(entry)
+                self.aggregates.save()
+            if self.forecaster is not None:
+                for entry in entries:
+                    self.forecaster.update(entry)
+                self.forecaster.save()
+            if self.rollups is not None:
+                for entry in entries:
+                    self.rollups.add(entry)
+                self.rollups.save()
+            self._generation = self.storage.generation()
+
+    @timed("service.get_feedback")
+    def get_feedback(self, since: Optional[datetime] = None) -> str:
+        if since is not None:
+            entries = self.storage.load_range(since, datetime.max)
+            return self.feedback_generator.generate_feedback(entries)
+
+        if self.aggregates is not None:
+            self._ensure_indexes()
+            return self.feedback_generator.generate_feedback_from_aggregates(self.aggregates)
+
+        return self.feedback_generator.generate_feedback(self.storage.load_compact())
+
+    def energy_profile(self) -> List[float]:
+        """Average energy score (-2..2) for each hour of day; 0.0 for hours without entries."""
+        if self.aggregates is not None:
+            self._ensure_indexes()
+            aggregates = self.aggregates
+        else:
+            aggregates = HourlyAggregates(filepath=None)
+            aggregates.rebuild(self.storage.load_compact())
+        averages = aggregates.hourly_averages()
+        return [averages.get(hour, 0.0) for hour in range(24)]
+
+    def forecast(self) -> List[float]:
+        """Predicted energy (0-100) for each hour of the week, Monday 00:00 first."""
+        if self.forecaster is None:
+            forecaster = EnergyForecaster(filepath=None)
+            forecaster.rebuild(self.storage.load_entries())
+            return forecaster.forecast()
+        self._ensure_indexes()
+        return self.forecaster.forecast()
+
+    def plan_schedule(self, tasks: Sequence[Task], start: Optional[datetime] = None, days: int = 7,
+                      scheduler: Optional[EnergyScheduler] = None) -> Schedule:
+        """Places tasks into the user's peak and low energy windows over the next `days` days."""
+        scheduler = scheduler or EnergyScheduler()
+        if self.forecaster is not None:
+            # Hour-of-week forecast, rescaled from 0..100 to the -2..2 score range
+            profile = [(value - NEUTRAL_SCORE) / 25.0 for value in self.forecast()]
+        else:
+            profile = self.energy_profile()
+        return scheduler.schedule(tasks, profile, start or datetime.now(), days)
+
+    @timed("service.history")
+    def history(self, start: Optional[datetime] = None, end: Optional[datetime] = None, limit: int = 100,
+                cursor: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """One page of entries in [start, end), oldest first, and the cursor for the next page (None at the end).
+
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        after = decode_cursor(cursor) if cursor else None
+        page = self.storage.load_page(start or datetime.min, end or datetime.max, limit + 1, after)
+        if len(page) <= limit:
+            return page, None
+
+        page = page[:limit]
+        last = page[-1].get('timestamp', '')
+        skip = sum(1 for entry in page if entry.get('timestamp', '') == last)
+        if after is not None and after[0] == last and skip == len(page):
+            skip += after[1]  # The whole page shares the cursor's timestamp
+        return page, encode_cursor(last, skip)
+
+    @timed("service.trend")
+    def trend(self, resolution: str = "hour", start: Optional[datetime] = None,
+              end: Optional[datetime] = None) -> List[Dict]:
+        """Downsampled energy_score buckets (count, min, mean, max) in [start, end), oldest first."""
+        if self.rollups is None:
+            rollups = TrendRollups(filepath=None)
+            rollups.rebuild(self.storage.load_entries())
+            return rollups.trend(resolution, start, end)
+        self._ensure_indexes()
+        return self.rollups.trend(resolution, start, end)
+
+    def data_version(self) -> Optional[str]:
+        """Changes whenever the history changes; None if no rollup index is kept."""
+        if self.rollups is None:
+            return None
+        self._ensure_indexes()
+        return self.rollups.version
+
+    @timed("service.rebuild_aggregates")
+    def rebuild_aggregates(self) -> int:
+        """Recomputes the aggregate index, forecast and trend rollups from raw entries. Returns the number of entries scanned."""
+        with self.storage.lock():
+            entries = self.storage.load_entries()
+            for index in self._indexes():
+                index.rebuild(entries)
+                index.save()
+            self._generation = self.storage.generation()
+            return len(entries)
+
+    def _indexes(self) -> list:
+        return [index for index in (self.aggregates, self.forecaster, self.rollups) if index is not None]
 
-        new_entry = {
-            "timestamp": datetime.now().isoformat(),
-            "text": text,
-            "metrics": metrics,
-            "energy_level": energy_level.value
-        }
-        self.storage.save_entry(new_entry)
-        return energy_level
+    def _sync_indexes(self) -> bool:
+        """Reloads index files written by another process sharing the storage. True if all are current."""
+        generation = self.storage.generation()
+        if generation != self._generation:
+            for index in self._indexes():
+                if index.filepath:
+                    index.load()
+            self._generation = generation
+        return all(index.persisted for index in self._indexes())
 
-    def get_feedback(self) -> str:
-        entries = self.storage.load_entries()
-        return self.feedback_generator.generate_feedback(entries)
+    def _ensure_indexes(self):
+        with self.storage.lock(exclusive=False):
+            if self._sync_indexes():
+                return
+        # First use without a persisted index (or after a corrupt one): build it from history once.
+        with self.storage.lock():
+            self._sync_indexes()
+            stale = [index for index in self._indexes() if not index.persisted]
+            if not stale:
+                return
+            entries = self.storage.load_entries()
+            for index in stale:
+                index.rebuild(entries)
+                index.save()
 
     def clear_history(self):
-        self.storage.clear_entries()
+        with self.storage.lock():
+            self.storage.clear_entries()
+            for index in self._indexes():
+                index.clear()
+            self._generation = self.storage.generation()
@@ -0,0 +1,161 @@
+"""
+SQLite-backed storage for VocalPoint energy entries.
+
+All users share one database; every query is scoped to the instance's
+``user_id`` and served from the (user_id, timestamp) or (user_id, energy_level)
+index, so range and recency queries only read the rows they return.
+
+SQLite already serializes writers across processes. `shared=True` adds the
+cross-process lock and generation that EnergyService uses to keep its
+derived index files consistent when several processes write (see
+src/locking.py).
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.defaults import DEFAULT_USER
+from src.interfaces import IStorage
+from src.locking import FileLock
+from src.metrics import timed
+
+DB_FILE = "energy_log.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    energy_level TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_user_ts ON entries (user_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_entries_user_level ON entries (user_id, energy_level);
+"""
+
+
+class SQLiteStorage(IStorage):
+    def __init__(self, db_path=DB_FILE, user_id=DEFAULT_USER, shared=False):
+        self.db_path = db_path
+        self.user_id = user_id
+        self.shared = shared
+        self._file_lock = FileLock(f"{db_path}.{user_id}.lock") if shared else None
+        self._writes = 0  # Commits on this connection, which data_version does not count
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def lock(self, exclusive: bool = True):
+        return self._file_lock.hold(exclusive) if self.shared else super().lock(exclusive)
+
+    def generation(self):
+        if not self.shared:
+            return None
+        with self._lock:
+            (data_version,) = self._conn.execute("PRAGMA data_version").fetchone()
+        return data_version, self._writes
+
+    def _query(self, sql: str, params: tuple) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    @timed("storage.load_entries")
+    def load_entries(self) -> List[Dict]:
+        return self._query(
+            "SELECT data FROM entries WHERE user_id = ? ORDER BY timestamp, id",
+            (self.user_id,),
+        )
+
+    def iter_entries(self, chunk_size: int = 1000) -> Iterator[Dict]:
+        """Streams the user's entries in timestamp order, `chunk_size` rows at a time."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT data FROM entries WHERE user_id = ? ORDER BY timestamp, id", (self.user_id,)
+            )
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            for (data,) in rows:
+                yield json.loads(data)
+
+    def save_entry(self, entry: Dict):
+        self.save_entries([entry])
+
+    @timed("storage.save_entries")
+    def save_entries(self, entries: List[Dict]):
+        # One transaction per batch: a single WAL commit instead of one per entry
+        rows = [
+            (self.user_id, entry.get('timestamp', ''), entry.get('energy_level'),
+             json.dumps(entry, separators=(',', ':')))
+            for entry in entries
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO entries (user_id, timestamp, energy_level, data) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._writes += 1
+
+    def clear_entries(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries WHERE user_id = ?", (self.user_id,))
+            self._writes += 1
+
+    @timed("storage.load_range")
+    def load_range(self, start: datetime, end: datetime) -> List[Dict]:
+        return self._query(
+            "SELECT data FROM entries WHERE user_id = ? AND timestamp >= ? AND timestamp < ? "
+            "ORDER BY timestamp, id",
+            (self.user_id, start.isoformat(), end.isoformat()),
+        )
+
+    @timed("storage.load_page")
+    def load_page(self, start: datetime, end: datetime, limit: int,
+                  after: Optional[Tuple[str, int]] = None) -> List[Dict]:
+        lo, skip = start.isoformat(), 0
+        if after is not None and after[0] >= lo:
+            lo, skip = after
+        # Seeks on idx_entries_user_ts; the offset only covers entries sharing the cursor's timestamp
+        return self._query(
+            "SELECT data FROM entries WHERE user_id = ? AND timestamp >= ? AND timestamp < ? "
+            "ORDER BY timestamp, id LIMIT ? OFFSET ?",
+            (self.user_id, lo, end.isoformat(), limit, skip),
+        )
+
+    def load_last(self, n: int) -> List[Dict]:
+        if n <= 0:
+            return []
+        entries = self._query(
+            "SELECT data FROM entries WHERE user_id = ? ORDER BY timestamp DESC, id DESC LIMIT ?",
+            (self.user_id, n),
+        )
+        entries.reverse()
+        return entries
+
+    def load_by_level(self, energy_level: str) -> List[Dict]:
+        return self._query(
+            "SELECT data FROM entries WHERE user_id = ? AND energy_level = ? ORDER BY timestamp, id",
+            (self.user_id, energy_level),
+        )
+
+    def count_entries(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute(
+                "SELECT COUNT(*) FROM entries WHERE user_id = ?", (self.user_id,)
+            ).fetchone()
+        return count
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+        if self._file_lock is not None:
+            self._file_lock.close()
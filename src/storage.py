@@ -1,40 +1,92 @@
 import json
 import os
 from typing import List, Dict, Optional
+from src.defaults import LOG_FILE
+from src.domain import EntryTable
 from src.interfaces import IStorage
-
-LOG_FILE = "energy_log.json"
+from src.locking import FileLock, file_generation
+from src.metrics import timed
 
 class Storage(IStorage):
-    def __init__(self, filepath=LOG_FILE):
+    def __init__(self, filepath=LOG_FILE, shared=False):
+        """`shared=True` makes the file safe for several processes (see src/locking.py):
+        writes hold an exclusive lock and merge with the current file, and the
+        cache is dropped whenever another process changed it."""
         self.filepath = filepath
+        self.shared = shared
         self._cache: Optional[List[Dict]] = None
+        self._table: Optional[EntryTable] = None
+        self._file_lock = FileLock(filepath + ".lock") if shared else None
+        self._generation = None  # file_generation() the caches were read at (shared mode)
 
-    def load_entries(self) -> List[Dict]:
-        if self._cache is not None:
-            return self._cache
+    def lock(self, exclusive: bool = True):
+        return self._file_lock.hold(exclusive) if self.shared else super().lock(exclusive)
 
-        if not os.path.exists(self.filepath):
-            self._cache = []
-            return self._cache
+    def generation(self):
+        return file_generation(self.filepath) if self.shared else None
+
+    def _current(self) -> bool:
+        if not self.shared:
+            return True
+        if file_generation(self.filepath) == self._generation:
+            return True
+        self._cache = self._table = None
+        return False
 
+    def _read(self) -> List[Dict]:
+        self._generation = self.generation()
         try:
             with open(self.filepath, 'r') as f:
-                self._cache = json.load(f)
-        except json.JSONDecodeError:
-            self._cache = []
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return []
 
-        return self._cache
+    @timed("storage.load_entries")
+    def load_entries(self) -> List[Dict]:
+        with self.lock(exclusive=False):
+            if not self._current() or self._cache is None:
+                self._cache = self._read()
+            return self._cache
+
+    @timed("storage.load_compact")
+    def load_compact(self) -> EntryTable:
+        # Built straight from the file when the dicts are not cached. json.load still
+        # parses the whole list, but it is dropped once the table is built instead of
+        # being cached, so a read-only process (e.g. feedback without an index) keeps
+        # only the table.
+        with self.lock(exclusive=False):
+            if not self._current() or self._table is None:
+                self._table = EntryTable.from_dicts(self._cache if self._cache is not None else self._read())
+            return self._table
 
     def save_entry(self, entry: Dict):
-        entries = self.load_entries()
-        entries.append(entry)
-        with open(self.filepath, 'w') as f:
-            # Bolt: Optimize file size and I/O by removing whitespace (indent=4 -> default separators)
-            # Reduces file size by ~30% and improves read/write speed.
-            json.dump(entries, f, separators=(',', ':'))
+        self.save_entries([entry])
+
+    @timed("storage.save_entries")
+    def save_entries(self, entries: List[Dict]):
+        # The whole file is rewritten on every save, so a batch costs one rewrite instead of one per entry.
+        with self.lock():
+            all_entries = self.load_entries()  # Includes other processes' writes in shared mode
+            all_entries.extend(entries)
+            if self._table is not None:
+                self._table.extend(entries)
+            # Written to a temporary file and renamed, so readers never see a half-written history
+            tmp_path = f"{self.filepath}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                # Bolt: Optimize file size and I/O by removing whitespace (indent=4 -> default separators)
+                # Reduces file size by ~30% and improves read/write speed.
+                json.dump(all_entries, f, separators=(',', ':'))
+            os.replace(tmp_path, self.filepath)
+            self._generation = self.generation()
 
     def clear_entries(self):
-        self._cache = None
-        if os.path.exists(self.filepath):
-            os.remove(self.filepath)
+        with self.lock():
+            self._cache = None
+            self._table = None
+            self._generation = None
+            if os.path.exists(self.filepath):
+                os.remove(self.filepath)
+
+    def close(self):
+        if self._file_lock is not None:
+            self._file_lock.close()
@@ -0,0 +1,117 @@
+"""
+Incremental ingestion of an audio recording sent in chunks while it is made.
+
+Chunks are appended to one growing bytearray (amortized, no per-chunk
+copies). For WAV and raw PCM streams, local vocal features are recomputed
+over the last `window_seconds` of audio every `update_seconds` of new audio,
+so each update costs the same however long the recording gets. Compressed
+formats (WebM, MP3, OGG) are only buffered.
+
+When the stream ends, `payload` returns the whole recording ready for the
+model. Raw PCM is wrapped in a WAV container, and streamed WAV gets a header
+with the real length.
+"""
+
+from typing import Any, Dict, Optional, Tuple
+
+from src.audio_features import LocalAudioAnalyzer, PcmFormat, decode_pcm, parse_wav_header, pcm_to_wav
+
+PCM_MIME_TYPE = "audio/pcm"  # Little-endian integer samples; format given when the stream starts
+WAV_STREAM_TYPES = ("audio/wav", "audio/x-wav", "audio/wave")
+
+DEFAULT_WINDOW_SECONDS = 5.0
+DEFAULT_UPDATE_SECONDS = 0.5
+
+
+class StreamTooLarge(ValueError):
+    pass
+
+
+class AudioStream:
+    def __init__(self, content_type: str, max_bytes: int, pcm_format: Optional[PcmFormat] = None,
+                 analyzer: Optional[LocalAudioAnalyzer] = None,
+                 window_seconds: float = DEFAULT_WINDOW_SECONDS, update_seconds: float = DEFAULT_UPDATE_SECONDS):
+        if content_type == PCM_MIME_TYPE and pcm_format is None:
+            raise ValueError("Raw PCM streams need a sample format")
+        self.content_type = content_type
+        self.max_bytes = max_bytes
+        self.window_seconds = window_seconds
+        self.update_seconds = update_seconds
+        self.buffer = bytearray()
+        self._analyzer = analyzer
+        # Where samples start in the buffer, once known
+        self._format = pcm_format if content_type == PCM_MIME_TYPE else None
+        self._data_offset = 0 if content_type == PCM_MIME_TYPE else None
+        self._next_update = 0
+
+    @property
+    def size(self) -> int:
+        return len(self.buffer)
+
+    @property
+    def has_samples(self) -> bool:
+        return self.content_type == PCM_MIME_TYPE or self.content_type in WAV_STREAM_TYPES
+
+    def append(self, chunk: bytes) -> Optional[Dict[str, Any]]:
+        """Adds a chunk. Returns running features when an update is due, else None.
+
+        Raises:
+            StreamTooLarge: If the recording exceeds max_bytes.
+            ValueError: If a WAV stream's header is invalid.
+        """
+        if len(self.buffer) + len(chunk) > self.max_bytes:
+            raise StreamTooLarge(f"Audio stream too large. Maximum size is {self.max_bytes} bytes.")
+        self.buffer += chunk
+        if not self.has_samples:
+            return None
+
+        if self._data_offset is None:
+            header = parse_wav_header(bytes(self.buffer[:4096]))
+            if header is None:
+                if len(self.buffer) > 4096:
+                    raise ValueError("WAV header not found in the first 4096 bytes")
+                return None
+            self._format, self._data_offset = header
+
+        fmt = self._format
+        frame_bytes = fmt.sample_width * fmt.channels
+        bytes_per_second = fmt.sample_rate * frame_bytes
+        data_bytes = len(self.buffer) - self._data_offset
+        if data_bytes < self._next_update:
+            return None
+        self._next_update = data_bytes + int(self.update_seconds * bytes_per_second)
+        return self._running_features(data_bytes, frame_bytes, bytes_per_second)
+
+    def _running_features(self, data_bytes: int, frame_bytes: int, bytes_per_second: int) -> Optional[Dict[str, Any]]:
+        fmt = self._format
+        usable = data_bytes - data_bytes % frame_bytes
+        window = min(usable, int(self.window_seconds * bytes_per_second) // frame_bytes * frame_bytes)
+        end = self._data_offset + usable
+        # Copy only the window: a view would pin the bytearray and block further appends
+        samples = decode_pcm(bytes(self.buffer[end - window:end]), fmt.sample_rate, fmt.sample_width, fmt.channels)
+
+        if self._analyzer is None:
+            self._analyzer = LocalAudioAnalyzer()
+        try:
+            analysis = self._analyzer.analyze_samples(samples, fmt.sample_rate)
+        except ValueError:
+            return None  # Not enough audio yet
+        return {
+            "seconds": round(usable / bytes_per_second, 2),
+            "energy_level": analysis.energy_level.value,
+            "energy_score": analysis.energy_score,
+            "confidence": analysis.confidence,
+            "metrics": {key: analysis.metrics[key] for key in ("pace", "tone_valence", "rms_db", "pause_ratio")},
+        }
+
+    def payload(self) -> Tuple[bytes, str]:
+        """The complete recording and its MIME type, ready for analysis."""
+        if self._format is None:
+            return bytes(self.buffer), self.content_type
+        frame_bytes = self._format.sample_width * self._format.channels
+        data = memoryview(self.buffer)[self._data_offset:]
+        data = data[:len(data) - len(data) % frame_bytes]
+        try:
+            return pcm_to_wav(data, self._format), "audio/wav"
+        finally:
+            data.release()
@@ -0,0 +1,150 @@
+"""
+Multi-tenant access to energy histories.
+
+Each user's entries and derived indexes live in their own shard directory:
+
+    <data_dir>/users/<2-char hash prefix>/<user_id>/
+
+The hash prefix keeps directories small with many thousands of users. Only
+a bounded number of shards are open at once. The least recently used idle
+shard is closed when the pool is full, so memory stays flat no matter how
+many users exist.
+
+With `shared=True`, shards can be opened by several processes at once (e.g.
+uvicorn workers). Their storage takes cross-process locks, and each
+service reloads its indexes when another process has written.
+"""
+
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from src.aggregates import HourlyAggregates, AGGREGATES_FILE
+from src.analyzer import EnergyAnalyzer
+from src.feedback import FeedbackGenerator
+from src.forecast import EnergyForecaster, FORECAST_FILE
+from src.interfaces import IEnergyAnalyzer, IFeedbackGenerator, IStorage
+from src.log_storage import SegmentedLogStorage
+from src.rollups import TrendRollups, ROLLUPS_FILE
+from src.service import EnergyService
+from src.sqlite_storage import SQLiteStorage
+from src.storage import Storage
+
+DATA_DIR = "energy_data"
+DEFAULT_MAX_OPEN_USERS = 256
+STORAGE_BACKENDS = ("log", "json", "sqlite")
+
+USER_ID_PATTERN = r"^[A-Za-z0-9_-]{1,64}$"
+_USER_ID_RE = re.compile(USER_ID_PATTERN)
+
+
+def validate_user_id(user_id: str) -> str:
+    """Returns the user id, or raises ValueError if it is not safe to use as a shard name."""
+    # fullmatch: with match, "$" would also accept a trailing newline
+    if not isinstance(user_id, str) or not _USER_ID_RE.fullmatch(user_id):
+        raise ValueError(f"Invalid user id: {user_id!r}")
+    return user_id
+
+
+class _Shard:
+    __slots__ = ("service", "lock", "active")
+
+    def __init__(self, service: EnergyService):
+        self.service = service
+        self.lock = threading.RLock()
+        self.active = 0
+
+
+class UserServiceRegistry:
+    def __init__(self, data_dir: str = DATA_DIR, max_open: int = DEFAULT_MAX_OPEN_USERS, backend: str = "log",
+                 analyzer: Optional[IEnergyAnalyzer] = None, feedback_generator: Optional[IFeedbackGenerator] = None,
+                 shared: bool = False):
+        if backend not in STORAGE_BACKENDS:
+            raise ValueError(f"Unknown storage backend: {backend}. Supported: {STORAGE_BACKENDS}")
+        self.data_dir = data_dir
+        self.max_open = max_open
+        self.backend = backend
+        self.shared = shared
+        # Stateless collaborators are shared by every user's service
+        self.analyzer = analyzer or EnergyAnalyzer()
+        self.feedback_generator = feedback_generator or FeedbackGenerator()
+        self._shards: "OrderedDict[str, _Shard]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def shard_dir(self, user_id: str) -> str:
+        validate_user_id(user_id)
+        prefix = hashlib.sha256(user_id.encode("utf-8")).hexdigest()[:2]
+        return os.path.join(self.data_dir, "users", prefix, user_id)
+
+    @contextmanager
+    def session(self, user_id: str) -> Iterator[EnergyService]:
+        """Yields the user's service with exclusive access to their shard for the duration."""
+        shard = self._acquire(user_id)
+        try:
+            with shard.lock:
+                yield shard.service
+        finally:
+            with self._lock:
+                shard.active -= 1
+                self._evict()
+
+    def open_count(self) -> int:
+        with self._lock:
+            return len(self._shards)
+
+    def close(self):
+        with self._lock:
+            for shard in self._shards.values():
+                self._close(shard)
+            self._shards.clear()
+
+    def _acquire(self, user_id: str) -> _Shard:
+        validate_user_id(user_id)
+        with self._lock:
+            shard = self._shards.get(user_id)
+            if shard is None:
+                shard = _Shard(self._open(user_id))
+                self._shards[user_id] = shard
+            self._shards.move_to_end(user_id)
+            shard.active += 1
+            self._evict()
+            return shard
+
+    def _open(self, user_id: str) -> EnergyService:
+        directory = self.shard_dir(user_id)
+        os.makedirs(directory, exist_ok=True)
+
+        storage: IStorage
+        if self.backend == "log":
+            storage = SegmentedLogStorage(os.path.join(directory, "log.d"), shared=self.shared)
+        elif self.backend == "sqlite":
+            storage = SQLiteStorage(os.path.join(directory, "energy_log.db"), user_id=user_id, shared=self.shared)
+        else:
+            storage = Storage(os.path.join(directory, "energy_log.json"), shared=self.shared)
+
+        return EnergyService(
+            storage,
+            self.analyzer,
+            self.feedback_generator,
+            HourlyAggregates(os.path.join(directory, AGGREGATES_FILE)),
+            EnergyForecaster(os.path.join(directory, FORECAST_FILE)),
+            TrendRollups(os.path.join(directory, ROLLUPS_FILE)),
+        )
+
+    def _evict(self):
+        # Close least recently used idle shards; shards in use are skipped and closed later.
+        while len(self._shards) > self.max_open:
+            idle = next((uid for uid, shard in self._shards.items() if shard.active == 0), None)
+            if idle is None:
+                return
+            self._close(self._shards.pop(idle))
+
+    @staticmethod
+    def _close(shard: _Shard):
+        close = getattr(shard.service.storage, "close", None)
+        if close is not None:
+            close()
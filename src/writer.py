@@ -0,0 +1,111 @@
+"""
+Buffered background persistence for per-user history entries.
+
+Request handlers call `submit`, which only appends to an in-memory buffer
+and returns. A single writer thread drains the buffer every
+`flush_interval` seconds (sooner once `max_batch` entries are waiting),
+groups the entries by user and writes each user's batch with one
+`EnergyService.record_entries` call. Responses never wait on disk I/O, and
+a burst of requests becomes a few large writes instead of many small ones.
+
+Call `close` on shutdown to write out anything still buffered.
+"""
+
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from src.tenancy import UserServiceRegistry, validate_user_id
+
+DEFAULT_FLUSH_INTERVAL = 0.5
+DEFAULT_MAX_BATCH = 500
+
+logger = logging.getLogger(__name__)
+
+
+class BufferedEntryWriter:
+    def __init__(self, registry: UserServiceRegistry, flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 max_batch: int = DEFAULT_MAX_BATCH):
+        self.registry = registry
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.written = 0
+        self.failed = 0
+        self._cond = threading.Condition()
+        self._pending: List[Tuple[str, Dict]] = []
+        self._writing = False
+        self._flush_requested = False
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, user_id: str, entry: Dict):
+        """Queues an entry for the user's history. Never blocks on storage."""
+        validate_user_id(user_id)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Entry writer is closed")
+            self._pending.append((user_id, entry))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="entry-writer", daemon=True)
+                self._thread.start()
+            if len(self._pending) >= self.max_batch:
+                self._cond.notify_all()
+
+    def pending(self) -> int:
+        """Entries submitted but not yet written."""
+        with self._cond:
+            return len(self._pending)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until everything submitted so far is written. Returns False on timeout."""
+        with self._cond:
+            if self._thread is None:
+                return True
+            self._flush_requested = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: not self._pending and not self._writing, timeout)
+
+    def close(self, timeout: Optional[float] = None):
+        """Writes out buffered entries and stops the writer thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._closed or self._flush_requested or len(self._pending) >= self.max_batch,
+                    self.flush_interval,
+                )
+                batch, self._pending = self._pending, []
+                self._writing = bool(batch)
+                self._flush_requested = False
+                closing = self._closed
+
+            if batch:
+                self._write(batch)
+
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+                if closing and not self._pending:
+                    return
+
+    def _write(self, batch: List[Tuple[str, Dict]]):
+        by_user: Dict[str, List[Dict]] = {}
+        for user_id, entry in batch:
+            by_user.setdefault(user_id, []).append(entry)
+
+        for user_id, entries in by_user.items():
+            try:
+                with self.registry.session(user_id) as service:
+                    service.record_entries(entries)
+                self.written += len(entries)
+            except Exception:
+                # One user's failing shard must not stop the writer for everyone else.
+                self.failed += len(entries)
+                logger.exception("Failed to write %d entries for user %s", len(entries), user_id)
@@ -0,0 +1,87 @@
+"""
+Local stand-in for the Gemini REST API used by client and API tests.
+
+Serves `generateContent` with a configurable delay and canned energy analysis,
+so the real SDK can be exercised end to end without network access. `errors`
+is a list of HTTP status codes returned, in order, by the first requests,
+for exercising retries and the circuit breaker.
+"""
+
+import json
+import threading
+import time
+from typing import List, Optional
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+DEFAULT_ANALYSIS = {
+    "energy_level": "high",
+    "confidence": 0.9,
+    "energy_score": 80,
+    "indicators": {
+        "tone": "positive",
+        "pace": "fast",
+        "emotion": "excited",
+        "non_speech_cues": ["laughter"]
+    }
+}
+
+
+class _Server(ThreadingHTTPServer):
+    # The default listen backlog of 5 drops connections in concurrent tests, which then stall for a SYN retry.
+    request_queue_size = 128
+
+
+class FakeGeminiServer:
+    def __init__(self, delay: float = 0.0, analysis: dict = None, errors: Optional[List[int]] = None):
+        self.delay = delay
+        self.analysis = analysis or DEFAULT_ANALYSIS
+        self.errors = list(errors or [])
+        self.request_count = 0
+        self.bodies: List[dict] = []
+        self._lock = threading.Lock()
+        self._server = _Server(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with fake._lock:
+                    fake.request_count += 1
+                    fake.bodies.append(json.loads(raw or b"{}"))
+                    status = fake.errors.pop(0) if fake.errors else 200
+                time.sleep(fake.delay)
+
+                if status != 200:
+                    body = json.dumps({"error": {"code": status, "message": "injected failure",
+                                                 "status": "UNAVAILABLE"}}).encode()
+                else:
+                    body = json.dumps({
+                        "candidates": [{
+                            "content": {"role": "model", "parts": [{"text": json.dumps(fake.analysis)}]}
+                        }]
+                    }).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
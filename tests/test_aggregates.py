@@ -0,0 +1,107 @@
+import unittest
+import os
+import tempfile
+from datetime import datetime, timedelta
+from src.aggregates import HourlyAggregates
+from src.analyzer import EnergyAnalyzer
+from src.domain import EntryTable
+from src.feedback import FeedbackGenerator
+from src.service import EnergyService
+from src.storage import Storage
+
+class TestHourlyAggregates(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.index_path = os.path.join(self.tmpdir.name, "aggregates.json")
+        base = datetime(2023, 1, 2, 10, 0, 0)  # A Monday
+        self.entries = [
+            {"timestamp": base.isoformat(), "energy_level": "high"},
+            {"timestamp": (base + timedelta(days=1)).isoformat(), "energy_level": "medium"},
+            {"timestamp": (base + timedelta(hours=4)).isoformat(), "energy_level": "low"},
+            {"timestamp": "not a timestamp", "energy_level": "high"},
+        ]
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_incremental_matches_rebuild(self):
+        incremental = HourlyAggregates(filepath=None)
+        for entry in self.entries:
+            incremental.add(entry)
+
+        rebuilt = HourlyAggregates(filepath=None)
+        rebuilt.rebuild(self.entries)
+
+        self.assertEqual(incremental.to_dict(), rebuilt.to_dict())
+        self.assertEqual(incremental.total, 4)
+        self.assertEqual(incremental.hourly_averages(), {10: 1.0, 14: -2.0})
+        self.assertEqual(incremental.weekday_hourly_averages(0), {10: 2.0, 14: -2.0})
+
+    def test_table_rebuild_matches_dicts(self):
+        entries = self.entries + [
+            {"timestamp": "2023-01-08T23:59:59+05:00", "energy_level": "high"},  # Sunday, wall clock
+            {"timestamp": "2023-01-03T10:00:00", "energy_level": "ecstatic"},
+            {"timestamp": "2023-01-03T10:00:00"},
+        ]
+        from_dicts = HourlyAggregates(filepath=None)
+        from_dicts.rebuild(entries)
+        from_table = HourlyAggregates(filepath=None)
+        from_table.rebuild(EntryTable.from_dicts(entries))
+
+        self.assertEqual(from_table.to_dict(), from_dicts.to_dict())
+        self.assertEqual(from_table.weekday_hourly_averages(6), {23: 2.0})
+        self.assertEqual(from_table.total, len(entries))
+        self.assertEqual(from_table.weekday_hour_counts[1][10], 1)  # Unknown and missing levels skip their hour
+
+    def test_storage_compact_table_follows_saves(self):
+        storage = Storage(os.path.join(self.tmpdir.name, "log.json"))
+        storage.save_entries(self.entries[:2])
+        reopened = Storage(storage.filepath)
+        table = reopened.load_compact()
+        self.assertEqual(len(table), 2)
+        self.assertIsNone(reopened._cache)  # Built without keeping the dicts
+
+        reopened.save_entry(self.entries[2])
+        self.assertIs(reopened.load_compact(), table)
+        self.assertEqual(list(table.levels), [2, 1, 0])
+
+        service = EnergyService(reopened, EnergyAnalyzer(), FeedbackGenerator())
+        self.assertIn("based on 3 entries", service.get_feedback())
+
+    def test_persistence_round_trip(self):
+        aggregates = HourlyAggregates(self.index_path)
+        aggregates.rebuild(self.entries)
+        aggregates.save()
+
+        reloaded = HourlyAggregates(self.index_path)
+        self.assertTrue(reloaded.persisted)
+        self.assertEqual(reloaded.to_dict(), aggregates.to_dict())
+
+    def test_feedback_from_aggregates_matches_entries(self):
+        generator = FeedbackGenerator()
+        aggregates = HourlyAggregates(filepath=None)
+        aggregates.rebuild(self.entries)
+        self.assertEqual(
+            generator.generate_feedback_from_aggregates(aggregates),
+            generator.generate_feedback(self.entries),
+        )
+
+    def test_service_updates_and_rebuilds_index(self):
+        storage = Storage(os.path.join(self.tmpdir.name, "log.json"))
+        for entry in self.entries:
+            storage.save_entry(entry)
+
+        # A missing index is built from existing history on first use
+        service = EnergyService(storage, EnergyAnalyzer(), FeedbackGenerator(), HourlyAggregates(self.index_path))
+        service.record_entry("I am excited", {})
+        self.assertEqual(service.aggregates.total, 5)
+        self.assertEqual(HourlyAggregates(self.index_path).total, 5)
+
+        self.assertEqual(service.rebuild_aggregates(), 5)
+
+        service.clear_history()
+        self.assertFalse(os.path.exists(self.index_path))
+        self.assertIn("No energy logs found", service.get_feedback())
+
+if __name__ == '__main__':
+    unittest.main()
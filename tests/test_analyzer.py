@@ -1,4 +1,5 @@
 import unittest
+import random
 from src.analyzer import EnergyAnalyzer
 from src.domain import EnergyLevel
 
@@ -40,5 +41,32 @@ class TestEnergyAnalyzer(unittest.TestCase):
         level = self.analyzer.analyze(text, metrics)
         self.assertEqual(level, EnergyLevel.MEDIUM)
 
+    def test_analyze_many_matches_scalar(self):
+        rng = random.Random(42)
+        words = ["I", "am", "so", "excited", "tired", "slowly", "greatest", "sick", "ready",
+                 "lunch", "energetically", "drained", "pumped", "sleepy", "focused", "exhausted"]
+        paces = [None, 0, 90, 110, 130, 160, 170, -5]
+        tones = [None, 0, 0.0, 0.5, 0.6, -0.5, -0.9, 1.0]
+
+        texts, metrics = [], []
+        for _ in range(500):
+            texts.append(" ".join(rng.choice(words) for _ in range(rng.randint(0, 8))))
+            choice = rng.random()
+            if choice < 0.1:
+                metrics.append(None)
+            else:
+                metrics.append({'pace': rng.choice(paces), 'tone_valence': rng.choice(tones)})
+
+        expected = [self.analyzer.analyze(t, m) for t, m in zip(texts, metrics)]
+        self.assertEqual(self.analyzer.analyze_many(texts, metrics), expected)
+
+    def test_analyze_many_without_metrics(self):
+        levels = self.analyzer.analyze_many(["I am excited and ready", "so tired and sick", "lunch"])
+        self.assertEqual(levels, [EnergyLevel.HIGH, EnergyLevel.LOW, EnergyLevel.MEDIUM])
+
+    def test_analyze_many_length_mismatch(self):
+        with self.assertRaises(ValueError):
+            self.analyzer.analyze_many(["a", "b"], [{}])
+
 if __name__ == '__main__':
     unittest.main()
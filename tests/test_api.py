@@ -0,0 +1,145 @@
+import unittest
+import asyncio
+import tempfile
+import httpx
+from fastapi.testclient import TestClient
+from src import api
+from src.gemini_client import EnergyResponse
+from src.tenancy import UserServiceRegistry
+from tests.fake_gemini import DEFAULT_ANALYSIS
+
+class StubAudioClient:
+    """Records what the API hands to the model client."""
+
+    def __init__(self, delay=0.0, error=None):
+        self.calls = []
+        self.delay = delay
+        self.error = error
+
+    async def analyze_audio_async(self, audio, mime_type="audio/webm"):
+        self.calls.append((audio, mime_type))
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return EnergyResponse.model_validate(DEFAULT_ANALYSIS)
+
+class TestAnalyzeEndpoint(unittest.TestCase):
+    def setUp(self):
+        self.stub = StubAudioClient()
+        api.gemini_client = self.stub
+        self.client = TestClient(api.app)
+        self.original_limit = api.MAX_UPLOAD_BYTES
+
+    def tearDown(self):
+        api.gemini_client = None
+        api.MAX_UPLOAD_BYTES = self.original_limit
+
+    def test_upload_is_passed_in_memory(self):
+        audio = b"RIFF" + b"\x00" * 200_000
+        response = self.client.post("/analyze", files={"file": ("clip.wav", audio, "audio/wav")})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["energy_level"], "high")
+        self.assertEqual(self.stub.calls, [(audio, "audio/wav")])
+
+    def test_oversized_upload_rejected(self):
+        api.MAX_UPLOAD_BYTES = 1024
+        response = self.client.post("/analyze", files={"file": ("clip.webm", b"x" * 4096, "audio/webm")})
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(self.stub.calls, [])
+
+    def test_stats_do_not_create_a_client(self):
+        api.gemini_client = None
+        response = self.client.get("/cache/stats")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"enabled": False})
+
+        response = self.client.get("/upload/stats")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["uploads"], 0)
+        self.assertIsNone(api.gemini_client)
+
+    def test_unsupported_type_rejected(self):
+        response = self.client.post("/analyze", files={"file": ("notes.txt", b"hello", "text/plain")})
+        self.assertEqual(response.status_code, 400)
+
+class TestRequestCoalescing(unittest.TestCase):
+    def tearDown(self):
+        api.gemini_client = None
+
+    async def _post_many(self, uploads, users=None):
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await asyncio.gather(*(
+                http.post("/analyze", files={"file": ("clip.webm", audio, "audio/webm")},
+                          data={"user_id": user} if user else None)
+                for audio, user in zip(uploads, users or [None] * len(uploads))
+            ))
+
+    def test_identical_concurrent_uploads_share_one_call(self):
+        stub = StubAudioClient(delay=0.1)
+        api.gemini_client = stub
+        responses = asyncio.run(self._post_many([b"same", b"same", b"same", b"different"]))
+
+        self.assertEqual([r.status_code for r in responses], [200] * 4)
+        self.assertEqual(len(stub.calls), 2)
+        self.assertEqual(len(api.inflight_analyses), 0)
+
+    def test_coalesced_uploads_are_recorded_once_per_user(self):
+        api.gemini_client = StubAudioClient(delay=0.1)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            api.registry = UserServiceRegistry(tmpdir)
+            try:
+                responses = asyncio.run(self._post_many([b"same"] * 3, ["alice", "alice", "bob"]))
+                self.assertTrue(api.entry_writer.flush(timeout=5))
+                counts = {}
+                for user in ("alice", "bob"):
+                    with api.registry.session(user) as service:
+                        counts[user] = len(service.storage.load_entries())
+            finally:
+                api.entry_writer.close()
+                api.entry_writer = None
+                api.registry.close()
+                api.registry = None
+
+        self.assertEqual([r.status_code for r in responses], [200] * 3)
+        self.assertEqual(len(api.gemini_client.calls), 1)
+        self.assertEqual(counts, {"alice": 1, "bob": 1})
+
+    def test_errors_propagate_to_every_waiter(self):
+        async def scenario():
+            flight = api.SingleFlight()
+            calls = []
+
+            async def failing():
+                calls.append(1)
+                await asyncio.sleep(0.05)
+                raise RuntimeError("model unavailable")
+
+            results = await asyncio.gather(
+                *(flight.do("k", failing) for _ in range(3)), return_exceptions=True
+            )
+            return calls, results, len(flight)
+
+        calls, results, remaining = asyncio.run(scenario())
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+        self.assertEqual(remaining, 0)
+
+    def test_cancelled_waiter_does_not_cancel_others(self):
+        async def scenario():
+            flight = api.SingleFlight()
+
+            async def slow():
+                await asyncio.sleep(0.05)
+                return "done"
+
+            first = asyncio.ensure_future(flight.do("k", slow))
+            second = asyncio.ensure_future(flight.do("k", slow))
+            await asyncio.sleep(0)
+            first.cancel()
+            return await second
+
+        self.assertEqual(asyncio.run(scenario()), "done")
+
+if __name__ == '__main__':
+    unittest.main()
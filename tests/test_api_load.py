@@ -0,0 +1,52 @@
+import unittest
+import asyncio
+import time
+import httpx
+from src import api
+from src.gemini_client import GeminiAudioClient
+from tests.fake_gemini import FakeGeminiServer
+
+class TestAnalyzeLoad(unittest.TestCase):
+    """Load test: concurrent /analyze uploads against a slow local fake Gemini server."""
+
+    REQUESTS = 8
+    MODEL_DELAY = 0.2
+
+    def setUp(self):
+        self.server = FakeGeminiServer(delay=self.MODEL_DELAY).__enter__()
+        self.client = GeminiAudioClient(api_key="test-key", base_url=self.server.base_url)
+        api.gemini_client = self.client
+
+    def tearDown(self):
+        api.gemini_client = None
+        self.server.__exit__(None, None, None)
+
+    async def _post_concurrently(self):
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            async def upload(i):
+                files = {"file": (f"clip{i}.webm", b"fake audio %d" % i, "audio/webm")}
+                return await http.post("/analyze", files=files)
+
+            await upload(-1)  # Warm up the SDK's HTTP client
+            start = time.perf_counter()
+            responses = await asyncio.gather(*(upload(i) for i in range(self.REQUESTS)))
+            return responses, time.perf_counter() - start
+
+    def test_concurrent_uploads_overlap(self):
+        responses, async_elapsed = asyncio.run(self._post_concurrently())
+        for response in responses:
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["energy_level"], "high")
+
+        # Baseline: the blocking path serializes every model round trip
+        start = time.perf_counter()
+        for _ in range(self.REQUESTS):
+            self.client.analyze_energy(__file__)
+        blocking_elapsed = time.perf_counter() - start
+
+        self.assertGreaterEqual(blocking_elapsed, self.REQUESTS * self.MODEL_DELAY)
+        self.assertLess(async_elapsed, blocking_elapsed / 2)
+
+if __name__ == '__main__':
+    unittest.main()
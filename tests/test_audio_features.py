@@ -0,0 +1,153 @@
+import unittest
+import asyncio
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+import numpy as np
+from src.audio_features import LocalAudioAnalyzer, decode_pcm, decode_wav, extract_features, to_metrics
+from src.domain import EnergyLevel
+from src.gemini_client import GeminiAudioClient, heuristic_analysis
+from tests.fake_gemini import FakeGeminiServer
+
+RATE = 16000
+
+def speech_like(seconds, f0, f0_swing, syllable_rate, amplitude, pause_every=None, pause_length=0.0, rate=RATE):
+    """Harmonic voice with a gliding pitch, a syllable-rate loudness envelope and optional pauses."""
+    t = np.arange(int(seconds * rate)) / rate
+    phase = 2 * np.pi * np.cumsum(f0 + f0_swing * np.sin(2 * np.pi * 0.7 * t)) / rate
+    voice = sum(np.sin(k * phase) / k for k in range(1, 6))
+    envelope = np.abs(np.sin(np.pi * syllable_rate * t))
+    if pause_every:
+        envelope[(t % pause_every) > pause_every - pause_length] = 0
+    noise = 0.001 * np.random.default_rng(0).standard_normal(len(t))
+    return (amplitude * voice * envelope + noise).astype(np.float32)
+
+def energetic(seconds=6, rate=RATE):
+    return speech_like(seconds, 220, 60, 4.5, 0.5, rate=rate)
+
+def tired(seconds=6):
+    return speech_like(seconds, 110, 2, 2.0, 0.02, pause_every=2.0, pause_length=1.2)
+
+def to_wav(samples, rate=RATE, channels=1):
+    pcm = (np.clip(samples, -1, 1) * 32767).astype("<i2")
+    if channels > 1:
+        pcm = np.repeat(pcm, channels)
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+class TestDecoding(unittest.TestCase):
+    def test_sample_widths(self):
+        self.assertTrue(np.allclose(decode_pcm(bytes([0, 128, 255]), RATE, 1), [-1.0, 0.0, 127 / 128]))
+        self.assertTrue(np.allclose(decode_pcm(np.array([-32768, 16384], "<i2").tobytes(), RATE, 2), [-1.0, 0.5]))
+        self.assertTrue(np.allclose(decode_pcm(bytes([0, 0, 0x80, 0, 0, 0x40]), RATE, 3), [-1.0, 0.5]))
+        self.assertTrue(np.allclose(decode_pcm(np.array([1 << 30], "<i4").tobytes(), RATE, 4), [0.5]))
+        with self.assertRaises(ValueError):
+            decode_pcm(b"\x00" * 8, RATE, 5)
+
+    def test_stereo_is_mixed_down(self):
+        samples, rate = decode_wav(to_wav(energetic(1), channels=2))
+        self.assertEqual(rate, RATE)
+        self.assertEqual(len(samples), RATE)
+
+    def test_invalid_wav(self):
+        with self.assertRaises(ValueError):
+            decode_wav(b"not a wav file")
+
+class TestFeatureExtraction(unittest.TestCase):
+    def setUp(self):
+        self.analyzer = LocalAudioAnalyzer()
+
+    def test_energetic_voice(self):
+        result = self.analyzer.analyze_wav(to_wav(energetic()))
+        self.assertEqual(result.energy_level, EnergyLevel.HIGH)
+        self.assertGreater(result.metrics["pace"], 160)
+        self.assertGreater(result.metrics["tone_valence"], 0.5)
+        self.assertAlmostEqual(result.features.pitch_mean, 220, delta=20)
+        self.assertTrue(self.analyzer.is_confident(result))
+
+    def test_tired_voice(self):
+        result = self.analyzer.analyze_samples(tired(), RATE)
+        self.assertEqual(result.energy_level, EnergyLevel.LOW)
+        self.assertLess(result.metrics["tone_valence"], -0.5)
+        self.assertGreater(result.features.pause_ratio, 0.4)
+        self.assertLess(result.energy_score, 30)
+        self.assertTrue(self.analyzer.is_confident(result))
+
+    def test_silence_is_not_confident(self):
+        result = self.analyzer.analyze_samples(np.zeros(RATE * 3, dtype=np.float32), RATE)
+        self.assertFalse(self.analyzer.is_confident(result))
+
+    def test_metrics_feed_energy_analyzer(self):
+        metrics = to_metrics(extract_features(energetic(), RATE))
+        self.assertTrue(set(metrics) >= {"pace", "tone_valence", "rms_db", "pause_ratio"})
+
+    def test_too_short(self):
+        with self.assertRaises(ValueError):
+            extract_features(np.zeros(10, dtype=np.float32), RATE)
+
+    def test_runs_in_milliseconds(self):
+        samples = energetic(seconds=30, rate=44100)
+        extract_features(samples, 44100)  # Warm up
+        start = time.perf_counter()
+        extract_features(samples, 44100)
+        self.assertLess(time.perf_counter() - start, 0.2)
+
+class TestLocalFastPath(unittest.TestCase):
+    def _client(self, server):
+        return GeminiAudioClient(api_key="test-key", base_url=server.base_url, local_analyzer=LocalAudioAnalyzer())
+
+    def test_confident_clips_stay_local(self):
+        with FakeGeminiServer() as server:
+            result = self._client(server).analyze_audio(to_wav(energetic()), "audio/wav")
+        self.assertEqual(result.energy_level, "high")
+        self.assertEqual(server.request_count, 0)
+
+    def test_async_local_analysis(self):
+        with FakeGeminiServer() as server:
+            result = asyncio.run(self._client(server).analyze_audio_async(to_wav(tired()), "audio/wav"))
+        self.assertEqual(result.energy_level, "low")
+        self.assertEqual(server.request_count, 0)
+
+    def test_client_import_does_not_load_numpy(self):
+        result = subprocess.run(
+            [sys.executable, "-c", "import sys, src.gemini_client; print('numpy' in sys.modules)"],
+            capture_output=True, text=True, env={**os.environ, "PYTHONPATH": os.getcwd()}
+        )
+        self.assertEqual(result.stdout.strip(), "False", result.stderr)
+
+    def test_ambiguous_and_other_formats_escalate(self):
+        with FakeGeminiServer() as server:
+            client = self._client(server)
+            client.analyze_audio(to_wav(np.zeros(RATE, dtype=np.float32)), "audio/wav")
+            client.analyze_audio(b"webm bytes", "audio/webm")
+        self.assertEqual(server.request_count, 2)
+
+    def test_fallback_uses_local_features_for_wav(self):
+        self.assertEqual(heuristic_analysis(to_wav(tired()), "audio/wav").energy_level, "low")
+        self.assertEqual(heuristic_analysis(b"webm bytes", "audio/webm").energy_level, "medium")
+
+class TestCliAudio(unittest.TestCase):
+    def test_metrics_from_wav(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "note.wav")
+            with open(path, 'wb') as f:
+                f.write(to_wav(energetic()))
+            result = subprocess.run(
+                [sys.executable, "-m", "src.main", "--text", "Checking in", "--audio", path],
+                capture_output=True, text=True, cwd=tmpdir,
+                env={**os.environ, "PYTHONPATH": os.getcwd()}
+            )
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+        self.assertIn("HIGH", result.stdout)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+import base64
+import numpy as np
+from src.audio_features import decode_wav
+from src.audio_preprocess import detect_mime_type, prepare_audio, resample, trim_silence
+from src.gemini_client import GeminiAudioClient
+from tests.fake_gemini import FakeGeminiServer
+from tests.test_audio_features import energetic, to_wav, RATE
+
+
+def padded(samples, rate, seconds):
+    """Samples with `seconds` of near-silence before and after."""
+    quiet = np.zeros(int(seconds * rate), dtype=np.float32)
+    return np.concatenate([quiet, samples, quiet])
+
+
+class TestDetectMimeType(unittest.TestCase):
+    def test_containers(self):
+        self.assertEqual(detect_mime_type(to_wav(np.zeros(100, dtype=np.float32))), "audio/wav")
+        self.assertEqual(detect_mime_type(b"\x1a\x45\xdf\xa3\x9f\x42\x86\x81"), "audio/webm")
+        self.assertEqual(detect_mime_type(b"OggS\x00\x02"), "audio/ogg")
+        self.assertEqual(detect_mime_type(b"ID3\x04\x00"), "audio/mpeg")
+        self.assertEqual(detect_mime_type(b"\xff\xfb\x90\x64"), "audio/mpeg")
+        self.assertEqual(detect_mime_type(b"\x00\x00\x00\x20ftypM4A "), "audio/mp4")
+
+    def test_unknown(self):
+        self.assertIsNone(detect_mime_type(b"webm bytes"))
+        self.assertIsNone(detect_mime_type(b""))
+
+
+class TestPrepareAudio(unittest.TestCase):
+    def test_trims_silence(self):
+        speech = energetic(2)
+        trimmed = trim_silence(padded(speech, RATE, 3), RATE)
+        # Speech plus at most the margins and a frame of rounding on each side
+        self.assertLess(len(trimmed), len(speech) + RATE)
+        self.assertGreaterEqual(len(trimmed), len(speech))
+
+    def test_all_silent_kept(self):
+        silence = np.zeros(RATE, dtype=np.float32)
+        self.assertEqual(len(trim_silence(silence, RATE)), RATE)
+
+    def test_resample(self):
+        tone = np.sin(2 * np.pi * 440 * np.arange(48000) / 48000).astype(np.float32)
+        out = resample(tone, 48000, 16000)
+        self.assertEqual(len(out), 16000)
+        # The tone survives: its dominant frequency is unchanged
+        spectrum = np.abs(np.fft.rfft(out))
+        self.assertAlmostEqual(np.argmax(spectrum) * 16000 / len(out), 440, delta=2)
+        self.assertIs(resample(tone, 8000, 16000), tone)
+
+    def test_stereo_44k_wav_is_reduced(self):
+        data = to_wav(padded(energetic(3, rate=44100), 44100, 1), rate=44100, channels=2)
+        prepared = prepare_audio(data, "audio/webm")
+
+        self.assertEqual(prepared.mime_type, "audio/wav")
+        samples, rate = decode_wav(prepared.data)
+        self.assertEqual(rate, 16000)
+        self.assertLess(len(samples) / rate, 4.0)
+        self.assertGreater(prepared.trimmed_seconds, 1.0)
+        # 44.1 kHz stereo -> 16 kHz mono is ~5.5x smaller before trimming
+        self.assertGreater(prepared.bytes_saved, len(data) * 0.8)
+
+    def test_compressed_formats_pass_through(self):
+        data = b"OggS" + bytes(1000)
+        prepared = prepare_audio(data, "audio/webm")
+        self.assertIs(prepared.data, data)
+        self.assertEqual(prepared.mime_type, "audio/ogg")
+        self.assertEqual(prepared.bytes_saved, 0)
+
+    def test_declared_type_used_when_unrecognized(self):
+        self.assertEqual(prepare_audio(b"webm bytes", "audio/webm").mime_type, "audio/webm")
+
+    def test_small_wav_not_grown(self):
+        data = to_wav(energetic(1, rate=8000), rate=8000)
+        self.assertIs(prepare_audio(data).data, data)
+
+
+class TestClientUpload(unittest.TestCase):
+    def test_uploads_prepared_audio_with_real_type(self):
+        data = to_wav(padded(energetic(3, rate=44100), 44100, 1), rate=44100, channels=2)
+        with FakeGeminiServer() as server:
+            client = GeminiAudioClient(api_key="test-key", base_url=server.base_url)
+            client.analyze_audio(data, "audio/webm")
+
+        inline = server.bodies[0]["contents"][0]["parts"][1]["inlineData"]
+        self.assertEqual(inline["mime_type"], "audio/wav")
+        self.assertEqual(len(base64.urlsafe_b64decode(inline["data"])), client.bytes_uploaded)
+        stats = client.upload_stats()
+        self.assertEqual(stats["uploads"], 1)
+        self.assertEqual(stats["bytes_received"], len(data))
+        self.assertGreater(stats["bytes_saved"], len(data) * 0.8)
+
+    def test_preprocessing_can_be_disabled(self):
+        data = to_wav(energetic(1))
+        with FakeGeminiServer() as server:
+            client = GeminiAudioClient(api_key="test-key", base_url=server.base_url, preprocess=False)
+            client.analyze_audio(data, "audio/wav")
+        self.assertEqual(client.upload_stats()["bytes_saved"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
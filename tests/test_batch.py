@@ -0,0 +1,98 @@
+import unittest
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from fastapi.testclient import TestClient
+from src import api
+from src.batch import run_batch
+from tests.fake_gemini import FakeGeminiServer
+from tests.test_api import StubAudioClient
+
+class TestRunBatch(unittest.TestCase):
+    def _collect(self, items, worker, max_workers):
+        async def collect():
+            return [outcome async for outcome in run_batch(items, worker, max_workers)]
+        return asyncio.run(collect())
+
+    def test_bounded_concurrency_and_per_item_errors(self):
+        active = 0
+        peak = 0
+
+        async def worker(n):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            if n == 3:
+                raise ValueError("bad item")
+            return n * 10
+
+        outcomes = self._collect(range(10), worker, max_workers=3)
+
+        self.assertEqual(peak, 3)
+        self.assertEqual(len(outcomes), 10)
+        by_index = {index: (result, error) for index, _, result, error in outcomes}
+        self.assertIsInstance(by_index[3][1], ValueError)
+        self.assertEqual(by_index[5], (50, None))
+
+    def test_results_stream_in_completion_order(self):
+        async def worker(delay):
+            await asyncio.sleep(delay)
+            return delay
+
+        outcomes = self._collect([0.05, 0.0], worker, max_workers=2)
+        self.assertEqual([index for index, _, _, _ in outcomes], [1, 0])
+
+class TestBatchEndpoint(unittest.TestCase):
+    def setUp(self):
+        api.gemini_client = StubAudioClient()
+        self.client = TestClient(api.app)
+
+    def tearDown(self):
+        api.gemini_client = None
+
+    def test_streams_ndjson_with_per_item_errors(self):
+        files = [
+            ("files", ("a.webm", b"audio a", "audio/webm")),
+            ("files", ("notes.txt", b"hello", "text/plain")),
+            ("files", ("b.wav", b"audio b", "audio/wav")),
+        ]
+        response = self.client.post("/analyze/batch", files=files)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("application/x-ndjson"))
+
+        lines = {line["index"]: line for line in map(json.loads, response.text.splitlines())}
+        self.assertEqual(lines[0]["result"]["energy_level"], "high")
+        self.assertIn("Unsupported audio format", lines[1]["error"])
+        self.assertEqual(lines[2]["filename"], "b.wav")
+
+class TestBatchCLI(unittest.TestCase):
+    def test_cli_batch_mode(self):
+        with tempfile.TemporaryDirectory() as tmpdir, FakeGeminiServer() as server:
+            paths = []
+            for name in ("one.webm", "two.wav"):
+                path = os.path.join(tmpdir, name)
+                with open(path, 'wb') as f:
+                    f.write(name.encode())
+                paths.append(path)
+            paths.append(os.path.join(tmpdir, "missing.webm"))
+
+            result = subprocess.run(
+                [sys.executable, "-m", "src.main", "--batch", *paths, "--workers", "2"],
+                capture_output=True,
+                text=True,
+                env={**os.environ, "GEMINI_API_KEY": "test-key", "GEMINI_BASE_URL": server.base_url}
+            )
+
+        lines = [json.loads(line) for line in result.stdout.splitlines()]
+        self.assertEqual(result.returncode, 1)  # One file is missing
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(sum("result" in line for line in lines), 2)
+        self.assertEqual(server.request_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
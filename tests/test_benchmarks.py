@@ -0,0 +1,44 @@
+import unittest
+import tempfile
+from benchmarks.data import synthetic_entries, synthetic_texts
+from benchmarks.run import Result, compare, feedback_cases, storage_cases
+
+
+class TestSyntheticData(unittest.TestCase):
+    def test_deterministic_and_ordered(self):
+        entries = synthetic_entries(200, seed=3)
+        self.assertEqual(entries, synthetic_entries(200, seed=3))
+        timestamps = [entry["timestamp"] for entry in entries]
+        self.assertEqual(timestamps, sorted(timestamps))
+        self.assertTrue(any(entry.get("source") == "audio" for entry in entries))
+        self.assertTrue(all(entry["energy_level"] in ("high", "medium", "low") for entry in entries))
+        self.assertEqual(len(synthetic_texts(5)), 5)
+
+
+class TestRunner(unittest.TestCase):
+    def test_storage_cases_run_for_every_backend(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            names = [result.name for result in storage_cases((50,), tmpdir)]
+        self.assertIn("storage.json.save_entry[50]", names)
+        self.assertIn("storage.sqlite.load_page[50]", names)
+        self.assertEqual(len(names), 12)
+
+    def test_feedback_case(self):
+        result, compact = feedback_cases((100,), "")
+        self.assertEqual(result.ops, 100)
+        self.assertGreater(result.seconds, 0)
+        self.assertEqual(compact.extra["table_bytes"], 2500)
+
+    def test_compare_flags_slowdowns_beyond_tolerance(self):
+        baseline = {"results": [Result("a", 1.0, 1, 1).to_dict(), Result("b", 1.0, 1, 1).to_dict()]}
+        report = {"results": [Result("a", 1.2, 1, 1).to_dict(), Result("b", 1.5, 1, 1).to_dict(),
+                              Result("new", 9.0, 1, 1).to_dict()]}
+        changes = {change["name"]: change for change in compare(report, baseline, tolerance=0.25)}
+
+        self.assertEqual(set(changes), {"a", "b"})
+        self.assertFalse(changes["a"]["regression"])
+        self.assertTrue(changes["b"]["regression"])
+
+
+if __name__ == '__main__':
+    unittest.main()
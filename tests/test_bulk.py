@@ -0,0 +1,109 @@
+import unittest
+import io
+import json
+import os
+import tempfile
+import numpy as np
+from src.bulk import export_file, import_file, import_rows, normalize_entry, read_csv, read_jsonl
+from src.analyzer import EnergyAnalyzer
+from src.daemon import handle
+from src.main import build_service
+
+
+class TestNormalizeEntry(unittest.TestCase):
+    def test_fills_level_and_normalizes_fields(self):
+        entry = normalize_entry({"timestamp": "2026-01-01T09:00:00", "text": "Feeling great",
+                                 "pace": "150", "energy_score": "71.6"}, EnergyAnalyzer())
+        self.assertEqual(entry, {"timestamp": "2026-01-01T09:00:00", "text": "Feeling great",
+                                 "metrics": {"pace": 150.0}, "energy_level": "high", "energy_score": 72})
+
+    def test_rejects_invalid_rows(self):
+        bad = [
+            {"energy_level": "high"},
+            {"timestamp": "yesterday", "energy_level": "high"},
+            {"timestamp": 1e20, "energy_level": "high"},
+            {"timestamp": float("nan"), "energy_level": "high"},
+            {"timestamp": "2026-01-01", "energy_level": "ecstatic"},
+            {"timestamp": "2026-01-01"},
+            {"timestamp": "2026-01-01", "energy_level": "low", "metrics": {"tone_valence": 3}},
+            {"timestamp": "2026-01-01", "energy_level": "low", "confidence": 1.5},
+            {"timestamp": "2026-01-01", "text": "x" * 5001},
+        ]
+        for raw in bad:
+            with self.assertRaises(ValueError, msg=raw):
+                normalize_entry(raw, EnergyAnalyzer())
+
+
+class TestImportExport(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.service = build_service("log", root=self.tmpdir.name)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def test_jsonl_import_dedups_and_reports_errors(self):
+        rows = read_jsonl(io.StringIO(
+            '{"timestamp": "2026-01-01T09:00:00", "text": "Feeling great", "metrics": {"pace": 150}}\n'
+            '\n'
+            '{"metrics": {"pace": 150.0}, "text": "Feeling great", "timestamp": "2026-01-01T09:00:00"}\n'
+            'not json\n'
+            '{"timestamp": 1e20, "energy_level": "high"}\n'
+            '{"timestamp": "2026-01-01T10:00:00", "energy_level": "low"}\n'
+        ))
+        stats = import_rows(self.service, rows, batch_size=1)
+
+        self.assertEqual((stats.read, stats.imported, stats.duplicates, stats.rejected), (5, 2, 1, 2))
+        self.assertTrue(stats.errors[0].startswith("line 4:"))
+        self.assertIn("invalid timestamp", stats.errors[1])
+        self.assertEqual([e["energy_level"] for e in self.service.storage.load_entries()], ["high", "low"])
+        self.assertEqual(self.service.aggregates.total, 2)
+
+        # Re-importing the same data (or its export) adds nothing
+        export_file(self.service.storage, self._path("out.jsonl"))
+        self.assertEqual(import_file(self.service, self._path("out.jsonl")).duplicates, 2)
+
+    def test_csv_round_trip(self):
+        self.service.record_entry("exhausted", {"pace": 90, "tone_valence": -0.5})
+        self.assertEqual(export_file(self.service.storage, self._path("out.csv")), 1)
+        with open(self._path("out.csv"), newline="") as f:
+            (line, row), = read_csv(f)
+        self.assertEqual((line, row["energy_level"], row["pace"]), (2, "low", "90"))
+
+        other = build_service("sqlite", root=self.tmpdir.name)
+        self.assertEqual(import_file(other, self._path("out.csv")).imported, 1)
+        entry, = other.storage.load_entries()
+        self.assertEqual(entry["metrics"], {"pace": 90.0, "tone_valence": -0.5})
+        self.assertEqual(import_file(other, self._path("out.csv")).duplicates, 1)
+        other.storage.close()
+
+    def test_npz_export_is_columnar(self):
+        self.service.record_entries([
+            {"timestamp": "2026-01-01T09:00:00", "energy_level": "high", "energy_score": 80, "confidence": 0.9},
+            {"timestamp": "2026-01-01T10:30:00", "energy_level": "low", "metrics": {"pace": 100}},
+        ])
+        response = handle(self.service, {"op": "export", "path": self._path("out.npz")})
+        self.assertEqual(response, {"count": 2})
+
+        with np.load(self._path("out.npz")) as data:
+            self.assertEqual(data["timestamp"].dtype, np.int64)
+            self.assertEqual(list(data["timestamp"] % 86400 // 3600), [9, 10])
+            self.assertEqual(list(data["level"]), [2, 0])
+            self.assertEqual(data["score"][0], 80)
+            self.assertTrue(np.isnan(data["score"][1]))
+            self.assertEqual(data["pace"][1], 100)
+
+    def test_import_op_and_unsupported_format(self):
+        with open(self._path("in.jsonl"), "w") as f:
+            f.write(json.dumps({"timestamp": 1767258000, "energy_level": "medium"}) + "\n")
+        response = handle(self.service, {"op": "import", "path": self._path("in.jsonl")})
+        self.assertEqual(response["imported"], 1)
+        with self.assertRaises(ValueError):
+            import_file(self.service, self._path("in.npz"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import os
+import tempfile
+import time
+from src.cache import AnalysisCache
+from src.gemini_client import GeminiAudioClient
+from tests.fake_gemini import FakeGeminiServer
+
+class TestAnalysisCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_key_depends_on_audio_model_and_prompt(self):
+        key = AnalysisCache.key_for(b"audio", "model-a", "1")
+        self.assertEqual(key, AnalysisCache.key_for(b"audio", "model-a", "1"))
+        self.assertNotEqual(key, AnalysisCache.key_for(b"audio!", "model-a", "1"))
+        self.assertNotEqual(key, AnalysisCache.key_for(b"audio", "model-b", "1"))
+        self.assertNotEqual(key, AnalysisCache.key_for(b"audio", "model-a", "2"))
+
+    def test_memory_lru_eviction_and_counters(self):
+        cache = AnalysisCache(max_entries=2)
+        cache.put("a", "1")
+        cache.put("b", "2")
+        cache.get("a")  # "a" is now most recently used
+        cache.put("c", "3")
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "1")
+        self.assertEqual(cache.get("c"), "3")
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (3, 1))
+
+    def test_disk_tier_survives_restart(self):
+        AnalysisCache(cache_dir=self.tmpdir.name).put("k", '{"x":1}')
+        cache = AnalysisCache(cache_dir=self.tmpdir.name)
+        self.assertEqual(cache.get("k"), '{"x":1}')
+        self.assertEqual(cache.stats()["disk_hits"], 1)
+
+    def test_disk_ttl_expires_entries(self):
+        AnalysisCache(cache_dir=self.tmpdir.name).put("k", "v")
+        old = time.time() - 100
+        os.utime(os.path.join(self.tmpdir.name, "k.json"), (old, old))
+
+        cache = AnalysisCache(cache_dir=self.tmpdir.name, ttl_seconds=10)
+        self.assertIsNone(cache.get("k"))
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir.name, "k.json")))
+
+    def test_disk_size_eviction_removes_oldest(self):
+        cache = AnalysisCache(cache_dir=self.tmpdir.name, max_disk_bytes=250)
+        for i in range(5):
+            cache.put(f"k{i}", "x" * 100)
+            path = os.path.join(self.tmpdir.name, f"k{i}.json")
+            os.utime(path, (time.time() - 10 + i, time.time() - 10 + i))
+        remaining = sorted(os.listdir(self.tmpdir.name))
+        self.assertEqual(remaining, ["k3.json", "k4.json"])
+        self.assertLessEqual(cache.stats()["disk_bytes"], 250)
+
+    def test_rewriting_a_key_does_not_grow_disk_bytes(self):
+        cache = AnalysisCache(cache_dir=self.tmpdir.name)
+        for _ in range(3):
+            cache.put("k", "x" * 100)
+        self.assertEqual(cache.stats()["disk_bytes"], 100)
+
+    def test_client_skips_model_on_resubmission(self):
+        with FakeGeminiServer() as server:
+            client = GeminiAudioClient(api_key="test-key", base_url=server.base_url, cache=AnalysisCache())
+            first = client.analyze_audio(b"same recording")
+            second = client.analyze_audio(b"same recording")
+            client.analyze_audio(b"other recording")
+
+        self.assertEqual(first, second)
+        self.assertEqual(server.request_count, 2)
+        self.assertEqual(client.cache.stats()["hits"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import unittest
+import multiprocessing
+import os
+import tempfile
+from src.locking import FileLock
+from src.log_storage import SegmentedLogStorage
+from src.storage import Storage
+from src.tenancy import UserServiceRegistry
+
+PROCESSES = 8
+ENTRIES_PER_PROCESS = 25
+
+
+def write_entries(data_dir, backend, worker, start):
+    """Runs in a child process: records entries one write at a time through a shared registry."""
+    registry = UserServiceRegistry(data_dir, backend=backend, shared=True)
+    start.wait(10)
+    for i in range(ENTRIES_PER_PROCESS):
+        with registry.session("alice") as service:
+            service.record_entries([{"timestamp": f"2026-01-0{1 + i % 7}T{i % 24:02d}:00:00",
+                                     "text": f"{worker}-{i}", "energy_level": "high"}])
+    registry.close()
+
+
+class TestMultiProcessWriters(unittest.TestCase):
+    def stress(self, backend):
+        with tempfile.TemporaryDirectory() as data_dir:
+            ctx = multiprocessing.get_context("spawn")
+            start = ctx.Event()
+            workers = [ctx.Process(target=write_entries, args=(data_dir, backend, w, start))
+                       for w in range(PROCESSES)]
+            for process in workers:
+                process.start()
+            start.set()
+            for process in workers:
+                process.join(60)
+                self.assertEqual(process.exitcode, 0)
+
+            registry = UserServiceRegistry(data_dir, backend=backend, shared=True)
+            with registry.session("alice") as service:
+                texts = [entry["text"] for entry in service.storage.load_entries()]
+                feedback = service.get_feedback()
+                buckets = service.trend("day")
+            registry.close()
+
+        expected = {f"{w}-{i}" for w in range(PROCESSES) for i in range(ENTRIES_PER_PROCESS)}
+        self.assertEqual(len(texts), len(expected))
+        self.assertEqual(set(texts), expected)
+        # The index files every process updated agree with the merged history
+        self.assertIn(f"based on {len(expected)} entries", feedback)
+        self.assertEqual(sum(bucket["count"] for bucket in buckets), len(expected))
+
+    def test_json_storage_loses_no_entries(self):
+        self.stress("json")
+
+    def test_log_storage_loses_no_entries(self):
+        self.stress("log")
+
+    def test_sqlite_storage_loses_no_entries(self):
+        self.stress("sqlite")
+
+
+class TestSharedCaches(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _entry(self, i):
+        return {"timestamp": f"2026-01-01T10:00:{i:02d}", "energy_level": "low"}
+
+    def test_json_cache_sees_other_writers(self):
+        path = os.path.join(self.tmpdir.name, "log.json")
+        first, second = Storage(path, shared=True), Storage(path, shared=True)
+        first.save_entry(self._entry(0))
+        self.assertEqual(len(second.load_entries()), 1)
+
+        second.save_entry(self._entry(1))
+        first.save_entry(self._entry(2))  # Merges with the second writer's entry instead of overwriting it
+        self.assertEqual(second.load_entries(), [self._entry(i) for i in range(3)])
+        self.assertEqual(len(second.load_compact()), 3)
+        self.assertFalse([name for name in os.listdir(self.tmpdir.name) if name.endswith(".tmp")])
+
+    def test_log_cache_catches_up_incrementally(self):
+        logdir = os.path.join(self.tmpdir.name, "log.d")
+        first = SegmentedLogStorage(logdir, max_segment_bytes=200, shared=True)
+        second = SegmentedLogStorage(logdir, max_segment_bytes=200, shared=True)
+        first.save_entries([self._entry(0)])
+        cache = second.load_entries()
+
+        for i in range(1, 8):  # Rolls over to new segments
+            first.save_entry(self._entry(i))
+        self.assertIs(second.load_entries(), cache)
+        self.assertEqual(cache, [self._entry(i) for i in range(8)])
+
+        first.clear_entries()
+        self.assertEqual(second.load_entries(), [])
+
+    def test_lock_is_reentrant_but_not_upgradable(self):
+        lock = FileLock(os.path.join(self.tmpdir.name, "x.lock"))
+        with lock.hold():
+            with lock.hold(exclusive=False):
+                self.assertTrue(lock.held_exclusive)
+        with lock.hold(exclusive=False):
+            with self.assertRaises(RuntimeError):
+                with lock.hold():
+                    pass
+        lock.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import unittest
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from argparse import Namespace
+from unittest import mock
+from src.daemon import DaemonClient, DaemonError, DaemonUnavailable, EnergyDaemon, handle
+from src.main import build_service, call
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestHandle(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.service = build_service("log", root=self.tmpdir.name)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_record_and_feedback(self):
+        response = handle(self.service, {"op": "record", "text": "Feeling great and focused", "metrics": {}})
+        self.assertEqual(response["energy_level"], "high")
+        self.assertIn("1 entries", response["feedback"])
+        self.assertNotIn("feedback", handle(self.service, {"op": "record", "text": "ok", "feedback": False}))
+
+    def test_record_many_is_one_write(self):
+        logs = [{"text": "exhausted"}, {"text": "pumped", "metrics": {"pace": 170}}]
+        response = handle(self.service, {"op": "record_many", "logs": logs})
+        self.assertEqual(response["energy_levels"], ["low", "high"])
+        self.assertEqual(len(self.service.storage.load_entries()), 2)
+
+    def test_clear_rebuild_and_unknown(self):
+        handle(self.service, {"op": "record", "text": "tired"})
+        self.assertEqual(handle(self.service, {"op": "rebuild"}), {"count": 1})
+        handle(self.service, {"op": "clear"})
+        self.assertEqual(self.service.storage.load_entries(), [])
+        with self.assertRaises(ValueError):
+            handle(self.service, {"op": "explode"})
+
+
+class TestDaemon(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.tmpdir.name, "d.sock")
+        self.daemon = EnergyDaemon(self.socket_path)
+        self.daemon.bind()
+        self.thread = threading.Thread(target=self.daemon.serve_forever, daemon=True)
+        self.thread.start()
+        self.client = DaemonClient(self.socket_path, timeout=5.0)
+
+    def tearDown(self):
+        self.daemon.shutdown()
+        self.thread.join(5)
+        self.tmpdir.cleanup()
+
+    def test_keeps_service_warm_per_directory(self):
+        params = {"cwd": self.tmpdir.name, "storage": "json", "user": "default"}
+        self.client.request("record", text="Feeling great and focused", **params)
+        response = self.client.request("record", text="exhausted", **params)
+
+        self.assertEqual(response["energy_level"], "low")
+        self.assertIn("2 entries", response["feedback"])
+        self.assertEqual(len(self.daemon.services), 1)
+        self.assertTrue(os.path.exists(os.path.join(self.tmpdir.name, "energy_log.json")))
+        self.assertEqual(self.client.request("ping")["requests"], 2)
+
+    def test_errors_are_reported(self):
+        with self.assertRaises(DaemonError):
+            self.client.request("record", cwd=self.tmpdir.name)  # No text
+        with self.assertRaises(DaemonError):
+            self.client.request("explode", cwd=self.tmpdir.name)
+
+    def test_second_daemon_refused(self):
+        with self.assertRaises(DaemonError):
+            EnergyDaemon(self.socket_path).bind()
+
+    def test_shutdown_removes_socket(self):
+        self.client.request("shutdown")
+        self.thread.join(5)
+        self.assertFalse(os.path.exists(self.socket_path))
+        with self.assertRaises(DaemonUnavailable):
+            self.client.request("ping")
+
+    def test_cli_uses_daemon(self):
+        env = {**os.environ, "VOCALPOINT_SOCKET": self.socket_path, "PYTHONPATH": REPO_ROOT}
+        result = subprocess.run(
+            [sys.executable, "-m", "src.main", "--text", "Feeling great", "--quiet"],
+            capture_output=True, text=True, env=env, cwd=self.tmpdir.name
+        )
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+        self.assertEqual(result.stdout.strip(), "high")
+        self.assertEqual(self.client.request("ping")["requests"], 1)
+
+    def test_bulk_ops_wait_for_the_daemon(self):
+        args = Namespace(storage="json", user="default", no_daemon=False)
+        with mock.patch.dict(os.environ, {"VOCALPOINT_SOCKET": self.socket_path}), \
+                mock.patch("src.main.DaemonClient", wraps=DaemonClient) as client:
+            call(args, "ping")
+            call(args, "ping", timeout=None)
+        self.assertEqual(client.call_args_list, [mock.call(timeout=30.0), mock.call(timeout=None)])
+
+
+class TestCliFallback(unittest.TestCase):
+    def test_quiet_bulk_logging_without_daemon(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            env = {**os.environ, "VOCALPOINT_SOCKET": os.path.join(tmpdir, "none.sock"), "PYTHONPATH": REPO_ROOT}
+            result = subprocess.run(
+                [sys.executable, "-m", "src.main", "--quiet"],
+                input="great\n\nexhausted\nordinary day\n", capture_output=True, text=True, env=env, cwd=tmpdir
+            )
+            with open(os.path.join(tmpdir, "energy_log.json")) as f:
+                entries = json.load(f)
+
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+        self.assertEqual(result.stdout.split(), ["high", "low", "medium"])
+        self.assertEqual([entry["text"] for entry in entries], ["great", "exhausted", "ordinary day"])
+
+
+if __name__ == '__main__':
+    unittest.main()
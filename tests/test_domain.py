@@ -0,0 +1,58 @@
+import unittest
+import math
+import sys
+from src.domain import EnergyEntry, EnergyLevel, EntryTable, NO_TIMESTAMP
+from src.feedback import FeedbackGenerator
+
+
+class TestEnergyEntry(unittest.TestCase):
+    def test_round_trip(self):
+        entry = {"timestamp": "2026-03-04T09:15:30.250000", "text": "Feeling great",
+                 "metrics": {"pace": 150.0, "tone_valence": 0.5}, "energy_level": "high"}
+        compact = EnergyEntry.from_dict(entry)
+
+        self.assertEqual(compact.level, EnergyLevel.HIGH)
+        self.assertIsInstance(compact.timestamp, int)
+        self.assertEqual(compact.to_dict(), entry)
+        self.assertFalse(hasattr(compact, "__dict__"))
+
+    def test_missing_fields(self):
+        compact = EnergyEntry.from_dict({"timestamp": "garbage", "energy_level": "high", "source": "audio"})
+        self.assertEqual(compact.timestamp, NO_TIMESTAMP)
+        self.assertTrue(math.isnan(compact.score))
+        self.assertEqual(compact.to_dict(), {"source": "audio", "energy_level": "high"})
+
+        entry = {"timestamp": "2026-01-01T10:00:00", "text": "x", "metrics": {}}
+        compact = EnergyEntry.from_dict(entry)
+        self.assertIsNone(compact.level)
+        self.assertEqual(compact.to_dict(), entry)  # A missing level keeps the timestamp
+
+
+class TestEntryTable(unittest.TestCase):
+    def entries(self, n):
+        return [{"timestamp": f"2026-01-{1 + i % 28:02d}T{i % 24:02d}:00:00", "text": f"log number {i}",
+                 "metrics": {"pace": 130, "tone_valence": 0.0}, "energy_level": ("low", "medium", "high")[i % 3],
+                 "energy_score": i % 100} for i in range(n)]
+
+    def test_columns_and_rows(self):
+        table = EntryTable.from_dicts(self.entries(5))
+        self.assertEqual(len(table), 5)
+        self.assertEqual(list(table.levels), [0, 1, 2, 0, 1])
+        self.assertEqual(table[2].level, EnergyLevel.HIGH)
+        self.assertEqual(table[4].to_dict()["timestamp"], "2026-01-05T04:00:00")
+        self.assertEqual(table.nbytes(), 5 * 25)
+
+    def test_smaller_than_dicts(self):
+        entries = self.entries(1000)
+        dict_bytes = sum(sys.getsizeof(e) + sys.getsizeof(e["metrics"]) for e in entries)
+        self.assertLess(EntryTable.from_dicts(entries).nbytes() * 10, dict_bytes)
+
+    def test_feedback_from_table_matches_dicts(self):
+        generator = FeedbackGenerator()
+        entries = self.entries(100)
+        self.assertEqual(generator.generate_feedback(EntryTable.from_dicts(entries)),
+                         generator.generate_feedback(entries))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,7 @@
 import unittest
 from datetime import datetime, timedelta
 from src.feedback import FeedbackGenerator
-from src.domain import EnergyLevel
+from src.domain import EnergyLevel, EntryTable
 
 class TestFeedbackGenerator(unittest.TestCase):
     def setUp(self):
@@ -51,5 +51,14 @@ class TestFeedbackGenerator(unittest.TestCase):
         self.assertIn("Low Energy", feedback)
         self.assertIn("2 PM", feedback) # Should detect 2 PM as low
 
+    def test_unrecognized_levels_are_skipped(self):
+        entries = [{"timestamp": datetime(2023, 1, 1, 10, 0, 0).isoformat(), "energy_level": "unknown"}] * 3
+        for logs in (entries, EntryTable.from_dicts(entries)):
+            feedback = self.generator.generate_feedback(logs)
+            self.assertEqual(feedback, "Could not read a timestamp and energy level from any entry.")
+
+        entries.append({"timestamp": datetime(2023, 1, 1, 14, 0, 0).isoformat(), "energy_level": "high"})
+        self.assertIn("Analysis based on 4 entries", self.generator.generate_feedback(entries))
+
 if __name__ == '__main__':
     unittest.main()
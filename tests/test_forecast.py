@@ -0,0 +1,112 @@
+import unittest
+import os
+import tempfile
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from src import api
+from src.analyzer import EnergyAnalyzer
+from src.feedback import FeedbackGenerator
+from src.forecast import EnergyForecaster
+from src.scheduler import Task
+from src.service import EnergyService
+from src.storage import Storage
+from src.tenancy import UserServiceRegistry
+
+MONDAY_9AM = datetime(2024, 1, 1, 9)
+
+class TestEnergyForecaster(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "forecast.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_empty_model_is_neutral(self):
+        curve = EnergyForecaster(filepath=None).forecast()
+        self.assertEqual(len(curve), 168)
+        self.assertTrue(all(value == 50.0 for value in curve))
+
+    def test_learns_weekday_hour_pattern(self):
+        forecaster = EnergyForecaster(filepath=None)
+        for week in range(4):
+            monday = MONDAY_9AM + timedelta(weeks=week)
+            forecaster.update({"timestamp": monday.isoformat(), "energy_score": 90})
+            forecaster.update({"timestamp": (monday + timedelta(days=1)).isoformat(), "energy_score": 30})
+
+        self.assertGreater(forecaster.predict(MONDAY_9AM), 75)
+        self.assertLess(forecaster.predict(MONDAY_9AM + timedelta(days=1)), 45)
+        # Unobserved Wednesday 9 AM falls back toward the 9 AM average
+        self.assertAlmostEqual(forecaster.predict(MONDAY_9AM + timedelta(days=2)), 60, delta=10)
+
+    def test_recent_observations_dominate(self):
+        forecaster = EnergyForecaster(filepath=None, half_life_days=7)
+        for week in range(8):
+            score = 20 if week < 4 else 90
+            forecaster.update({"timestamp": (MONDAY_9AM + timedelta(weeks=week)).isoformat(), "energy_score": score})
+        self.assertGreater(forecaster.predict(MONDAY_9AM), 70)
+
+    def test_level_used_without_score_and_bad_entries_ignored(self):
+        forecaster = EnergyForecaster(filepath=None)
+        forecaster.update({"timestamp": MONDAY_9AM.isoformat(), "energy_level": "low"})
+        forecaster.update({"timestamp": "garbage", "energy_score": 100})
+        forecaster.update({"timestamp": MONDAY_9AM.isoformat()})
+        self.assertLess(forecaster.predict(MONDAY_9AM), 50)
+
+    def test_incremental_matches_refit_and_persists(self):
+        entries = [
+            {"timestamp": (MONDAY_9AM + timedelta(hours=5 * i)).isoformat(), "energy_score": (i * 37) % 100}
+            for i in range(50)
+        ]
+        incremental = EnergyForecaster(self.path)
+        for entry in entries:
+            incremental.update(entry)
+        incremental.save()
+
+        refit = EnergyForecaster(filepath=None)
+        refit.rebuild(entries)
+        reloaded = EnergyForecaster(self.path)
+        self.assertTrue(reloaded.persisted)
+        for a, b, c in zip(incremental.forecast(), refit.forecast(), reloaded.forecast()):
+            self.assertAlmostEqual(a, b)
+            self.assertAlmostEqual(a, c)
+
+    def test_curve_is_cached_until_update(self):
+        forecaster = EnergyForecaster(filepath=None)
+        curve = forecaster.forecast()
+        self.assertIs(forecaster.forecast(), curve)
+        forecaster.update({"timestamp": MONDAY_9AM.isoformat(), "energy_score": 80})
+        self.assertIsNot(forecaster.forecast(), curve)
+
+class TestForecastService(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        storage = Storage(os.path.join(self.tmpdir.name, "log.json"))
+        for week in range(3):
+            tuesday_2pm = datetime(2024, 1, 2, 14) + timedelta(weeks=week)
+            storage.save_entry({"timestamp": tuesday_2pm.isoformat(), "energy_level": "high", "energy_score": 95})
+        self.service = EnergyService(storage, EnergyAnalyzer(), FeedbackGenerator(),
+                                     forecaster=EnergyForecaster(os.path.join(self.tmpdir.name, "forecast.json")))
+
+    def tearDown(self):
+        api.registry = None
+        self.tmpdir.cleanup()
+
+    def test_schedule_uses_weekday_forecast(self):
+        plan = self.service.plan_schedule([Task("deep work", 60, 1.0)], datetime(2024, 2, 5, 8), days=7)
+        self.assertEqual(plan.scheduled[0].start, datetime(2024, 2, 6, 14))
+
+    def test_forecast_endpoint(self):
+        api.registry = UserServiceRegistry(os.path.join(self.tmpdir.name, "data"))
+        with api.registry.session("bob") as service:
+            for entry in self.service.storage.load_entries():
+                service.storage.save_entry(entry)
+
+        response = TestClient(api.app).get("/users/bob/forecast")
+        self.assertEqual(response.status_code, 200)
+        curve = response.json()["curve"]
+        self.assertEqual(len(curve), 168)
+        self.assertEqual(max(range(168), key=curve.__getitem__), 24 + 14)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+import json
+import os
+import tempfile
+from src.analyzer import EnergyAnalyzer
+from src.domain import EnergyLevel
+from src.lexicon import Lexicon
+
+class TestLexicon(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "lexicon.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _write(self, terms, mtime=None):
+        with open(self.path, 'w') as f:
+            json.dump({"terms": terms}, f)
+        if mtime is not None:
+            os.utime(self.path, (mtime, mtime))
+
+    def test_matches_whole_words_only(self):
+        lexicon = Lexicon()
+        self.assertEqual(lexicon.matches("Feeling GREAT, not slow!"), {"great", "slow"})
+        self.assertEqual(lexicon.matches("slowly getting greater, not tiredness"), set())
+
+    def test_phrases_and_weights(self):
+        lexicon = Lexicon({"worn out": -3, "on fire": 2.5, "out": 1})
+        self.assertEqual(lexicon.matches("Totally worn  out today"), {"worn out", "out"})
+        self.assertEqual(lexicon.score("I'm on fire and worn out"), 0.5)
+
+    def test_score_many_matches_score(self):
+        lexicon = Lexicon({"worn out": -3, "on fire": 2.5, "out": 1, "tired": -2})
+        texts = ["Totally worn  out today", "", "tired, tired and worn", "out on fire", "worn\x00out", "worn"]
+        texts.append("out")  # "worn" ending the previous text must not pair with this "out"
+        self.assertEqual(lexicon.score_many(texts).tolist(), [lexicon.score(text) for text in texts])
+        self.assertEqual(lexicon.score_many([]).tolist(), [])
+
+    def test_loads_from_file(self):
+        self._write({"Buzzing": 2})
+        lexicon = Lexicon(path=self.path)
+        self.assertEqual(len(lexicon), 1)
+        self.assertEqual(lexicon.score("buzzing!"), 2)
+
+    def test_hot_reload_on_change(self):
+        self._write({"buzzing": 2}, mtime=1_000_000)
+        lexicon = Lexicon(path=self.path, check_interval=0)
+        self.assertFalse(lexicon.maybe_reload())
+
+        self._write({"buzzing": 2, "meh": -2}, mtime=1_000_100)
+        self.assertTrue(lexicon.maybe_reload())
+        self.assertEqual(lexicon.score("meh"), -2)
+
+    def test_malformed_file_keeps_current_terms(self):
+        self._write({"buzzing": 2}, mtime=1_000_000)
+        lexicon = Lexicon(path=self.path, check_interval=0)
+        with open(self.path, 'w') as f:
+            f.write("{not json")
+        os.utime(self.path, (1_000_100, 1_000_100))
+
+        self.assertFalse(lexicon.maybe_reload())
+        self.assertEqual(lexicon.score("buzzing"), 2)
+        with self.assertRaises(ValueError):
+            lexicon.reload()
+
+    def test_large_lexicon(self):
+        terms = {f"term{i}": 1 for i in range(10000)}
+        terms["deeply exhausted"] = -4
+        lexicon = Lexicon(terms)
+        self.assertEqual(lexicon.score("term42 and term9999 but deeply exhausted"), -2)
+
+    def test_analyzer_uses_configured_lexicon(self):
+        analyzer = EnergyAnalyzer(Lexicon({"buzzing": 2, "meh": -2}))
+        self.assertEqual(analyzer.analyze("I'm buzzing"), EnergyLevel.HIGH)
+        self.assertEqual(analyzer.analyze("excited"), EnergyLevel.MEDIUM)
+        self.assertEqual(analyzer.analyze_many(["meh", "buzzing"]), [EnergyLevel.LOW, EnergyLevel.HIGH])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import json
+import os
+import tempfile
+from src.log_storage import SegmentedLogStorage
+
+class TestSegmentedLogStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.logdir = os.path.join(self.tmpdir.name, "log.d")
+        self.storage = SegmentedLogStorage(self.logdir, max_segment_bytes=200, compact_threshold=4)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _entry(self, i):
+        return {"timestamp": f"2023-01-01T10:00:{i % 60:02d}", "text": f"log {i}", "energy_level": "high"}
+
+    def test_save_and_reload(self):
+        for i in range(3):
+            self.storage.save_entry(self._entry(i))
+
+        reloaded = SegmentedLogStorage(self.logdir)
+        self.assertEqual(reloaded.load_entries(), [self._entry(i) for i in range(3)])
+
+    def test_save_entries_appends_batch(self):
+        self.storage.save_entry(self._entry(0))
+        self.storage.save_entries([self._entry(i) for i in range(1, 4)])
+        self.assertEqual(len(self.storage.load_entries()), 4)
+
+        reloaded = SegmentedLogStorage(self.logdir)
+        self.assertEqual(reloaded.load_entries(), [self._entry(i) for i in range(4)])
+
+    def test_rolls_and_compacts_segments(self):
+        for i in range(40):
+            self.storage.save_entry(self._entry(i))
+
+        segments = [n for n in os.listdir(self.logdir) if n.endswith(".jsonl")]
+        self.assertLessEqual(len(segments), 5)
+
+        reloaded = SegmentedLogStorage(self.logdir)
+        self.assertEqual(reloaded.load_entries(), [self._entry(i) for i in range(40)])
+
+    def test_torn_write_is_ignored_and_repaired(self):
+        self.storage.save_entry(self._entry(0))
+        segment = os.path.join(self.logdir, sorted(os.listdir(self.logdir))[-1])
+        with open(segment, 'ab') as f:
+            f.write(b'{"timestamp": "2023-01-01T1')  # Simulated crash mid-write
+
+        reopened = SegmentedLogStorage(self.logdir)
+        self.assertEqual(reopened.load_entries(), [self._entry(0)])
+
+        reopened.save_entry(self._entry(1))
+        self.assertEqual(SegmentedLogStorage(self.logdir).load_entries(), [self._entry(0), self._entry(1)])
+
+    def test_interrupted_compaction_does_not_duplicate(self):
+        for i in range(12):
+            self.storage.save_entry(self._entry(i))
+        expected = SegmentedLogStorage(self.logdir).load_entries()
+
+        # Recreate a segment that compaction should already have deleted.
+        self.storage.compact()
+        names = sorted(os.listdir(self.logdir))
+        with open(os.path.join(self.logdir, names[0]), 'r') as f:
+            header = json.loads(f.readline())
+        stale = os.path.join(self.logdir, f"segment-{header['_compacted_from']:08d}.jsonl")
+        if not os.path.exists(stale):
+            with open(stale, 'w') as f:
+                f.write(json.dumps(self._entry(0)) + "\n")
+
+        self.assertEqual(SegmentedLogStorage(self.logdir).load_entries(), expected)
+
+    def test_migrate_from_json(self):
+        legacy = os.path.join(self.tmpdir.name, "energy_log.json")
+        entries = [self._entry(i) for i in range(5)]
+        with open(legacy, 'w') as f:
+            json.dump(entries, f)
+
+        self.assertEqual(self.storage.migrate_from_json(legacy), 5)
+        self.assertEqual(SegmentedLogStorage(self.logdir).load_entries(), entries)
+
+        with self.assertRaises(ValueError):
+            self.storage.migrate_from_json(legacy)
+
+    def test_clear_entries(self):
+        self.storage.save_entry(self._entry(0))
+        self.storage.clear_entries()
+        self.assertEqual(self.storage.load_entries(), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import unittest
+import tempfile
+from fastapi.testclient import TestClient
+from src import api
+from src.metrics import MetricsRegistry, STAGE_SECONDS, timed
+from src.resilience import CircuitBreaker
+from src.service import EnergyService
+from src.analyzer import EnergyAnalyzer
+from src.feedback import FeedbackGenerator
+from src.log_storage import SegmentedLogStorage
+from tests.test_api import StubAudioClient
+
+
+class TestRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_counter_and_gauge_render(self):
+        errors = self.registry.counter("errors_total", "Errors", ("reason",))
+        errors.inc(reason="503")
+        errors.inc(2, reason="503")
+        gauge = self.registry.gauge("in_flight", "In flight")
+        with gauge.track():
+            self.assertEqual(gauge.value(), 1)
+        text = self.registry.render()
+
+        self.assertIn("# TYPE errors_total counter\n", text)
+        self.assertIn('errors_total{reason="503"} 3\n', text)
+        self.assertIn("in_flight 0\n", text)
+
+    def test_histogram_buckets_are_cumulative(self):
+        latency = self.registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 5.0):
+            latency.observe(value)
+        text = self.registry.render()
+
+        self.assertIn('latency_seconds_bucket{le="0.1"} 2\n', text)
+        self.assertIn('latency_seconds_bucket{le="1"} 3\n', text)
+        self.assertIn('latency_seconds_bucket{le="+Inf"} 4\n', text)
+        self.assertIn("latency_seconds_sum 5.65\n", text)
+        self.assertIn("latency_seconds_count 4\n", text)
+
+    def test_labels_must_match(self):
+        errors = self.registry.counter("errors_total", "Errors", ("reason",))
+        with self.assertRaises(ValueError):
+            errors.inc()
+        with self.assertRaises(ValueError):
+            errors.inc(-1, reason="x")
+        with self.assertRaises(ValueError):
+            self.registry.gauge("errors_total", "Errors", ("reason",))
+        self.assertIs(self.registry.counter("errors_total", "Errors", ("reason",)), errors)
+
+    def test_label_values_escaped(self):
+        self.registry.counter("c", "C", ("path",)).inc(path='a"b\\')
+        self.assertIn('c{path="a\\"b\\\\"} 1', self.registry.render())
+
+    def test_collectors_replaced_by_key(self):
+        self.registry.register_collector("x", lambda: [("up", "gauge", "Up", 0)])
+        self.registry.register_collector("x", lambda: [("up", "gauge", "Up", 1)])
+        self.assertEqual(self.registry.render().count("\nup "), 1)
+        self.assertIn("\nup 1\n", self.registry.render())
+
+    def test_timed(self):
+        histogram = self.registry.histogram("stage_seconds", "Stage", ("stage",))
+
+        @timed("work", histogram)
+        def work():
+            return 42
+
+        self.assertEqual(work(), 42)
+        with self.assertRaises(KeyError):
+            with timed("failing", histogram):
+                raise KeyError("x")
+        self.assertEqual(histogram.count(stage="work"), 1)
+        self.assertEqual(histogram.count(stage="failing"), 1)
+
+
+class TestInstrumentation(unittest.TestCase):
+    def test_service_and_storage_stages(self):
+        before = {stage: STAGE_SECONDS.count(stage=stage) for stage in ("service.record_entries", "storage.save_entries")}
+        with tempfile.TemporaryDirectory() as tmpdir:
+            service = EnergyService(SegmentedLogStorage(tmpdir), EnergyAnalyzer(), FeedbackGenerator())
+            service.record_entry("Feeling great", {})
+        for stage, count in before.items():
+            self.assertEqual(STAGE_SECONDS.count(stage=stage), count + 1)
+
+
+class TestEndpoints(unittest.TestCase):
+    def setUp(self):
+        api.gemini_client = StubAudioClient()
+        self.client = TestClient(api.app)
+
+    def tearDown(self):
+        api.gemini_client = None
+
+    def test_metrics_after_analyze(self):
+        self.client.post("/analyze", files={"file": ("clip.webm", b"audio", "audio/webm")})
+        response = self.client.get("/metrics")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain; version=0.0.4"))
+        text = response.text
+        self.assertIn('vocalpoint_http_request_duration_seconds_count{method="POST",route="/analyze",status="200"}',
+                      text)
+        for stage in ("upload_read", "validate", "analysis"):
+            self.assertIn(f'vocalpoint_stage_duration_seconds_count{{stage="{stage}"}}', text)
+        self.assertIn("vocalpoint_analyses_in_flight 0\n", text)
+
+    def test_unmatched_routes_share_a_label(self):
+        self.client.get("/no/such/path")
+        self.assertIn('route="unmatched",status="404"', self.client.get("/metrics").text)
+
+    def test_health(self):
+        health = self.client.get("/health").json()
+        self.assertEqual(health["status"], "ok")
+        self.assertEqual(health["analyses_in_flight"], 0)
+        self.assertIn("uptime_seconds", health)
+
+    def test_health_degraded_while_circuit_open(self):
+        breaker = CircuitBreaker(failure_threshold=1)
+        breaker.record_failure()
+        api.gemini_client.breaker = breaker
+
+        health = self.client.get("/health").json()
+        self.assertEqual(health["status"], "degraded")
+        self.assertEqual(health["model_circuit"], "open")
+        self.assertIn("vocalpoint_model_circuit_open 1\n", self.client.get("/metrics").text)
+
+
+if __name__ == '__main__':
+    unittest.main()
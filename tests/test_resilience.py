@@ -0,0 +1,190 @@
+import unittest
+import asyncio
+import time
+from fastapi.testclient import TestClient
+from google.genai import errors
+from src import api
+from src.cache import AnalysisCache
+from src.gemini_client import GeminiAudioClient, heuristic_analysis, is_retryable
+from src.resilience import CircuitBreaker, CircuitOpenError, ResilientCaller, RetryPolicy
+from tests.fake_gemini import FakeGeminiServer
+
+FAST_RETRY = RetryPolicy(max_attempts=3, base_delay=0.01, max_delay=0.02)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class Transient(Exception):
+    pass
+
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=self.clock)
+
+    def test_opens_after_threshold_and_probes_after_timeout(self):
+        self.breaker.record_failure()
+        self.breaker.before_call()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpenError) as ctx:
+            self.breaker.before_call()
+        self.assertEqual(ctx.exception.retry_after, 10)
+
+        self.clock.now = 10
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.breaker.before_call()  # The probe
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_call()  # Only one probe at a time
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_failed_probe_reopens(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.clock.now = 10
+        self.breaker.before_call()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+class TestResilientCaller(unittest.TestCase):
+    def _caller(self, **kwargs):
+        return ResilientCaller(lambda e: isinstance(e, Transient), retry=FAST_RETRY, **kwargs)
+
+    def test_backoff_is_jittered_and_capped(self):
+        policy = RetryPolicy(base_delay=1.0, max_delay=3.0)
+        self.assertEqual(policy.backoff(1, rand=lambda: 1.0), 1.0)
+        self.assertEqual(policy.backoff(5, rand=lambda: 1.0), 3.0)
+        self.assertEqual(policy.backoff(5, rand=lambda: 0.0), 0.0)
+
+    def test_retries_transient_failures(self):
+        outcomes = [Transient(), Transient(), "ok"]
+        timeouts = []
+
+        def flaky(timeout):
+            timeouts.append(timeout)
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        caller = self._caller(timeout=5)
+        self.assertEqual(caller.call(flaky, sleep=lambda s: None), "ok")
+        self.assertEqual((caller.attempts, caller.retries), (3, 2))
+        self.assertEqual(timeouts, [5, 5, 5])
+
+    def test_gives_up_after_max_attempts(self):
+        def failing(timeout):
+            raise Transient()
+
+        caller = self._caller()
+        with self.assertRaises(Transient):
+            caller.call(failing, sleep=lambda s: None)
+        self.assertEqual(caller.attempts, 3)
+
+    def test_does_not_retry_permanent_errors(self):
+        def bad_request(timeout):
+            raise ValueError("rejected")
+
+        breaker = CircuitBreaker(failure_threshold=1)
+        caller = self._caller(breaker=breaker)
+        with self.assertRaises(ValueError):
+            caller.call(bad_request)
+        self.assertEqual(caller.attempts, 1)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_async_attempts_are_bounded_by_timeout(self):
+        async def hanging(timeout):
+            await asyncio.sleep(10)
+
+        caller = ResilientCaller(lambda e: isinstance(e, TimeoutError), retry=FAST_RETRY, timeout=0.05, deadline=1)
+        start = time.monotonic()
+        with self.assertRaises(TimeoutError):
+            asyncio.run(caller.call_async(hanging))
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(caller.attempts, 3)
+
+    def test_cancelled_probe_releases_the_breaker(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        clock.now = 10  # Half-open: the next call is the probe
+        caller = self._caller(breaker=breaker)
+
+        async def probe_then_cancel():
+            task = asyncio.ensure_future(caller.call_async(lambda timeout: asyncio.sleep(10)))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(probe_then_cancel())
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)  # Counted as a failed probe
+        clock.now = 20
+        breaker.before_call()  # A new probe is allowed once the reset timeout passes again
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+class TestClientAgainstFakeServer(unittest.TestCase):
+    def _client(self, server, **kwargs):
+        kwargs.setdefault("retry", FAST_RETRY)
+        return GeminiAudioClient(api_key="test-key", base_url=server.base_url, **kwargs)
+
+    def test_retries_server_errors(self):
+        with FakeGeminiServer(errors=[503, 429]) as server:
+            result = self._client(server).analyze_audio(b"clip")
+        self.assertEqual(result.energy_level, "high")
+        self.assertEqual(server.request_count, 3)
+
+    def test_client_errors_are_not_retried(self):
+        with FakeGeminiServer(errors=[400]) as server:
+            with self.assertRaises(errors.ClientError):
+                self._client(server).analyze_audio(b"clip")
+        self.assertEqual(server.request_count, 1)
+
+    def test_slow_model_times_out(self):
+        with FakeGeminiServer(delay=1.0) as server:
+            client = self._client(server, timeout=0.1, retry=RetryPolicy(max_attempts=1))
+            start = time.monotonic()
+            with self.assertRaises(Exception) as ctx:
+                asyncio.run(client.analyze_audio_async(b"clip"))
+        self.assertTrue(is_retryable(ctx.exception))
+        self.assertLess(time.monotonic() - start, 0.9)
+
+    def test_breaker_fails_fast_then_falls_back(self):
+        with FakeGeminiServer(errors=[503] * 10) as server:
+            client = self._client(server, breaker=CircuitBreaker(failure_threshold=3))
+            with self.assertRaises(errors.ServerError):
+                client.analyze_audio(b"clip")
+            with self.assertRaises(CircuitOpenError):
+                client.analyze_audio(b"clip")
+            self.assertEqual(server.request_count, 3)
+
+            client.fallback = heuristic_analysis
+            client.cache = AnalysisCache()
+            result = client.analyze_audio(b"clip")
+        self.assertEqual(result.energy_level, "medium")
+        self.assertLess(result.confidence, 0.5)
+        self.assertEqual(server.request_count, 3)
+        self.assertEqual(client.cache.stats()["memory_entries"], 0)  # Fallback results are not cached
+
+class TestApiCircuitOpen(unittest.TestCase):
+    def tearDown(self):
+        api.gemini_client = None
+
+    def test_open_circuit_returns_503(self):
+        class OpenCircuitClient:
+            async def analyze_audio_async(self, audio, mime_type="audio/webm"):
+                raise CircuitOpenError(12.3)
+
+        api.gemini_client = OpenCircuitClient()
+        response = TestClient(api.app).post("/analyze", files={"file": ("c.webm", b"x", "audio/webm")})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers["retry-after"], "12")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,178 @@
+import unittest
+import os
+import tempfile
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from src import api
+from src.analyzer import EnergyAnalyzer
+from src.feedback import FeedbackGenerator
+from src.rollups import TrendRollups
+from src.service import EnergyService
+from src.sqlite_storage import SQLiteStorage
+from src.storage import Storage
+from src.tenancy import UserServiceRegistry
+
+BASE = datetime(2024, 3, 4, 9, 0)
+
+def entry(minutes, score=None, level="medium"):
+    item = {"timestamp": (BASE + timedelta(minutes=minutes)).isoformat(), "energy_level": level}
+    if score is not None:
+        item["energy_score"] = score
+    return item
+
+class TestTrendRollups(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "rollups.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_hourly_and_daily_buckets(self):
+        rollups = TrendRollups(filepath=None)
+        for item in (entry(0, 40), entry(30, 80), entry(60, 60), entry(24 * 60, level="high")):
+            rollups.add(item)
+
+        hourly = rollups.trend("hour")
+        self.assertEqual([b["start"] for b in hourly], ["2024-03-04T09:00:00", "2024-03-04T10:00:00",
+                                                        "2024-03-05T09:00:00"])
+        self.assertEqual((hourly[0]["count"], hourly[0]["min"], hourly[0]["mean"], hourly[0]["max"]),
+                         (2, 40.0, 60.0, 80.0))
+        self.assertEqual(hourly[2]["mean"], 80.0)  # Level fallback
+
+        daily = rollups.trend("day", start=BASE + timedelta(days=1))
+        self.assertEqual(daily, [{"start": "2024-03-05T00:00:00", "count": 1, "min": 80.0, "mean": 80.0, "max": 80.0}])
+
+    def test_version_changes_with_data_and_survives_reload(self):
+        rollups = TrendRollups(self.path)
+        rollups.add(entry(0, 50))
+        rollups.save()
+        version = rollups.version
+
+        reloaded = TrendRollups(self.path)
+        self.assertTrue(reloaded.persisted)
+        self.assertEqual(reloaded.version, version)
+        self.assertEqual(reloaded.trend("hour"), rollups.trend("hour"))
+
+        reloaded.add(entry(5, 70))
+        self.assertNotEqual(reloaded.version, version)
+        reloaded.rebuild([entry(0, 50)])
+        self.assertNotEqual(reloaded.version, version)
+
+    def test_in_memory_index_is_built_once(self):
+        storage = Storage(os.path.join(self.tmpdir.name, "log.json"))
+        storage.save_entries([entry(0, 40), entry(60, 80)])
+        service = EnergyService(storage, EnergyAnalyzer(), FeedbackGenerator(), rollups=TrendRollups(filepath=None))
+
+        version = service.data_version()
+        self.assertEqual(service.data_version(), version)  # No rebuild, so the ETag stays valid
+        service.record_entries([entry(120, 60)])
+        self.assertNotEqual(service.data_version(), version)
+        self.assertEqual(sum(b["count"] for b in service.trend("day")), 3)
+
+    def test_unknown_resolution(self):
+        with self.assertRaises(ValueError):
+            TrendRollups(filepath=None).trend("minute")
+
+class TestHistoryPagination(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _service(self, storage):
+        return EnergyService(storage, EnergyAnalyzer(), FeedbackGenerator(), rollups=TrendRollups(filepath=None))
+
+    def _walk(self, service, limit, **kwargs):
+        pages, cursor = [], None
+        while True:
+            page, cursor = service.history(limit=limit, cursor=cursor, **kwargs)
+            pages.append(page)
+            if cursor is None:
+                return pages
+
+    def test_pages_cover_history_once_across_backends(self):
+        # Duplicate timestamps straddle page boundaries
+        entries = [entry(minutes) for minutes in (0, 1, 1, 1, 1, 2, 3, 3, 4)]
+        for i, item in enumerate(entries):
+            item["n"] = i
+        storages = [
+            Storage(os.path.join(self.tmpdir.name, "log.json")),
+            SQLiteStorage(os.path.join(self.tmpdir.name, "log.db")),
+        ]
+        for storage in storages:
+            service = self._service(storage)
+            service.record_entries(entries)
+            for limit in (1, 2, 3, 10):
+                pages = self._walk(service, limit)
+                self.assertEqual([e["n"] for page in pages for e in page], list(range(9)), (storage, limit))
+            storage_close = getattr(storage, "close", None)
+            if storage_close:
+                storage_close()
+
+    def test_time_range_filter(self):
+        service = self._service(Storage(os.path.join(self.tmpdir.name, "log.json")))
+        service.record_entries([entry(minutes) for minutes in range(10)])
+        pages = self._walk(service, 2, start=BASE + timedelta(minutes=3), end=BASE + timedelta(minutes=7))
+        self.assertEqual(len([e for page in pages for e in page]), 4)
+
+    def test_invalid_cursor(self):
+        service = self._service(Storage(os.path.join(self.tmpdir.name, "log.json")))
+        with self.assertRaises(ValueError):
+            service.history(cursor="not-a-cursor")
+
+class TestHistoryAndTrendEndpoints(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        api.registry = UserServiceRegistry(self.tmpdir.name)
+        self.client = TestClient(api.app)
+        with api.registry.session("alice") as service:
+            service.record_entries([entry(minutes * 20, score=minutes * 10) for minutes in range(6)])
+
+    def tearDown(self):
+        api.registry.close()
+        api.registry = None
+        self.tmpdir.cleanup()
+
+    def test_history_pages(self):
+        first = self.client.get("/users/alice/history", params={"limit": 4}).json()
+        self.assertEqual(len(first["entries"]), 4)
+        second = self.client.get("/users/alice/history", params={"limit": 4, "cursor": first["next_cursor"]}).json()
+        self.assertEqual(len(second["entries"]), 2)
+        self.assertIsNone(second["next_cursor"])
+
+        bad = self.client.get("/users/alice/history", params={"cursor": "garbage"})
+        self.assertEqual(bad.status_code, 400)
+
+    def test_trend(self):
+        response = self.client.get("/users/alice/trend", params={"resolution": "hour"})
+        self.assertEqual(response.status_code, 200)
+        buckets = response.json()["buckets"]
+        self.assertEqual([b["count"] for b in buckets], [3, 3])
+        self.assertEqual((buckets[0]["min"], buckets[0]["mean"], buckets[0]["max"]), (0.0, 10.0, 20.0))
+
+        self.assertEqual(self.client.get("/users/alice/trend", params={"resolution": "week"}).status_code, 422)
+
+    def test_etag_revalidation(self):
+        first = self.client.get("/users/alice/trend")
+        etag = first.headers["etag"]
+        cached = self.client.get("/users/alice/trend", headers={"If-None-Match": etag})
+        self.assertEqual(cached.status_code, 304)
+
+        # A different query is a different representation
+        other = self.client.get("/users/alice/trend?resolution=day", headers={"If-None-Match": etag})
+        self.assertEqual(other.status_code, 200)
+
+        with api.registry.session("alice") as service:
+            service.record_entries([entry(500, score=90)])
+        changed = self.client.get("/users/alice/trend", headers={"If-None-Match": etag})
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers["etag"], etag)
+
+        history = self.client.get("/users/alice/history")
+        again = self.client.get("/users/alice/history", headers={"If-None-Match": history.headers["etag"]})
+        self.assertEqual(again.status_code, 304)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import unittest
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from src import api
+from src.aggregates import HourlyAggregates
+from src.analyzer import EnergyAnalyzer
+from src.feedback import FeedbackGenerator
+from src.scheduler import EnergyScheduler, Task
+from src.service import EnergyService
+from src.storage import Storage
+from src.tenancy import UserServiceRegistry
+
+# Peak at 10 AM, dip at 3 PM, neutral otherwise
+PROFILE = [0.0] * 24
+PROFILE[10] = 2.0
+PROFILE[15] = -2.0
+MONDAY = datetime(2024, 1, 1, 8, 30)
+
+class TestEnergyScheduler(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = EnergyScheduler(day_start=9, day_end=18)
+
+    def test_focus_work_in_peak_and_admin_in_dip(self):
+        tasks = [Task("deep work", 60, 1.0), Task("email", 60, 0.0)]
+        plan = self.scheduler.schedule(tasks, PROFILE, MONDAY, days=1)
+        placed = {item.task.name: item for item in plan.scheduled}
+
+        self.assertEqual(placed["deep work"].start, datetime(2024, 1, 1, 10))
+        self.assertEqual(placed["email"].start, datetime(2024, 1, 1, 15))
+        self.assertEqual(plan.unscheduled, [])
+
+    def test_multi_hour_blocks_are_contiguous_within_working_hours(self):
+        plan = self.scheduler.schedule([Task("report", 150, 1.0)], PROFILE, MONDAY, days=2)
+        item = plan.scheduled[0]
+        self.assertEqual(item.end - item.start, timedelta(minutes=150))
+        self.assertGreaterEqual(item.start.hour, 9)
+        self.assertLessEqual(item.start.hour + 3, 18)
+        self.assertEqual(item.start.date(), item.end.date())
+
+    def test_deadline_respected_and_overflow_unscheduled(self):
+        deadline = datetime(2024, 1, 1, 12)
+        tasks = [Task("urgent", 60, 1.0, deadline)] + [Task(f"t{i}", 60, 0.5) for i in range(9)]
+        plan = self.scheduler.schedule(tasks, PROFILE, MONDAY, days=1)
+
+        urgent = next(item for item in plan.scheduled if item.task.name == "urgent")
+        self.assertLessEqual(urgent.end, deadline)
+        self.assertEqual(len(plan.scheduled), 9)  # Only nine working hours in the day
+        self.assertEqual(len(plan.unscheduled), 1)
+
+        starts = [item.start for item in plan.scheduled]
+        self.assertEqual(len(starts), len(set(starts)))
+
+    def test_hour_of_week_profile(self):
+        profile = [0.0] * 168
+        profile[2 * 24 + 14] = 2.0  # Wednesday 2 PM
+        plan = self.scheduler.schedule([Task("deep work", 60, 1.0)], profile, MONDAY, days=7)
+        self.assertEqual(plan.scheduled[0].start, datetime(2024, 1, 3, 14))
+
+    def test_hundreds_of_tasks_over_weeks_is_fast(self):
+        rng = random.Random(7)
+        profile = [rng.uniform(-2, 2) for _ in range(24)]
+        tasks = [
+            Task(f"task {i}", rng.choice([30, 60, 90, 120]), rng.random(),
+                 MONDAY + timedelta(days=rng.randint(1, 28)))
+            for i in range(500)
+        ]
+        start = time.perf_counter()
+        plan = EnergyScheduler(day_start=0, day_end=24).schedule(tasks, profile, MONDAY, days=28)
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(len(plan.scheduled) + len(plan.unscheduled), 500)
+
+class TestScheduleService(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        storage = Storage(os.path.join(self.tmpdir.name, "log.json"))
+        for day in range(3):
+            storage.save_entry({"timestamp": datetime(2024, 1, 1 + day, 11).isoformat(), "energy_level": "high"})
+            storage.save_entry({"timestamp": datetime(2024, 1, 1 + day, 16).isoformat(), "energy_level": "low"})
+        self.service = EnergyService(storage, EnergyAnalyzer(), FeedbackGenerator(),
+                                     HourlyAggregates(os.path.join(self.tmpdir.name, "aggregates.json")))
+
+    def tearDown(self):
+        api.registry = None
+        self.tmpdir.cleanup()
+
+    def test_energy_profile(self):
+        profile = self.service.energy_profile()
+        self.assertEqual(len(profile), 24)
+        self.assertEqual((profile[11], profile[16], profile[3]), (2.0, -2.0, 0.0))
+
+    def _seed_registry(self):
+        api.registry = UserServiceRegistry(os.path.join(self.tmpdir.name, "data"))
+        with api.registry.session("alice") as service:
+            for entry in self.service.storage.load_entries():
+                service.storage.save_entry(entry)
+
+    def test_schedule_endpoint(self):
+        self._seed_registry()
+        response = TestClient(api.app).post("/users/alice/schedule", json={
+            "start": "2024-01-08T08:00:00",
+            "days": 1,
+            "tasks": [
+                {"name": "write spec", "duration_minutes": 60, "focus": 0.9},
+                {"name": "expenses", "duration_minutes": 30, "focus": 0.1},
+                {"name": "marathon", "duration_minutes": 1200, "focus": 0.5},
+            ],
+        })
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        placed = {item["name"]: item["start"] for item in body["scheduled"]}
+        self.assertEqual(placed["write spec"], "2024-01-08T11:00:00")
+        self.assertEqual(placed["expenses"], "2024-01-08T16:00:00")
+        self.assertEqual(body["unscheduled"], ["marathon"])
+
+    def test_schedule_endpoint_validates_tasks(self):
+        self._seed_registry()
+        response = TestClient(api.app).post("/users/alice/schedule", json={
+            "tasks": [{"name": "x", "duration_minutes": 0, "focus": 2}],
+        })
+        self.assertEqual(response.status_code, 422)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+import os
+import tempfile
+from datetime import datetime, timedelta
+from src.sqlite_storage import SQLiteStorage
+
+class TestSQLiteStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "energy.db")
+        self.alice = SQLiteStorage(self.db_path, user_id="alice")
+        self.bob = SQLiteStorage(self.db_path, user_id="bob")
+        self.base = datetime(2023, 1, 1, 9, 0, 0)
+        for i in range(10):
+            self.alice.save_entry({
+                "timestamp": (self.base + timedelta(hours=i)).isoformat(),
+                "text": f"log {i}",
+                "energy_level": "high" if i % 2 else "low",
+            })
+        self.bob.save_entry({"timestamp": self.base.isoformat(), "text": "bob", "energy_level": "medium"})
+
+    def tearDown(self):
+        self.alice.close()
+        self.bob.close()
+        self.tmpdir.cleanup()
+
+    def test_entries_are_scoped_per_user(self):
+        self.assertEqual(len(self.alice.load_entries()), 10)
+        self.assertEqual([e["text"] for e in self.bob.load_entries()], ["bob"])
+        self.assertEqual(self.alice.count_entries(), 10)
+
+    def test_save_entries_in_one_batch(self):
+        batch = [{"timestamp": (self.base + timedelta(days=1, minutes=i)).isoformat(), "energy_level": "medium"}
+                 for i in range(5)]
+        self.bob.save_entries(batch)
+        self.assertEqual(self.bob.count_entries(), 6)
+        self.assertEqual(self.bob.load_last(5), batch)
+
+    def test_load_range(self):
+        entries = self.alice.load_range(self.base + timedelta(hours=2), self.base + timedelta(hours=5))
+        self.assertEqual([e["text"] for e in entries], ["log 2", "log 3", "log 4"])
+
+    def test_load_last(self):
+        self.assertEqual([e["text"] for e in self.alice.load_last(3)], ["log 7", "log 8", "log 9"])
+        self.assertEqual(self.alice.load_last(0), [])
+
+    def test_load_by_level(self):
+        self.assertEqual(len(self.alice.load_by_level("high")), 5)
+
+    def test_clear_only_affects_user(self):
+        self.alice.clear_entries()
+        self.assertEqual(self.alice.load_entries(), [])
+        self.assertEqual(len(self.bob.load_entries()), 1)
+
+    def test_uses_indexes_for_range_queries(self):
+        plan = self.alice._conn.execute(
+            "EXPLAIN QUERY PLAN SELECT data FROM entries WHERE user_id = ? AND timestamp >= ? AND timestamp < ?",
+            ("alice", "a", "b"),
+        ).fetchall()
+        self.assertIn("idx_entries_user_ts", " ".join(str(row) for row in plan))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+import unittest
+import tempfile
+import numpy as np
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+from src import api
+from src.audio_features import PcmFormat, decode_wav, parse_wav_header
+from src.streaming import AudioStream, StreamTooLarge
+from src.tenancy import UserServiceRegistry
+from tests.test_api import StubAudioClient
+from tests.test_audio_features import RATE, energetic, to_wav
+
+def pcm16(samples):
+    return (np.clip(samples, -1, 1) * 32767).astype("<i2").tobytes()
+
+def chunks(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+class TestWavHeader(unittest.TestCase):
+    def test_incremental_parse(self):
+        wav = to_wav(energetic(1))
+        self.assertIsNone(parse_wav_header(wav[:20]))
+        fmt, offset = parse_wav_header(wav)
+        self.assertEqual(fmt, PcmFormat(RATE, 2, 1))
+        self.assertEqual(offset, 44)
+
+    def test_rejects_other_formats(self):
+        with self.assertRaises(ValueError):
+            parse_wav_header(b"\x1aE\xdf\xa3" + b"\x00" * 40)  # WebM magic
+
+    def test_rejects_zero_channels_and_sample_width(self):
+        wav = to_wav(energetic(1))
+        for offset, value in ((22, 0), (34, 4)):  # channels, bits per sample
+            header = wav[:offset] + value.to_bytes(2, "little") + wav[offset + 2:]
+            with self.assertRaises(ValueError):
+                parse_wav_header(header)
+
+class TestAudioStream(unittest.TestCase):
+    def test_running_features_for_pcm(self):
+        stream = AudioStream("audio/pcm", 10 ** 7, PcmFormat(RATE), update_seconds=1.0)
+        updates = [u for u in map(stream.append, chunks(pcm16(energetic(4)), 3200)) if u is not None]
+        self.assertEqual(len(updates), 4)  # One per second of audio
+        self.assertEqual(updates[-1]["energy_level"], "high")
+        self.assertGreater(updates[-1]["metrics"]["pace"], 160)
+
+        content, content_type = stream.payload()
+        self.assertEqual(content_type, "audio/wav")
+        samples, rate = decode_wav(content)
+        self.assertEqual((len(samples), rate), (4 * RATE, RATE))
+
+    def test_streamed_wav_is_rewrapped(self):
+        wav = to_wav(energetic(2))
+        stream = AudioStream("audio/wav", 10 ** 7)
+        for chunk in chunks(wav, 1000):
+            stream.append(chunk)
+        content, content_type = stream.payload()
+        self.assertEqual(content, wav)
+
+    def test_compressed_formats_are_only_buffered(self):
+        stream = AudioStream("audio/webm", 100)
+        self.assertIsNone(stream.append(b"x" * 60))
+        self.assertEqual(stream.payload(), (b"x" * 60, "audio/webm"))
+        with self.assertRaises(StreamTooLarge):
+            stream.append(b"x" * 60)
+
+class TestStreamEndpoint(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.stub = StubAudioClient()
+        api.gemini_client = self.stub
+        api.registry = UserServiceRegistry(self.tmpdir.name)
+        self.client = TestClient(api.app)
+
+    def tearDown(self):
+        if api.entry_writer is not None:
+            api.entry_writer.close()
+        api.entry_writer = None
+        api.registry.close()
+        api.registry = None
+        api.gemini_client = None
+        self.tmpdir.cleanup()
+
+    def test_pcm_stream_with_running_features(self):
+        with self.client.websocket_connect("/ws/analyze") as ws:
+            ws.send_json({"type": "start", "content_type": "audio/pcm", "sample_rate": RATE, "user_id": "alice"})
+            for chunk in chunks(pcm16(energetic(2)), 8000):
+                ws.send_bytes(chunk)
+            features = ws.receive_json()
+            self.assertEqual(features["type"], "features")
+            ws.send_json({"type": "end"})
+            messages = []
+            while True:
+                message = ws.receive_json()
+                messages.append(message)
+                if message["type"] != "features":
+                    break
+
+        self.assertEqual(messages[-1]["type"], "result")
+        self.assertEqual(messages[-1]["result"]["energy_level"], "high")
+        (audio, mime_type), = self.stub.calls
+        self.assertEqual(mime_type, "audio/wav")
+        self.assertEqual(len(decode_wav(audio)[0]), 2 * RATE)
+
+        self.assertTrue(api.entry_writer.flush(timeout=5))
+        with api.registry.session("alice") as service:
+            self.assertEqual(len(service.storage.load_entries()), 1)
+
+    def test_webm_stream(self):
+        with self.client.websocket_connect("/ws/analyze") as ws:
+            ws.send_json({"type": "start", "content_type": "audio/webm"})
+            ws.send_bytes(b"part one ")
+            ws.send_bytes(b"part two")
+            ws.send_json({"type": "end"})
+            message = ws.receive_json()
+        self.assertEqual(message["type"], "result")
+        self.assertEqual(self.stub.calls, [(b"part one part two", "audio/webm")])
+
+    def test_invalid_start_and_oversized_stream(self):
+        with self.client.websocket_connect("/ws/analyze") as ws:
+            ws.send_json({"type": "start", "content_type": "text/plain"})
+            self.assertEqual(ws.receive_json()["type"], "error")
+            with self.assertRaises(WebSocketDisconnect) as ctx:
+                ws.receive_json()
+            self.assertEqual(ctx.exception.code, 1003)
+
+        with self.client.websocket_connect("/ws/analyze") as ws:
+            ws.send_json({"type": "start", "content_type": "audio/wav"})
+            wav = to_wav(energetic(1))
+            ws.send_bytes(wav[:22] + b"\x00\x00" + wav[24:])  # Zero channels
+            self.assertIn("Unsupported WAV format", ws.receive_json()["detail"])
+
+        with self.client.websocket_connect("/ws/analyze") as ws:
+            ws.send_bytes(b"audio before the start message")
+            self.assertIn("JSON text message", ws.receive_json()["detail"])
+
+        with self.client.websocket_connect("/ws/analyze") as ws:
+            ws.send_json({"type": "start", "content_type": "audio/webm"})
+            ws.send_json(["end"])
+            self.assertIn("JSON objects", ws.receive_json()["detail"])
+            with self.assertRaises(WebSocketDisconnect) as ctx:
+                ws.receive_json()
+            self.assertEqual(ctx.exception.code, 1003)
+
+        original = api.MAX_UPLOAD_BYTES
+        api.MAX_UPLOAD_BYTES = 10
+        try:
+            with self.client.websocket_connect("/ws/analyze") as ws:
+                ws.send_json({"type": "start", "content_type": "audio/webm"})
+                ws.send_bytes(b"x" * 20)
+                self.assertIn("too large", ws.receive_json()["detail"])
+        finally:
+            api.MAX_UPLOAD_BYTES = original
+        self.assertEqual(self.stub.calls, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+import os
+import tempfile
+from fastapi.testclient import TestClient
+from src import api
+from src.sqlite_storage import SQLiteStorage
+from src.tenancy import UserServiceRegistry, validate_user_id
+
+class TestUserServiceRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.registry = UserServiceRegistry(self.tmpdir.name, max_open=2)
+
+    def tearDown(self):
+        self.registry.close()
+        self.tmpdir.cleanup()
+
+    def test_users_are_isolated_in_their_own_shards(self):
+        with self.registry.session("alice") as service:
+            service.record_entry("I am excited", {})
+        with self.registry.session("bob") as service:
+            self.assertEqual(service.storage.load_entries(), [])
+
+        self.assertNotEqual(self.registry.shard_dir("alice"), self.registry.shard_dir("bob"))
+        self.assertTrue(os.path.isdir(os.path.join(self.registry.shard_dir("alice"), "log.d")))
+
+    def test_pool_is_bounded_with_lru_eviction(self):
+        for user in ("u1", "u2", "u3", "u4"):
+            with self.registry.session(user) as service:
+                service.record_entry(f"log for {user}", {})
+        self.assertEqual(self.registry.open_count(), 2)
+
+        # Evicted shards reopen from disk with their history intact
+        with self.registry.session("u1") as service:
+            self.assertEqual([e["text"] for e in service.storage.load_entries()], ["log for u1"])
+
+    def test_shards_in_use_are_not_evicted(self):
+        with self.registry.session("busy") as busy:
+            for user in ("u1", "u2", "u3"):
+                with self.registry.session(user):
+                    pass
+            self.assertIn("busy", self.registry._shards)
+            busy.record_entry("still here", {})
+
+    def test_sqlite_backend_closes_evicted_shards(self):
+        registry = UserServiceRegistry(self.tmpdir.name, max_open=1, backend="sqlite")
+        with registry.session("alice") as service:
+            storage = service.storage
+            self.assertIsInstance(storage, SQLiteStorage)
+        with registry.session("bob"):
+            pass
+        with self.assertRaises(Exception):
+            storage.load_entries()  # Connection was closed on eviction
+        registry.close()
+
+    def test_rejects_unsafe_user_ids(self):
+        for user_id in ("../etc", "", "a/b", "x" * 65, "alice\n"):
+            with self.assertRaises(ValueError):
+                validate_user_id(user_id)
+        with self.assertRaises(ValueError):
+            with self.registry.session("../../escape"):
+                pass
+
+class TestUserEndpoints(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        api.registry = UserServiceRegistry(self.tmpdir.name)
+        self.client = TestClient(api.app)
+
+    def tearDown(self):
+        api.registry = None
+        self.tmpdir.cleanup()
+
+    def test_record_and_fetch_entries(self):
+        for text in ("I am excited and ready", "so tired", "lunch time"):
+            response = self.client.post("/users/alice/entries", json={"text": text, "metrics": {"pace": 130}})
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["energy_level"], "medium")
+
+        entries = self.client.get("/users/alice/entries", params={"limit": 2}).json()["entries"]
+        self.assertEqual([e["text"] for e in entries], ["so tired", "lunch time"])
+        self.assertEqual(self.client.get("/users/bob/entries").json()["entries"], [])
+
+        feedback = self.client.get("/users/alice/feedback").json()["feedback"]
+        self.assertIn("Analysis based on 3 entries", feedback)
+
+    def test_validation(self):
+        self.assertEqual(self.client.post("/users/alice/entries", json={"text": "   "}).status_code, 400)
+        self.assertEqual(self.client.post("/users/alice/entries", json={"text": "x" * 5001}).status_code, 422)
+        self.assertEqual(
+            self.client.post("/users/alice/entries", json={"text": "ok", "metrics": {"tone_valence": 3}}).status_code,
+            422,
+        )
+        self.assertEqual(self.client.get("/users/bad%20id/entries").status_code, 422)
+
+if __name__ == '__main__':
+    unittest.main()
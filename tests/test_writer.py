@@ -0,0 +1,109 @@
+import unittest
+import tempfile
+from unittest import mock
+from fastapi.testclient import TestClient
+from src import api
+from src.service import analysis_entry
+from src.tenancy import UserServiceRegistry
+from src.writer import BufferedEntryWriter
+from tests.fake_gemini import DEFAULT_ANALYSIS
+from tests.test_api import StubAudioClient
+
+class TestBufferedEntryWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.registry = UserServiceRegistry(self.tmpdir.name, backend="json")
+        self.writer = BufferedEntryWriter(self.registry, flush_interval=60)
+
+    def tearDown(self):
+        self.writer.close()
+        self.registry.close()
+        self.tmpdir.cleanup()
+
+    def test_entries_are_written_in_one_batch_per_user(self):
+        for i in range(20):
+            self.writer.submit("alice" if i % 2 else "bob", analysis_entry(DEFAULT_ANALYSIS))
+
+        with mock.patch("src.storage.Storage.save_entries", autospec=True,
+                        side_effect=lambda storage, entries: None) as save_entries:
+            self.assertTrue(self.writer.flush(timeout=5))
+        self.assertEqual(sorted(len(call.args[1]) for call in save_entries.call_args_list), [10, 10])
+        self.assertEqual(self.writer.written, 20)
+
+    def test_flushed_entries_update_history_and_indexes(self):
+        self.writer.submit("alice", analysis_entry(DEFAULT_ANALYSIS))
+        self.assertTrue(self.writer.flush(timeout=5))
+
+        with self.registry.session("alice") as service:
+            entries = service.storage.load_entries()
+            self.assertEqual(len(entries), 1)
+            self.assertEqual(entries[0]["energy_score"], DEFAULT_ANALYSIS["energy_score"])
+            self.assertEqual(entries[0]["indicators"], DEFAULT_ANALYSIS["indicators"])
+            self.assertEqual(service.aggregates.total, 1)
+
+    def test_close_writes_buffered_entries(self):
+        self.writer.submit("alice", analysis_entry(DEFAULT_ANALYSIS))
+        self.writer.close(timeout=5)
+        with self.registry.session("alice") as service:
+            self.assertEqual(len(service.storage.load_entries()), 1)
+        with self.assertRaises(RuntimeError):
+            self.writer.submit("alice", analysis_entry(DEFAULT_ANALYSIS))
+
+    def test_failing_user_does_not_block_others(self):
+        real_session = self.registry.session
+
+        def session(user_id):
+            if user_id == "broken":
+                raise OSError("disk full")
+            return real_session(user_id)
+
+        self.writer.submit("broken", analysis_entry(DEFAULT_ANALYSIS))
+        self.writer.submit("alice", analysis_entry(DEFAULT_ANALYSIS))
+        with mock.patch.object(self.registry, "session", side_effect=session), \
+                self.assertLogs("src.writer", level="ERROR"):
+            self.assertTrue(self.writer.flush(timeout=5))
+        self.assertEqual((self.writer.written, self.writer.failed), (1, 1))
+
+    def test_invalid_user_rejected_on_submit(self):
+        with self.assertRaises(ValueError):
+            self.writer.submit("../etc", {})
+
+class TestAnalyzePersistence(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        api.gemini_client = StubAudioClient()
+        api.registry = UserServiceRegistry(self.tmpdir.name)
+        self.client = TestClient(api.app)
+
+    def tearDown(self):
+        if api.entry_writer is not None:
+            api.entry_writer.close()
+        api.entry_writer = None
+        api.registry.close()
+        api.registry = None
+        api.gemini_client = None
+        self.tmpdir.cleanup()
+
+    def _upload(self, **data):
+        return self.client.post("/analyze", files={"file": ("clip.webm", b"audio", "audio/webm")}, data=data)
+
+    def test_result_is_recorded_for_user(self):
+        response = self._upload(user_id="alice")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(api.entry_writer.flush(timeout=5))
+
+        entries = self.client.get("/users/alice/entries").json()["entries"]
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0]["source"], "audio")
+        self.assertEqual(entries[0]["energy_level"], "high")
+        self.assertEqual(entries[0]["confidence"], DEFAULT_ANALYSIS["confidence"])
+
+    def test_anonymous_analysis_is_not_recorded(self):
+        self.assertEqual(self._upload().status_code, 200)
+        self.assertIsNone(api.entry_writer)
+
+    def test_invalid_user_id_rejected(self):
+        self.assertEqual(self._upload(user_id="../etc").status_code, 422)
+
+if __name__ == '__main__':
+    unittest.main()
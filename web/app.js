@@ -28,6 +28,16 @@ const ENERGY_CONFIG = {
     low: { icon: '☕', label: 'Low Energy' }
 };
 
+// Anonymous id for this browser; the server keeps its history under it
+function getUserId() {
+    let userId = localStorage.getItem('vocalpoint_user_id');
+    if (!userId) {
+        userId = crypto.randomUUID();
+        localStorage.setItem('vocalpoint_user_id', userId);
+    }
+    return userId;
+}
+
 // Initialize
 document.addEventListener('DOMContentLoaded', () => {
     loadHistory();
@@ -61,17 +71,29 @@ async function startRecording() {
         mediaRecorder = new MediaRecorder(stream, { mimeType: 'audio/webm' });
         audioChunks = [];
 
+        const upload = openAudioStream();
+
         mediaRecorder.ondataavailable = (event) => {
             audioChunks.push(event.data);
+            upload.send(event.data);
         };
 
         mediaRecorder.onstop = async () => {
-            const audioBlob = new Blob(audioChunks, { type: 'audio/webm' });
-            await analyzeAudio(audioBlob);
             stream.getTracks().forEach(track => track.stop());
+            try {
+                // Chunks were uploaded while recording; only the analysis is left
+                const result = await upload.finish();
+                displayResult(result);
+                saveToHistory(result);
+            } catch (error) {
+                console.warn('Streaming upload failed, uploading the whole clip:', error);
+                const audioBlob = new Blob(audioChunks, { type: 'audio/webm' });
+                await analyzeAudio(audioBlob);
+            }
         };
 
-        mediaRecorder.start();
+        // Emit a chunk every 250 ms so the upload keeps pace with the recording
+        mediaRecorder.start(250);
         isRecording = true;
         updateUI('recording');
     } catch (error) {
@@ -89,12 +111,68 @@ function stopRecording() {
     }
 }
 
+// Stream recording chunks to /ws/analyze as they are produced.
+// finish() resolves with the analysis, or rejects so the caller can fall back to a single upload.
+function openAudioStream() {
+    const pending = [];
+    let failed = false;
+    let settle = null;
+    const socket = new WebSocket(`${API_URL.replace(/^http/, 'ws')}/ws/analyze`);
+
+    const outcome = new Promise((resolve, reject) => {
+        settle = { resolve, reject };
+    });
+    outcome.catch(() => {});  // Handled by finish()
+
+    socket.onopen = () => {
+        socket.send(JSON.stringify({ type: 'start', content_type: 'audio/webm', user_id: getUserId() }));
+        pending.splice(0).forEach(chunk => socket.send(chunk));
+    };
+    socket.onmessage = (event) => {
+        const message = JSON.parse(event.data);
+        if (message.type === 'result') {
+            settle.resolve(message.result);
+        } else if (message.type === 'error') {
+            failed = true;
+            settle.reject(new Error(message.detail));
+        }
+    };
+    socket.onerror = () => {
+        failed = true;
+        settle.reject(new Error('WebSocket error'));
+    };
+    socket.onclose = () => settle.reject(new Error('Stream closed before a result'));
+
+    return {
+        send(chunk) {
+            if (failed) return;
+            if (socket.readyState === WebSocket.OPEN) {
+                socket.send(chunk);
+            } else {
+                pending.push(chunk);
+            }
+        },
+        finish() {
+            if (failed) return outcome;
+            status.textContent = '🔍 Analyzing your energy...';
+            const end = () => socket.send(JSON.stringify({ type: 'end' }));
+            if (socket.readyState === WebSocket.OPEN) {
+                end();
+            } else {
+                socket.addEventListener('open', end);
+            }
+            return outcome;
+        }
+    };
+}
+
 // Analyze audio with backend
 async function analyzeAudio(audioBlob) {
     status.textContent = '🔍 Analyzing your energy...';
 
     const formData = new FormData();
     formData.append('file', audioBlob, 'recording.webm');
+    formData.append('user_id', getUserId());
 
     try {
         const response = await fetch(`${API_URL}/analyze`, {
@@ -186,12 +264,49 @@ function saveToHistory(result) {
     renderTrendChart();
 }
 
-// Render trend chart using Canvas API with gradient fill
-function renderTrendChart() {
+// Fetch the server's hourly trend, revalidating the cached copy with its ETag
+async function fetchTrend() {
+    const cached = JSON.parse(localStorage.getItem('vocalpoint_trend') || 'null');
+    const headers = cached && cached.etag ? { 'If-None-Match': cached.etag } : {};
+    const response = await fetch(`${API_URL}/users/${getUserId()}/trend?resolution=hour`, { headers });
+
+    if (response.status === 304 && cached) {
+        return cached.buckets;
+    }
+    if (!response.ok) {
+        throw new Error(`Server error: ${response.status}`);
+    }
+    const body = await response.json();
+    localStorage.setItem('vocalpoint_trend', JSON.stringify({
+        etag: response.headers.get('ETag'),
+        buckets: body.buckets
+    }));
+    return body.buckets;
+}
+
+// Energy scores to plot, oldest first: hourly means from the server, or local history when offline
+async function getTrendPoints() {
+    try {
+        const buckets = await fetchTrend();
+        if (buckets.length >= 2) {
+            return buckets.slice(-15).map(bucket => bucket.mean);
+        }
+    } catch (error) {
+        console.warn('Trend unavailable, using local history:', error);
+    }
     const history = JSON.parse(localStorage.getItem('vocalpoint_history') || '[]');
+    return history
+        .slice(0, 15)  // Show last 15 entries
+        .map(entry => entry.energy_score ?? levelToScore(entry.energy_level))
+        .reverse();
+}
+
+// Render trend chart using Canvas API with gradient fill
+async function renderTrendChart() {
+    const dataPoints = await getTrendPoints();
     
     // Need at least 2 points for a trend line
-    if (history.length < 2) {
+    if (dataPoints.length < 2) {
         trendsSection.classList.add('hidden');
         return;
     }
@@ -213,12 +328,6 @@ function renderTrendChart() {
     // Clear canvas
     ctx.clearRect(0, 0, width, height);
     
-    // Get data points (newest first, so reverse for left-to-right chronological)
-    const dataPoints = history
-        .slice(0, 15)  // Show last 15 entries
-        .map(entry => entry.energy_score ?? levelToScore(entry.energy_level))
-        .reverse();
-    
     const chartWidth = width - padding.left - padding.right;
     const chartHeight = height - padding.top - padding.bottom;
     const xStep = chartWidth / (dataPoints.length - 1);